@@ -0,0 +1,60 @@
+"""
+Compare a hit of the sqlite response cache with the previous cache,
+which stored one pickled requests.Response per file.
+
+Usage (from the repository root):
+
+    python -m benchmarks.cache [--size 20] [--repeat 500]
+"""
+import pickle
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+import requests
+
+from util.cache import ResponseCache
+
+
+def make_response(size: int) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = "https://example.com/data"
+    response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response.encoding = "utf-8"
+    response._content = ("<td>Grüße</td>" * (size // 15 + 1)).encode("utf-8")[:size]
+    return response
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=20, help="Body size in kilobytes")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    response = make_response(args.size * 1024)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pickle_filename = Path(temp_dir) / "response.pickle"
+        pickle_filename.write_bytes(pickle.dumps(response))
+
+        caches = {
+            "sqlite": ResponseCache(Path(temp_dir) / "cache.sqlite3", compress=False),
+            "sqlite compressed": ResponseCache(Path(temp_dir) / "compressed.sqlite3", compress=True),
+        }
+        results = {"pickle file": lambda: pickle.loads(pickle_filename.read_bytes())}
+        for name, cache in caches.items():
+            cache.put("pool", "key", response)
+            results[name] = lambda cache=cache: cache.get("pool", "key")
+
+        for name, func in results.items():
+            seconds = min(timeit.repeat(func, number=args.repeat, repeat=5))
+            print(f"{name:20} {seconds / args.repeat * 1000 * 1000:9.1f} µs/hit")
+
+        for cache in caches.values():
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
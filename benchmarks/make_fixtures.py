@@ -0,0 +1,134 @@
+"""
+Writes synthetic fixtures for the parse benchmarks (see benchmarks/parse.py)
+of a few sources that need no api key, so that the benchmarks and the
+baseline comparison work without recording anything first.
+
+The data is generated in the formats of the sources, with `--size` lots each.
+Recorded cassettes (`--record benchmarks/fixtures`) replace these files.
+
+Usage (from the repository root):
+
+    python -m benchmarks.make_fixtures [--size 200] [--fixtures benchmarks/fixtures]
+"""
+import csv
+import json
+import argparse
+from io import StringIO
+from pathlib import Path
+
+import requests
+
+from util import log
+from util.cassette import Cassette
+from benchmarks.parse import FIXTURE_DIR
+
+
+def write_braunschweig(fixture_dir: Path, size: int):
+    from new.braunschweig import Braunschweig
+
+    features = []
+    for i in range(size):
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [10.5 + i / 10000, 52.26 + i / 10000]},
+            "properties": {
+                "name": f"Parkhaus {i}",
+                "openingState": "closed" if i % 10 == 0 else "open",
+                "free": None if i % 25 == 0 else (i * 7) % 300,
+                "capacity": 300 + i,
+                "timestamp": f"2024-05-01T{i % 24:02}:{i % 60:02}:00",
+                "description": (
+                    f"<h4>Parkhaus {i}</h4><div>Straße {i}<br>38100 Braunschweig"
+                    f"<br><a href=\"http://www.braunschweig.de/parken/{i}\">Details</a></div>"
+                ),
+            },
+        })
+    _write_cassette(fixture_dir / f"{Braunschweig.POOL.id}.json", Braunschweig.POOL.source_url, {
+        "type": "FeatureCollection",
+        "features": features,
+    })
+
+
+def write_pforzheim(fixture_dir: Path, size: int):
+    data = [
+        {
+            "Id": f"pforzheim-{i}",
+            "name": f"Parkhaus {i}",
+            "operatorID": "stadt-pforzheim",
+            "address": f"Straße {i}\n75175 Pforzheim",
+            "description": f"Parkhaus {i} in der Innenstadt\nmit Aufzug",
+            "type": "undergroundCarPark" if i % 3 == 0 else "carPark",
+            "lat": 48.89 + i / 10000,
+            "lon": 8.69 + i / 10000,
+            "capacity": 200 + i,
+            "quantitySpacesReservedForWomen": i % 20,
+            "quantitySpacesReservedForMobilityImpededPerson": None if i % 4 == 0 else i % 10,
+            "securityInformation": "ja, videoüberwacht" if i % 2 else "nein",
+            "feeInformation": "1 € pro Stunde\nTageshöchstsatz 10 €",
+            "hasOpeningHours24h": bool(i % 2),
+        }
+        for i in range(size)
+    ]
+    (fixture_dir / "pforzheim.json").write_text(json.dumps(data, indent=1, ensure_ascii=False))
+
+
+def write_neckarsulm(fixture_dir: Path, size: int):
+    types = ("Parkplatz", "Wanderparkplatz", "Parkhaus", "Tiefgarage", "p+r")
+    rows = [[
+        "id", "name", "kategorie", "y-koord", "x-koord", "strasse", "plz", "stadt", "anz_plaetze", "anzcarsharing",
+        "anzeladestation", "anzfrauenpark", "anzbehinderte", "gebuehren", "open_time", "maxhoehe",
+    ]]
+    for i in range(size):
+        rows.append([
+            i, f"Parkplatz {i}", types[i % len(types)], f"{49.19 + i / 10000:.6f}", f"{9.22 + i / 10000:.6f}",
+            f"Straße {i}", "74172", "Neckarsulm", 50 + i, i % 3, i % 5, i % 4, i % 6,
+            "ja" if i % 2 else "nein", "00:00-24:00" if i % 2 else "07:00-20:00", f"{2 + (i % 5) / 10:.1f}",
+        ])
+    _write_csv(fixture_dir / "neckarsulm.csv", rows, delimiter=";")
+
+
+def write_reutlingen(fixture_dir: Path, size: int):
+    types = ("parkhaus", "tiefgarage", "parkfläche", "p+r")
+    rows = [["id", "ort", "Kapazität", "GEOM", "type"]]
+    for i in range(size):
+        rows.append([
+            i, f"Parkplatz {i}", 20 + i, f"POINT ({9.2 + i / 10000:.6f} {48.49 + i / 10000:.6f})", types[i % len(types)],
+        ])
+    _write_csv(fixture_dir / "reutlingen.csv", rows, delimiter=",")
+
+
+def _write_cassette(filename: Path, url: str, data: dict):
+    request = requests.Request("GET", url).prepare()
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = url
+    response.headers["Content-Type"] = "application/json"
+    response.encoding = "utf-8"
+    response._content = json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    cassette = Cassette(filename, load=False)
+    cassette.record(request, response)
+    cassette.save()
+
+
+def _write_csv(filename: Path, rows: list, delimiter: str):
+    file = StringIO()
+    csv.writer(file, delimiter=delimiter, lineterminator="\n").writerows(rows)
+    filename.write_text(file.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic fixtures for the parse benchmarks")
+    parser.add_argument("--size", type=int, default=200, help="Number of lots per fixture")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURE_DIR, help=f"Fixture directory, defaults to {FIXTURE_DIR}")
+    args = parser.parse_args()
+
+    args.fixtures.mkdir(parents=True, exist_ok=True)
+    for write in (write_braunschweig, write_pforzheim, write_neckarsulm, write_reutlingen):
+        write(args.fixtures, args.size)
+    log(f"wrote fixtures to {args.fixtures}")
+
+
+if __name__ == "__main__":
+    main()
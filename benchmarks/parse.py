@@ -0,0 +1,365 @@
+"""
+Times the parsing code of all scrapers and v3 converters over recorded fixtures.
+
+For scrapers (`original/`, `new/`) and v3 pull converters, the fixture is an
+HTTP cassette `<fixtures>/<pool-id>.json` that is replayed without network
+access. Record them with:
+
+    python scraper.py scrape --record benchmarks/fixtures [-p <pool-id> ...]
+    python test-pull-converter.py <source-uid> --record benchmarks/fixtures
+
+For v3 push converters, the fixture is the pushed file `<fixtures>/<source-uid>.<xlsx|csv|xml|json>`.
+Pools without fixture are skipped.
+
+Each benchmark is run once to warm up, `--repeat` times for the wall time
+and once more with tracemalloc for the retained memory blocks and the peak memory of the call.
+
+To time only the parsing, the requests of scrapers and pull converters are
+recorded during the warm-up and replayed on their own `--repeat` times. Their
+time (cassette replay, requests session and cache lookups) is subtracted from
+the wall time and reported as `request_seconds`.
+
+Usage (from the repository root):
+
+    python -m benchmarks.parse [-p <pool-id> ...] [--save-baseline] [--threshold 0.25]
+
+The fastest runs are compared against the baseline file and the exit code
+is 1 if any benchmark is more than `--threshold` slower than its baseline.
+
+Synthetic fixtures of a few sources are written by `python -m benchmarks.make_fixtures`.
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tracemalloc
+from importlib import import_module
+from inspect import isclass
+from io import StringIO
+from pathlib import Path
+from pkgutil import iter_modules
+from typing import Callable, List, Optional, Tuple
+
+from util import log, SourceInfo
+from util.cassette import cassettes
+
+
+MODULE_DIR: Path = Path(__file__).resolve().parent.parent
+FIXTURE_DIR: Path = MODULE_DIR / "benchmarks" / "fixtures"
+BASELINE_FILENAME: Path = MODULE_DIR / "benchmarks" / "baseline.json"
+
+BASELINE_VERSION = 1
+
+# Differences below this number of seconds are not considered a regression
+MIN_REGRESSION_SECONDS = 0.001
+
+PUSH_FILE_TYPES = ("xlsx", "csv", "xml", "json")
+
+
+def measure(func: Callable[[], object], repeat: int = 5, baseline: Optional[Callable[[], object]] = None) -> dict:
+    """
+    Run `func` once to warm up, `repeat` times for the wall time and once with tracemalloc.
+
+    :param baseline: function whose time is subtracted from the time of `func`,
+        e.g. the requests of `func` without the parsing
+    :return: dict with median and minimum seconds, the number of memory blocks
+        that are still allocated after the call (including the result) and
+        the peak of memory allocated during the call in bytes
+    """
+    durations = _time(func, repeat)
+    baseline_durations = _time(baseline, repeat) if baseline is not None else [0.] * repeat
+
+    # do not stop the tracing of a caller
+    start_tracing = not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        # only count the memory allocated by the call, not what was traced before
+        start_size = tracemalloc.get_traced_memory()[0]
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1] - start_size
+        after = tracemalloc.take_snapshot()
+    finally:
+        if start_tracing:
+            tracemalloc.stop()
+    # keep the result alive until after the snapshot
+    del result
+
+    stats = after.compare_to(before, "filename")
+    result = {
+        "seconds": round(max(0., statistics.median(durations) - statistics.median(baseline_durations)), 6),
+        "min_seconds": round(max(0., min(durations) - min(baseline_durations)), 6),
+        "retained_blocks": sum(max(0, stat.count_diff) for stat in stats),
+        "peak_bytes": peak,
+    }
+    if baseline is not None:
+        result["request_seconds"] = round(statistics.median(baseline_durations), 6)
+    return result
+
+
+class RequestRecorder:
+    """
+    Records the calls of a request method (e.g. ScraperBase.request) of one object,
+    to replay only the requests later.
+    """
+
+    def __init__(self, obj: object, method_name: str = "request"):
+        self.calls: List[Tuple[tuple, dict]] = []
+        self._request = getattr(obj, method_name)
+        setattr(obj, method_name, self._record)
+
+    def _record(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self._request(*args, **kwargs)
+
+    def record(self, func: Callable[[], object]) -> Callable[[], None]:
+        """
+        Call `func` and return a function that repeats only its requests
+        """
+        self.calls = []
+        func()
+        calls = self.calls
+
+        def _replay():
+            for args, kwargs in calls:
+                self._request(*args, **kwargs)
+
+        return _replay
+
+
+def iter_scraper_benchmarks(pool_filter: Optional[List[str]], fixture_dir: Path):
+    """
+    Yield `(name, func or reason for skipping, requests of func)` for each scraper method
+    """
+    from scraper import get_scrapers
+
+    for pool_id, scraper_class in sorted(get_scrapers(pool_filter=pool_filter).items()):
+        if not (fixture_dir / f"{pool_id}.json").exists():
+            yield pool_id, "no fixture", None
+            continue
+
+        scraper = scraper_class()
+        recorder = RequestRecorder(scraper)
+        for method_name in ("get_lot_data", "get_lot_infos"):
+            method = getattr(scraper, method_name)
+            try:
+                requests_only = recorder.record(method)
+            except NotImplementedError:
+                continue
+            except Exception as e:
+                yield f"{pool_id}:{method_name}", f"{type(e).__name__}: {e}", None
+                continue
+            yield f"{pool_id}:{method_name}", method, requests_only
+
+
+def iter_converter_benchmarks(pool_filter: Optional[List[str]], fixture_dir: Path):
+    """
+    Yield `(name, func or reason for skipping, requests of func)` for each v3 converter method
+    """
+    from common.base_converter import BaseConverter, PullConverter
+
+    for converter_class in _iter_converter_classes(BaseConverter):
+        source_id = converter_class.source_info.id
+        if pool_filter and source_id not in pool_filter:
+            continue
+
+        if issubclass(converter_class, PullConverter):
+            if not (fixture_dir / f"{source_id}.json").exists():
+                yield source_id, "no fixture", None
+                continue
+            converter = converter_class()
+            recorder = RequestRecorder(converter.http_client)
+            for method_name in ("get_static_parking_sites", "get_realtime_parking_sites"):
+                method = getattr(converter, method_name)
+                try:
+                    requests_only = recorder.record(method)
+                except Exception as e:
+                    yield f"{source_id}:{method_name}", f"{type(e).__name__}: {e}", None
+                    continue
+                yield f"{source_id}:{method_name}", method, requests_only
+            continue
+
+        for file_type in PUSH_FILE_TYPES:
+            filename = fixture_dir / f"{source_id}.{file_type}"
+            if filename.exists():
+                method_name, func = _push_converter_benchmark(converter_class(), filename, file_type)
+                yield f"{source_id}:{method_name}", func, None
+                break
+        else:
+            yield source_id, "no fixture", None
+
+
+def run_benchmarks(
+        pool_filter: Optional[List[str]] = None,
+        fixture_dir: Path = FIXTURE_DIR,
+        repeat: int = 5,
+) -> dict:
+    """
+    Run all benchmarks that have a fixture and return the report
+    """
+    cassettes.configure(fixture_dir, mode="replay")
+    results, skipped = {}, {}
+    try:
+        for iterator in (iter_scraper_benchmarks, iter_converter_benchmarks):
+            for name, func, requests_only in iterator(pool_filter, fixture_dir):
+                if isinstance(func, str):
+                    skipped[name] = func
+                    continue
+                log(f"benchmarking {name}")
+                try:
+                    results[name] = measure(func, repeat=repeat, baseline=requests_only)
+                except Exception as e:
+                    skipped[name] = f"{type(e).__name__}: {e}"
+    finally:
+        cassettes.configure(None)
+
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = .25) -> List[dict]:
+    """
+    Return the benchmarks that are more than `threshold` (relative) slower than the baseline.
+
+    The fastest runs are compared, because they are the least affected by other load on the machine.
+    """
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Baseline has version {baseline.get('version')}, expected {BASELINE_VERSION}")
+
+    regressions = []
+    for name, result in report["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        seconds = result.get("min_seconds", result["seconds"])
+        previous_seconds = previous.get("min_seconds", previous["seconds"])
+        if seconds > previous_seconds * (1. + threshold) and seconds - previous_seconds > MIN_REGRESSION_SECONDS:
+            regressions.append({
+                "name": name,
+                "seconds": seconds,
+                "baseline_seconds": previous_seconds,
+                "ratio": round(seconds / previous_seconds, 2) if previous_seconds else None,
+            })
+    return regressions
+
+
+def print_report(report: dict, baseline: Optional[dict] = None, file=None):
+    previous_results = (baseline or {}).get("results", {})
+    print(
+        f"{'benchmark':50} {'ms':>10} {'baseline':>10} {'requests':>10} {'retained':>10} {'peak KB':>10}",
+        file=file,
+    )
+    for name, result in sorted(report["results"].items(), key=lambda item: -item[1]["seconds"]):
+        previous = previous_results.get(name)
+        previous_ms = f"{previous['seconds'] * 1000:10.2f}" if previous else f"{'-':>10}"
+        request_ms = f"{result['request_seconds'] * 1000:10.2f}" if "request_seconds" in result else f"{'-':>10}"
+        print(
+            f"{name:50} {result['seconds'] * 1000:10.2f} {previous_ms} {request_ms}"
+            f" {result['retained_blocks']:10} {result['peak_bytes'] / 1024:10.1f}",
+            file=file,
+        )
+    if report["skipped"]:
+        print(f"\nskipped {len(report['skipped'])}: {', '.join(sorted(report['skipped']))}", file=file)
+
+
+def _time(func: Callable[[], object], repeat: int) -> List[float]:
+    func()
+    durations = []
+    for i in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start_time)
+    return durations
+
+
+def _iter_converter_classes(base_class: type):
+    seen = set()
+    for _, module_name, _ in iter_modules([str(MODULE_DIR / "v3")]):
+        module = import_module(f"v3.{module_name}")
+        for attribute in vars(module).values():
+            # source_info is only set in the actual converter classes
+            if (
+                    isclass(attribute) and issubclass(attribute, base_class) and attribute not in seen
+                    and isinstance(getattr(attribute, "source_info", None), SourceInfo)
+            ):
+                seen.add(attribute)
+                yield attribute
+
+
+def _push_converter_benchmark(converter, filename: Path, file_type: str) -> Tuple[str, Callable[[], object]]:
+    """
+    Load the fixture file (which is not timed) and return the name and a function of the converter's handle method
+    """
+    if file_type == "xlsx":
+        from openpyxl.reader.excel import load_workbook
+
+        workbook = load_workbook(filename=str(filename))
+        return "handle_xlsx", lambda: converter.handle_xlsx(workbook)
+
+    if file_type == "csv":
+        text = filename.read_text()
+        return "handle_csv_string", lambda: converter.handle_csv_string(StringIO(text))
+
+    if file_type == "xml":
+        from lxml import etree
+
+        root = etree.fromstring(filename.read_bytes(), parser=etree.XMLParser(resolve_entities=False))
+        return "handle_xml", lambda: converter.handle_xml(root)
+
+    data = json.loads(filename.read_text())
+    return "handle_json", lambda: converter.handle_json(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parsing code of the scrapers and converters")
+    parser.add_argument("-p", "--pools", nargs="+", type=str, help="Filter for one or more pool IDs")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURE_DIR, help=f"Fixture directory, defaults to {FIXTURE_DIR}")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs per benchmark")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILENAME, help=f"Baseline file, defaults to {BASELINE_FILENAME}")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to the baseline file")
+    parser.add_argument("--threshold", type=float, default=.25, help="Maximum relative slowdown against the baseline")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Also write the report as json to this file")
+    args = parser.parse_args()
+
+    report = run_benchmarks(pool_filter=args.pools, fixture_dir=args.fixtures, repeat=args.repeat)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    baseline = None
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+
+    print_report(report, baseline)
+
+    if args.save_baseline:
+        if args.pools and args.baseline.exists():
+            # only replace the benchmarks of the selected pools
+            previous = json.loads(args.baseline.read_text())
+            report["results"] = {**previous.get("results", {}), **report["results"]}
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        log(f"wrote baseline {args.baseline}")
+        return
+
+    if baseline is not None:
+        regressions = compare(report, baseline, threshold=args.threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['name']}: {regression['seconds'] * 1000:.2f}ms"
+                f", baseline {regression['baseline_seconds'] * 1000:.2f}ms",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
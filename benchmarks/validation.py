@@ -0,0 +1,72 @@
+"""
+Compare the compiled schema checker with jsonschema on a synthetic snapshot.
+
+Usage (from the repository root):
+
+    python -m benchmarks.validation [--lots 1000] [--repeat 20]
+"""
+import argparse
+import timeit
+from copy import deepcopy
+
+from util.validate import get_schema_validator, get_schema_checker, validate_snapshot
+
+
+def make_snapshot(num_lots: int) -> dict:
+    lot = {
+        "name": "Lot",
+        "type": "garage",
+        "public_url": None,
+        "source_url": "https://example.com/source",
+        "address": "Some Street 1\nExample City",
+        "capacity": 100,
+        "has_live_capacity": True,
+        "latitude": 50.,
+        "longitude": 10.,
+        "timestamp": "2021-11-29T09:10:30",
+        "lot_timestamp": "2021-11-29T09:09:36",
+        "status": "open",
+        "num_free": 60,
+        "num_occupied": 40,
+    }
+    return {
+        "pool": {
+            "id": "pool-1",
+            "name": "Pool 1",
+            "public_url": "https://example.com",
+            "source_url": None,
+            "timezone": "Europe/Berlin",
+            "attribution_license": "CC-0",
+            "attribution_contributor": "The City Of Example",
+            "attribution_url": "https://example.com/license",
+        },
+        "lots": [
+            {**deepcopy(lot), "id": f"pool-1-lot-{i}"}
+            for i in range(num_lots)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lots", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    snapshot = make_snapshot(args.lots)
+    validator = get_schema_validator()
+    checker = get_schema_checker()
+    assert validator.is_valid(snapshot) and checker(snapshot)
+
+    results = {
+        "jsonschema": timeit.timeit(lambda: validator.validate(snapshot), number=args.repeat),
+        "compiled": timeit.timeit(lambda: checker(snapshot), number=args.repeat),
+        "validate_snapshot": timeit.timeit(lambda: validate_snapshot(snapshot), number=args.repeat),
+    }
+    for name, seconds in results.items():
+        print(f"{name:20} {seconds / args.repeat * 1000:9.3f} ms/snapshot")
+    print(f"speedup {results['jsonschema'] / results['compiled']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
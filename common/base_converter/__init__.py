@@ -3,10 +3,29 @@ Copyright 2023 binary butterfly GmbH
 Use of this source code is governed by an MIT-style license that can be found in the LICENSE.txt.
 """
 
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from .base_converter import BaseConverter
 from .csv_converter import CsvConverter
 from .json_converter import JsonConverter
-from .normalized_xlsx_converter import NormalizedXlsxConverter
 from .pull_converter import PullConverter
-from .xlsx_converter import XlsxConverter
-from .xml_converter import XmlConverter
+
+if TYPE_CHECKING:
+    from .normalized_xlsx_converter import NormalizedXlsxConverter
+    from .xlsx_converter import XlsxConverter
+    from .xml_converter import XmlConverter
+
+# These converters depend on openpyxl or lxml, which take a long time to import,
+# so they are only imported when accessed.
+_lazy_converters: dict[str, str] = {
+    'NormalizedXlsxConverter': '.normalized_xlsx_converter',
+    'XlsxConverter': '.xlsx_converter',
+    'XmlConverter': '.xml_converter',
+}
+
+
+def __getattr__(name: str):
+    if name in _lazy_converters:
+        return getattr(import_module(_lazy_converters[name], __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -4,12 +4,66 @@ Use of this source code is governed by an MIT-style license that can be found in
 """
 
 from abc import abstractmethod
+from functools import cached_property
+from typing import Callable, Iterable, Optional, TypeVar, Union
 
 from common.base_converter import BaseConverter
+from common.fan_out import FanOutResult, fan_out
+from common.http_client import HttpClient
 from common.models import ImportSourceResult
 
+ItemT = TypeVar('ItemT')
+ResultT = TypeVar('ResultT')
+
 
 class PullConverter(BaseConverter):
+    # ---- http client config, see HttpClient ----
+
+    # Seconds before a request is cancelled
+    request_timeout: float = 60
+    # Number of retries for connection errors and 429 / 5xx responses
+    request_retries: int = 3
+    # Maximum requests per second, None for no limit. Like ScraperBase.REQUESTS_PER_SECOND,
+    # the strictest limit of all callers also applies to the shared bucket of a host
+    requests_per_second: Optional[float] = None
+    # Number of requests that can be fired in a row before throttling starts
+    request_burst: int = 1
+    # Maximum number of pooled keep-alive connections per host
+    max_connections: int = 10
+    # Seconds after which a cached response is not used anymore, None for no expiry
+    cache_ttl: Optional[float] = None
+    # Send If-None-Match / If-Modified-Since headers and reuse unmodified responses
+    conditional_requests: bool = False
+    # Maximum number of concurrent requests in fan_out()
+    max_concurrent_requests: int = 4
+
+    def __init__(self, caching: Union[bool, str] = False):
+        """
+        :param caching: enable the response cache, can be True, False, 'read' or 'write'
+        """
+        self.caching = caching
+
+    @cached_property
+    def http_client(self) -> HttpClient:
+        return HttpClient(
+            namespace=self.source_info.id,
+            timeout=self.request_timeout,
+            max_connections=self.max_connections,
+            max_retries=self.request_retries,
+            requests_per_second=self.requests_per_second,
+            request_burst=self.request_burst,
+            caching=self.caching,
+            cache_ttl=self.cache_ttl,
+            conditional_requests=self.conditional_requests,
+        )
+
+    def fan_out(self, func: Callable[[ItemT], ResultT], items: Iterable[ItemT]) -> list[FanOutResult[ItemT, ResultT]]:
+        """
+        Call `func` (usually a detail request) for each item with at most `max_concurrent_requests`
+        concurrent calls, see common.fan_out.fan_out()
+        """
+        return fan_out(func, items, max_workers=self.max_concurrent_requests)
+
     @abstractmethod
     def get_static_parking_sites(self) -> ImportSourceResult:
         pass
@@ -0,0 +1,43 @@
+"""
+Copyright 2024 binary butterfly GmbH
+Use of this source code is governed by an MIT-style license that can be found in the LICENSE.txt.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Generic, Iterable, Optional, TypeVar
+
+ItemT = TypeVar('ItemT')
+ResultT = TypeVar('ResultT')
+
+
+@dataclass
+class FanOutResult(Generic[ItemT, ResultT]):
+    item: ItemT
+    result: Optional[ResultT] = None
+    exception: Optional[Exception] = None
+
+
+def fan_out(
+    func: Callable[[ItemT], ResultT],
+    items: Iterable[ItemT],
+    max_workers: int = 4,
+) -> list[FanOutResult[ItemT, ResultT]]:
+    """
+    Call `func` for each item with at most `max_workers` concurrent calls, e.g. to fetch the details of each
+    element of a list API. The results are returned in the order of `items`. An exception of a call is returned
+    in its result instead of being raised, so the caller can report it for this item and continue with the others.
+    """
+    items = list(items)
+
+    def call(item: ItemT) -> FanOutResult[ItemT, ResultT]:
+        try:
+            return FanOutResult(item=item, result=func(item))
+        except Exception as e:
+            return FanOutResult(item=item, exception=e)
+
+    if max_workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
@@ -0,0 +1,206 @@
+"""
+Copyright 2024 binary butterfly GmbH
+Use of this source code is governed by an MIT-style license that can be found in the LICENSE.txt.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from util import http_defaults
+from util.cache import (
+    RESPONSE_CACHE_FILENAME,
+    ResponseCache,
+    conditional_namespace,
+    conditional_request_headers,
+    get_response_cache,
+    response_validator,
+)
+from util.cassette import cassettes
+from util.ratelimit import TokenBucket, host_rate_limiter
+
+
+class HttpClient:
+    """
+    HTTP client for converters which pull their data from remote APIs.
+
+    All requests go through one requests.Session, so keep-alive connections are reused
+    between requests to the same host. Requests with connection errors or a 429 / 5xx status
+    are retried with exponential, jittered backoff. Requests can be rate limited (per client and
+    process-wide per host, like ScraperBase.request()) and the responses can be cached in the
+    response cache that the scrapers use as well, with `namespace` (usually the source uid) as pool id.
+    """
+
+    retry_status_codes: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        namespace: str,
+        timeout: float = 60,
+        max_connections: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_jitter: float = 0.5,
+        requests_per_second: Optional[float] = None,
+        request_burst: int = 1,
+        caching: Union[bool, str] = False,
+        cache_ttl: Optional[float] = None,
+        conditional_requests: bool = False,
+        headers: Optional[dict[str, str]] = None,
+        cache_dir: Optional[Path] = None,
+    ):
+        """
+        :param namespace: prefix of cached responses, e.g. the source uid
+        :param timeout: seconds before a request is cancelled
+        :param max_connections: maximum number of pooled keep-alive connections per host
+        :param max_retries: number of retries for failed requests, 0 to disable retries
+        :param backoff_factor: the n-th retry waits `backoff_factor * 2 ** (n - 1)` seconds
+        :param backoff_jitter: maximum random seconds added to each backoff
+        :param requests_per_second: maximum requests per second, None for no limit
+        :param request_burst: number of requests that can be fired in a row before throttling starts
+        :param caching: enable the response cache, can be True, False, 'read' or 'write'
+        :param cache_ttl: seconds after which a cached response is not used anymore, None for no expiry
+        :param conditional_requests: send If-None-Match / If-Modified-Since headers for GET requests
+            and reuse the previous response if the server answers with 304 Not Modified
+        :param headers: headers that are added to all requests
+        :param cache_dir: directory of the response cache, defaults to util.http_defaults.CACHE_DIR
+        """
+        self.namespace = namespace
+        self.timeout = timeout
+        self.requests_per_second = requests_per_second
+        self.request_burst = request_burst
+        self.caching = caching
+        self.cache_ttl = cache_ttl
+        self.conditional_requests = conditional_requests
+        self.cache_dir = http_defaults.CACHE_DIR if cache_dir is None else Path(cache_dir)
+        self.rate_limit = TokenBucket(requests_per_second, request_burst)
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=self.retry_status_codes,
+            respect_retry_after_header=True,
+            # return the last response instead of raising, the caller checks the status
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_maxsize=max_connections, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = http_defaults.USER_AGENT
+        if headers:
+            self.session.headers.update(headers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        cassettes.mount(self.session, namespace)
+
+    def close(self):
+        self.session.close()
+
+    def get_response_cache(self) -> ResponseCache:
+        return get_response_cache(
+            self.cache_dir / RESPONSE_CACHE_FILENAME,
+            max_size=http_defaults.CACHE_MAX_SIZE,
+            compress=http_defaults.CACHE_COMPRESS,
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        expected_status: Optional[int] = None,
+        caching: Optional[Union[bool, str]] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Request an url, see the class documentation.
+
+        :param expected_status: raises requests.HTTPError (an IOError) if the response has another status
+        :param caching: overrides the caching setting of the client
+        :param kwargs: any arguments to requests.Session.request() except method and url
+        """
+        request_key = json.dumps([method.upper(), url, kwargs], sort_keys=True, default=str)
+        caching = self.caching if caching is None else caching
+
+        if caching in (True, 'read'):
+            response = self.get_response_cache().get(self.namespace, request_key, ttl=self.cache_ttl)
+            if response is not None:
+                return response
+
+        kwargs.setdefault('timeout', self.timeout)
+
+        if self.conditional_requests and method.upper() == 'GET' and not cassettes.active:
+            response = self._request_conditional(method, url, request_key, kwargs)
+        else:
+            response = self._request(method, url, kwargs)
+
+        if expected_status is not None and response.status_code != expected_status:
+            raise requests.HTTPError(
+                f'Unexpected status {response.status_code} for request {method} {url}\n\nResponse: {response.content}',
+                response=response,
+            )
+
+        if caching in (True, 'write'):
+            self.get_response_cache().put(self.namespace, request_key, response)
+
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def get_json(self, url: str, expected_status: Optional[int] = None, **kwargs: Any) -> Any:
+        """
+        Request an url and decode the json response. The status is not checked unless `expected_status` is given.
+        """
+        return self.request('GET', url, expected_status=expected_status, **kwargs).json()
+
+    def _request_conditional(self, method: str, url: str, request_key: str, kwargs: dict) -> requests.Response:
+        response_cache = self.get_response_cache()
+        namespace = conditional_namespace(self.namespace)
+
+        previous_response = response_cache.get(namespace, request_key)
+        if previous_response is not None:
+            kwargs['headers'] = {
+                **(kwargs.get('headers') or {}),
+                **conditional_request_headers(previous_response),
+            }
+
+        response = self._request(method, url, kwargs)
+
+        if response.status_code == 304 and previous_response is not None:
+            return previous_response
+
+        if response.status_code == 200 and response_validator(response):
+            response_cache.put(namespace, request_key, response)
+
+        return response
+
+    def _request(self, method: str, url: str, kwargs: dict) -> requests.Response:
+        if cassettes.replaying:
+            # replayed requests do not reach any server
+            return self.session.request(method=method, url=url, **kwargs)
+
+        wait_time = max(
+            self.rate_limit.reserve(),
+            host_rate_limiter.reserve(url, self.requests_per_second, self.request_burst),
+        )
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+        return self.session.request(method=method, url=url, **kwargs)
+
+
+def request_error_message(exception: Exception) -> str:
+    """
+    Describe a failed request by the exception type and the response status only. The exception messages
+    of requests contain the full url, including api keys in the query.
+    """
+    response = getattr(exception, 'response', None)
+    if response is not None:
+        return f'{type(exception).__name__} (status {response.status_code})'
+    return type(exception).__name__
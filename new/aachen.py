@@ -15,6 +15,9 @@ class Aachen(ScraperBase):
         public_url="https://mobilithek.info/offers/110000000003300000",
     )
 
+    # the static data rarely changes
+    CONDITIONAL_REQUESTS = True
+
     AACHEN_TO_APAG_IDS_MAPPING = {
         'aachenp1': 'aachenparkhauseurogress',
         'aachenp2': 'aachenparkhauscouvenstrasse',
@@ -9,13 +9,12 @@ This scraper raises an exception unless you define your API token, either in
 import warnings
 from typing import List
 
-from decouple import config
-
 from util import *
+from util.settings import settings
 
 
 class BahnParking(ScraperBase):
-    BAHN_API_TOKEN = config("BAHN_API_TOKEN", None)
+    BAHN_API_TOKEN = settings.bahn_api_token
 
     POOL = PoolInfo(
         id="bahn",
@@ -27,6 +26,9 @@ class BahnParking(ScraperBase):
         attribution_contributor="DB BahnPark GmbH",
     )
 
+    # the spaces listing rarely changes
+    CONDITIONAL_REQUESTS = True
+
     HEADERS = {
         "Authorization": f"Bearer {BAHN_API_TOKEN}"
     }
@@ -92,18 +94,12 @@ class BahnParking(ScraperBase):
         if not self.BAHN_API_TOKEN:
             raise Exception('Deutsche Bahn Parking API disabled! You need to define BAHN_API_TOKEN in environment or in a .env file.')
 
-        spaces = []
-
-        offset = 0
-        while True:
-            data = self.request_json(
-                self.POOL.source_url,
-                params={"offset": offset, "limit": 100}
-            )
-            spaces += data["items"]
-            if len(spaces) >= data["totalCount"]:
-                break
-            offset += len(data["items"])
+        spaces = self.iter_json_pages(
+            self.POOL.source_url,
+            get_items=lambda data: data["items"],
+            get_total=lambda data: data["totalCount"],
+            page_size=100,
+        )
 
         lots = []
         for space in spaces:
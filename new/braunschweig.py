@@ -22,21 +22,15 @@ class Braunschweig(ScraperBase):
     }
 
     
-    """
-    geojson_response will be cached as get_lot_info and get_lot_data access it.
-    As long as no braunschweig.geojson is stored, the lot info is extracted dynamically from
-    the json response.
-    """
-    geojson_response = None
+    # As long as no braunschweig.geojson is stored, the lot info is extracted dynamically from
+    # the json response. get_lot_infos and get_lot_data share the response via request_memo().
 
     def get_lot_data(self) -> List[LotData]:
         timestamp = self.now()
         lots = []
 
-        if not self.geojson_response:
-            self.geojson_response = self.request_json(self.POOL.source_url)
-
-        for feature in self.geojson_response["features"]:
+        geojson_response = self.request_json(self.POOL.source_url)
+        for feature in geojson_response["features"]:
             props = feature["properties"]
 
             status = self.STATUS_MAPPING.get(props["openingState"]) or LotData.Status.unknown
@@ -58,8 +52,8 @@ class Braunschweig(ScraperBase):
 
     def get_lot_infos(self) -> List[LotInfo]:
         lots = []
-        self.geojson_response = self.request_json(self.POOL.source_url)
-        for feature in self.geojson_response["features"]:
+        geojson_response = self.request_json(self.POOL.source_url)
+        for feature in geojson_response["features"]:
             props = feature["properties"]
 
             soup = bs4.BeautifulSoup(props["description"], features="html.parser")
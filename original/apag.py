@@ -16,6 +16,9 @@ class Apag(ScraperBase):
         public_url="https://www.apag.de/de/fahrzeug-parken-laden-fahrrad-abstellen",
     )
 
+    # the lot infos are scraped from one detail page per lot, refresh them once a day
+    LOT_INFO_TTL = 24 * 60 * 60
+
     # A couple of parkings are provided by Aachen as well.
     # As the Aachen datasource is structured, we prefer it and suppress
     # apag parkings which are also provided by provider aachen.
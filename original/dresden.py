@@ -1,9 +1,12 @@
 """
 Original code by Kliemann
 """
+import asyncio
 import urllib.parse
 from typing import List
 
+from bs4 import BeautifulSoup
+
 from util import *
 
 
@@ -17,6 +20,9 @@ class Dresden(ScraperBase):
         attribution_contributor="Landeshauptstadt Dresden / tiefbauamt-verkehrstechnik@dresden.de"
     )
 
+    # the lot infos are scraped from one detail page per lot, refresh them once a day
+    LOT_INFO_TTL = 24 * 60 * 60
+
     def get_lot_data(self) -> List[LotData]:
         now = self.now()
         soup = self.request_soup(self.POOL.source_url)
@@ -73,11 +79,11 @@ class Dresden(ScraperBase):
 
         return lots
 
-    def get_lot_infos(self) -> List[LotInfo]:
+    async def aget_lot_infos(self) -> List[LotInfo]:
         """This does a good job but many coordinates are not included!"""
-        soup = self.request_soup(self.POOL.source_url)
+        soup = await self.arequest_soup(self.POOL.source_url)
 
-        lots = []
+        lot_urls = []
         for table in soup.find_all("table"):
             thead = table.find("thead")
             if not thead:
@@ -86,19 +92,22 @@ class Dresden(ScraperBase):
             # region = table.find("thead").find("tr").find_all("th")[1].find("div").text
 
             for tr in table.find("tbody").find_all("tr"):
-                lot_url = urllib.parse.urljoin(self.POOL.source_url, tr.find("a").attrs["href"])
+                lot_urls.append(urllib.parse.urljoin(self.POOL.source_url, tr.find("a").attrs["href"]))
 
-                try:
-                    lots.append(self.get_lot_info_from_page(lot_url))
-                except:
-                    print("\nERROR IN URL", lot_url)
-                    raise
-
-        return lots
+        return list(await asyncio.gather(*(
+            self.aget_lot_info_from_page(lot_url)
+            for lot_url in lot_urls
+        )))
 
-    def get_lot_info_from_page(self, url: str) -> LotInfo:
-        soup = self.request_soup(url)
+    async def aget_lot_info_from_page(self, url: str) -> LotInfo:
+        soup = await self.arequest_soup(url)
+        try:
+            return self.get_lot_info_from_soup(url, soup)
+        except:
+            print("\nERROR IN URL", url)
+            raise
 
+    def get_lot_info_from_soup(self, url: str, soup: BeautifulSoup) -> LotInfo:
         name = soup.find("h1").text.strip()
 
         h3s = soup.find("div", class_="contentsection").find_all("h3")
@@ -15,6 +15,9 @@ class Frankfurt(ScraperBase):
         source_url="https://offenedaten.frankfurt.de/dataset/912fe0ab-8976-4837-b591-57dbf163d6e5/resource/48378186-5732-41f3-9823-9d1938f2695e/download/parkdaten_dyn.xml",
     )
 
+    # the static data rarely changes
+    CONDITIONAL_REQUESTS = True
+
     def get_lot_data(self) -> List[LotData]:
         now = self.now()
         soup = self.request_soup(self.POOL.source_url)
@@ -76,7 +76,7 @@ class Dortmund(ScraperBase):
             
             if lot_map.get(lot_name):
                 # if available, use information from ParkAPIv1 as default
-                kwargs = vars(lot_map[lot_name])
+                kwargs = lot_map[lot_name].to_dict()
             else:
                 kwargs = {
                     "id": name_to_legacy_id("freiburg", lot_name),
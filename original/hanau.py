@@ -104,7 +104,7 @@ class Hanau(ScraperBase):
             if parking_name not in lot_map:
                 warnings.warn(f"Lot '{parking_name}' not in original geojson")
 
-            kwargs = vars(lot_map[parking_name]) if parking_name in lot_map else dict()
+            kwargs = lot_map[parking_name].to_dict() if parking_name in lot_map else dict()
             kwargs.update(dict(
                 id=name_to_legacy_id("hanau", parking_name),
                 name=parking_name,
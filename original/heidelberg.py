@@ -99,7 +99,7 @@ class Heidelberg(ScraperBase):
             except:
                 parking_capacity = None
 
-            original_lot = vars(lot_map.get(lot_id)) if lot_id in lot_map else {}
+            original_lot = lot_map.get(lot_id).to_dict() if lot_id in lot_map else {}
 
             parking_id = name_to_legacy_id(self.POOL.id, parking_name)
 
@@ -89,7 +89,7 @@ class Heilbronn(ScraperBase):
             if parking_name not in lot_map:
                 errors.append(f'parking site "{parking_name}" is not in provided GeoJSON')
                 continue
-            kwargs = vars(lot_map[parking_name])
+            kwargs = lot_map[parking_name].to_dict()
             kwargs["public_url"] = park_temp2["href"] if park_temp2 else None
 
             lots.append(LotInfo(**kwargs))
@@ -121,7 +121,7 @@ class Karlsruhe(ScraperBase):
             details = self._get_lot_details(public_url)
             
             v1_lot = v1_lot_map.get(lot_id)
-            v1_lot_props = vars(v1_lot) if v1_lot else {}
+            v1_lot_props = v1_lot.to_dict() if v1_lot else {}
             
             # kwargs is the merge of multiple data sources, defaults are 
             # overridden by v1 info, which are overridden by parsed data
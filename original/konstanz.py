@@ -20,6 +20,9 @@ class Konstanz(ScraperBase):
         attribution_url=None,
     )
 
+    # the lot infos are scraped from one detail page per lot, refresh them once a day
+    LOT_INFO_TTL = 24 * 60 * 60
+
     """
     Maps current parking lot names to their former name to provide
     backward compatibility.
@@ -86,7 +89,7 @@ class Konstanz(ScraperBase):
                 address = None
 
             lot_id = self.name_to_legacy_id(lot_name)
-            kwargs = vars(lot_map[lot_id]) if lot_id in lot_map else {}
+            kwargs = lot_map[lot_id].to_dict() if lot_id in lot_map else {}
 
             kwargs.update({
                 "id": lot_id,
@@ -14,6 +14,7 @@ is made from scratch.
 
 The legacy IDs are kept as far as the lot name did not change.
 """
+import asyncio
 import urllib.parse
 from typing import List
 
@@ -33,6 +34,9 @@ class Luebeck(ScraperBase):
         attribution_url=None,
     )
 
+    # the lot infos are scraped from one detail page per lot, refresh them once a day
+    LOT_INFO_TTL = 24 * 60 * 60
+
     def get_lot_data(self) -> List[LotData]:
         """
         Expects lot data in a structure like the following:
@@ -107,10 +111,10 @@ class Luebeck(ScraperBase):
 
         return lots
 
-    def get_lot_infos(self) -> List[LotInfo]:
-        soup = self.request_soup(self.POOL.public_url)
+    async def aget_lot_infos(self) -> List[LotInfo]:
+        soup = await self.arequest_soup(self.POOL.public_url)
 
-        lots = []
+        lot_kwargs = []
         for lot_tag in soup.find("div", id="infos").find_all("div", class_="location-list--item"):
 
             free_tag = lot_tag.find("div", class_="free-live-spots")
@@ -122,24 +126,30 @@ class Luebeck(ScraperBase):
 
             public_url = urllib.parse.urljoin(self.POOL.public_url, lot_tag.find("a")["href"])
 
-            lots.append(
-                LotInfo(
-                    id=name_to_legacy_id("luebeck", lot_name),
-                    name=lot_name,
-                    type=guess_lot_type(lot_tag["data-art"]),
-                    capacity=capacity,
-                    latitude=float_or_none(lot_tag["data-lat"]),
-                    longitude=float_or_none(lot_tag["data-lng"]),
-                    public_url=public_url,
-                    has_live_capacity=True,
-                    **self.get_lot_page_infos(public_url),
-                )
-            )
-
-        return lots
-
-    def get_lot_page_infos(self, url: str) -> dict:
-        soup = self.request_soup(url)
+            lot_kwargs.append(dict(
+                id=name_to_legacy_id("luebeck", lot_name),
+                name=lot_name,
+                type=guess_lot_type(lot_tag["data-art"]),
+                capacity=capacity,
+                latitude=float_or_none(lot_tag["data-lat"]),
+                longitude=float_or_none(lot_tag["data-lng"]),
+                public_url=public_url,
+                has_live_capacity=True,
+            ))
+
+        # fetch all detail pages concurrently
+        page_infos = await asyncio.gather(*(
+            self.aget_lot_page_infos(kwargs["public_url"])
+            for kwargs in lot_kwargs
+        ))
+
+        return [
+            LotInfo(**kwargs, **page_info)
+            for kwargs, page_info in zip(lot_kwargs, page_infos)
+        ]
+
+    async def aget_lot_page_infos(self, url: str) -> dict:
+        soup = await self.arequest_soup(url)
 
         address = get_soup_text(soup.find("div", class_="long-parking-address"))
         if address.startswith("Adresse"):
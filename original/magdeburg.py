@@ -103,7 +103,7 @@ class Magdeburg(ScraperBase):
                 startingPoint = 1
             parking_name = one_row[startingPoint+0].text.strip()
 
-            kwargs = vars(lot_map[parking_name])
+            kwargs = lot_map[parking_name].to_dict()
 
             kwargs.update(dict(
                 has_live_capacity=True,
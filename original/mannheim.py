@@ -103,7 +103,7 @@ class Mannheim(ScraperBase):
             link = div_level3[count+1].find("a")
             count += 3
             
-            kwargs = vars(lot_map[lot_id]) if lot_id in lot_map else {}
+            kwargs = lot_map[lot_id].to_dict() if lot_id in lot_map else {}
             kwargs.update(dict(
                 id=lot_id,
                 name=parking_name,
@@ -88,7 +88,7 @@ class Muenster(ScraperBase):
             coord = feature['geometry']['coordinates']
             (lot_type, parking_name, parking_legacy_name) = self.process_name(props.get('NAME'))
             
-            kwargs = vars(lot_map[parking_name]) if parking_name in lot_map else {}
+            kwargs = lot_map[parking_name].to_dict() if parking_name in lot_map else {}
             kwargs.update(dict(
                 id=parking_legacy_name,
                 name=parking_name,
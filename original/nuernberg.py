@@ -108,7 +108,7 @@ class Nuernberg(ScraperBase):
             if link:
                 urllib.parse.urljoin(self.POOL.public_url, link["href"])
 
-            kwargs = vars(lot_map[NEW_TO_LEGACY_NAME_MAP.get(parking_name, parking_name)])
+            kwargs = lot_map[NEW_TO_LEGACY_NAME_MAP.get(parking_name, parking_name)].to_dict()
             kwargs.update(dict(
                 public_url=public_url,
                 has_live_capacity=True,
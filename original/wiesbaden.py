@@ -83,7 +83,7 @@ class Wiesbaden(ScraperBase):
             name = attributes["name"]
             legacy_id = self.name_to_legacy_id(name)
 
-            kwargs = vars(lot_map[legacy_id]) if legacy_id in lot_map else {}
+            kwargs = lot_map[legacy_id].to_dict() if legacy_id in lot_map else {}
             kwargs.update(dict(
                 name=name,
                 id=legacy_id,
@@ -84,7 +84,7 @@ class Zuerich(ScraperBase):
             name, address, type = self.parse_title(entry["title"])
 
             if name in lot_map:
-                kwargs = vars(lot_map[name])
+                kwargs = lot_map[name].to_dict()
             else:
                 warnings.warn(f"Lot '{name}' not in original geojson")
                 kwargs = {
@@ -1,16 +1,18 @@
+import sys
 import json
-import os
 import datetime
 from pathlib import Path
 import argparse
-import glob
-import importlib
+import atexit
+import signal
 import inspect
-import itertools
-from typing import Union, Optional, Tuple, List, Type, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Optional, Tuple, List, Type, Dict, Callable, Iterable
 
-from util import ScraperBase, SnapshotMaker, log
-from util.validate import validate_snapshot
+from util import ScraperBase, SnapshotMaker, SnapshotSink, log
+from util.cache import conditional_namespace
+from util.delta import DeltaTracker
+from util.registry import ScraperRegistry
 
 
 MODULE_DIR: Path = Path(__file__).resolve().parent
@@ -33,9 +35,16 @@ def parse_args() -> dict:
 
     parser.add_argument(
         "command", type=str,
-        choices=["list", "scrape", "validate", "validate-text", "show-geojson", "write-geojson"],
+        choices=["list", "scrape", "validate", "validate-text", "show-geojson", "write-geojson", "cache",
+                 "profile-startup", "serve", "analyze"],
         help="The command to execute",
     )
+    parser.add_argument(
+        "cache_command", type=str, nargs="?", default="stats",
+        choices=["stats", "prune", "clear"],
+        help="Sub-command of the 'cache' command: Show statistics, remove expired entries"
+             " or remove all entries (of the pools specified with '-p')"
+    )
     parser.add_argument(
         "-p", "--pools", nargs="+", type=str,
         help=f"Filter for one or more pool IDs"
@@ -51,79 +60,208 @@ def parse_args() -> dict:
         help="Maximum error priority to display in validation [0-4]. 0 = severe, 1 = should really fix that"
              ", 2 = should fix that at some point, etc.."
     )
+    parser.add_argument(
+        "--max-errors", type=int, default=None,
+        help="Maximum number of schema errors per pool to display in validation, defaults to 100"
+    )
+    parser.add_argument(
+        "--max-age", type=float, default=None,
+        help=f"Maximum age of cached responses in seconds for 'cache prune'"
+             f", defaults to {ScraperBase.CACHE_TTL}"
+    )
+    parser.add_argument(
+        "--max-size", type=float, default=None,
+        help=f"Maximum size of cached responses in megabytes for 'cache prune'"
+             f", defaults to {ScraperBase.CACHE_MAX_SIZE / 1024 / 1024 if ScraperBase.CACHE_MAX_SIZE else None}"
+    )
+    parser.add_argument(
+        "--info-ttl", type=float, default=None,
+        help="Reuse scraped lot infos for this number of seconds (stored in the cache directory)"
+             ". Pools with a geojson file are not affected. Defaults to each scraper's LOT_INFO_TTL"
+    )
+    parser.add_argument(
+        "--refresh-infos", action="store_true",
+        help="Scrape the lot infos and update the lot info cache regardless of its age"
+    )
+    parser.add_argument(
+        "-f", "--format", type=str, default="json", choices=["json", "ndjson"], dest="output_format",
+        help="Output format of 'scrape' and 'validate'. 'json' writes one array"
+             ", 'ndjson' writes one snapshot or validation message per line."
+             " Each snapshot is written as soon as it is available"
+    )
+    parser.add_argument(
+        "-s", "--sink", type=str, default=None,
+        help="Write the snapshots of 'scrape' and 'serve' to a sink instead of stdout"
+             ": 'ndjson:<filename>' (rotated at 100mb), 'sqlite:<filename>', 'columnar:<directory>'"
+             " or 'http(s)://...' to POST batches of snapshots as json"
+    )
+    parser.add_argument(
+        "--delta", action="store_true",
+        help="Only output the lots whose status, free spaces or capacity changed since the previous"
+             " snapshot of the pool (stored in the cache directory), with a full snapshot every --keyframe-interval"
+    )
+    parser.add_argument(
+        "--keyframe-interval", type=float, default=3600.,
+        help="Seconds between two full snapshots of a pool with --delta"
+    )
+    parser.add_argument(
+        "--archive", type=str, default=None,
+        help="Directory of a columnar snapshot archive (see '--sink columnar:<directory>') for 'analyze'"
+    )
+    parser.add_argument(
+        "--timezone", type=str, default="Europe/Berlin",
+        help="Timezone of the hourly and weekday profiles of 'analyze'"
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record", type=str, default=None, metavar="DIRECTORY",
+        help="Record all HTTP exchanges into one cassette file per pool in DIRECTORY"
+    )
+    cassette_group.add_argument(
+        "--replay", type=str, default=None, metavar="DIRECTORY",
+        help="Replay the HTTP exchanges from the cassette files in DIRECTORY without network access"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=None,
+        help="Number of pools that are scraped concurrently, defaults to 1 and to 4 for 'serve'."
+             " Each pool still honors its own REQUESTS_PER_SECOND limit and the output order is not affected"
+    )
 
-    return vars(parser.parse_args())
+    args = parser.parse_args()
+
+    if args.command == "analyze":
+        if not args.archive:
+            parser.error("analyze requires --archive <directory>")
+        if not Path(args.archive).is_dir():
+            parser.error(f"archive directory '{args.archive}' does not exist")
+        if not any(Path(args.archive).glob("chunk-*.npz")):
+            parser.error(f"archive directory '{args.archive}' contains no chunks")
+
+    return vars(args)
+
+
+def get_registry() -> ScraperRegistry:
+    return ScraperRegistry(MODULE_DIR, ScraperBase.CACHE_DIR / "scraper-manifest.json")
 
 
 def get_scrapers(
         pool_filter: List[str],
 ) -> Dict[str, Type["ScraperBase"]]:
+    """
+    Return the scraper classes by pool ID.
 
-    scrapers = dict()
-    all_scrapers = dict()
+    If `pool_filter` is given, only the modules of these pools are imported.
+    """
+    return get_registry().get_scrapers(pool_filter=pool_filter)
 
-    for filename in itertools.chain(
-            glob.glob(str(MODULE_DIR / "*.py")),
-            glob.glob(str(MODULE_DIR / "*" / "*.py"))
-    ):
-        filename = Path(filename)
-        if filename.parent.name in ("tests", "util"):
-            continue
 
-        module_name = str(filename.relative_to(MODULE_DIR))[:-3].replace(os.path.sep, ".")
-        if module_name == "scraper":
-            continue
-
-        module = importlib.import_module(module_name)
-        for key, scraper_class in vars(module).items():
-            if not inspect.isclass(scraper_class) or not getattr(scraper_class, "POOL", None):
-                continue
+def iter_snapshots(
+        scrapers: Dict[str, Type["ScraperBase"]],
+        pool_ids: List[str],
+        cache: Union[bool, str],
+        workers: int = 1,
+        infos_required: bool = False,
+        info_ttl: Optional[float] = None,
+        refresh_infos: bool = False,
+        sink: Optional[SnapshotSink] = None,
+        delta_tracker: Optional[DeltaTracker] = None,
+) -> Iterable[Tuple[str, dict]]:
+    """
+    Scrape the snapshot of each pool and yield `(pool_id, snapshot)` tuples.
+
+    With `workers` > 1 the pools are scraped concurrently in a thread pool.
+    Each pool gets its own scraper instance, so the per-pool request throttling
+    stays the same. The tuples are always yielded in the order of `pool_ids`.
+
+    `info_ttl`, `refresh_infos`, `sink` and `delta_tracker` are passed to the SnapshotMaker.
+    """
+    def _get_snapshot(pool_id: str) -> dict:
+        log(f"scraping pool '{pool_id}'")
+        scraper = scrapers[pool_id](caching=cache)
+        snapshotter = SnapshotMaker(
+            scraper, info_ttl=info_ttl, refresh_infos=refresh_infos, sink=sink, delta_tracker=delta_tracker,
+        )
+        return snapshotter.get_snapshot(infos_required=infos_required)
+
+    if workers <= 1 or len(pool_ids) <= 1:
+        for pool_id in pool_ids:
+            yield pool_id, _get_snapshot(pool_id)
 
-            # --- some validation of the POOL info ---
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from zip(pool_ids, executor.map(_get_snapshot, pool_ids))
 
-            if scraper_class.POOL.id in all_scrapers:
-                raise ValueError(
-                    f"{scraper_class.__name__}.POOL.id '{scraper_class.POOL.id}'"
-                    f" is already used by class {all_scrapers[scraper_class.POOL.id].__name__}"
-                )
 
-            # --
+def iter_validations(
+        snapshots: Iterable[Tuple[str, dict]],
+        max_errors: Optional[int] = None,
+) -> Iterable[Tuple[str, dict]]:
+    """
+    Validate each `(pool_id, snapshot)` and yield `(pool_id, validation)` tuples in the same order.
 
-            all_scrapers[scraper_class.POOL.id] = scraper_class
+    Validation runs in the calling thread. With the compiled schema checker it takes
+    a few milliseconds per snapshot, while iter_snapshots() keeps scraping the following
+    pools in its worker threads.
 
-            if pool_filter and scraper_class.POOL.id not in pool_filter:
-                continue
+    :param max_errors: int, maximum number of schema errors per snapshot,
+        defaults to util.validate.DEFAULT_MAX_ERRORS
+    """
+    from util.validate import validate_snapshot, DEFAULT_MAX_ERRORS
 
-            scrapers[scraper_class.POOL.id] = scraper_class
+    if max_errors is None:
+        max_errors = DEFAULT_MAX_ERRORS
 
-    return scrapers
+    for pool_id, snapshot in snapshots:
+        yield pool_id, validate_snapshot(snapshot, max_errors=max_errors)
 
 
 class JsonPrinter:
-    def __init__(self):
+    """
+    Writes json to stdout (or `file`) incrementally.
+
+    Inside the context, each printed object becomes an element of a
+    json array and is written as soon as it is printed, so consumers can
+    start reading before all data is available. With `ndjson=True`,
+    each object is written as a single compact line instead and the
+    context does not add brackets.
+    """
+    def __init__(self, file=None, ndjson: bool = False):
+        self.file = file
+        self.ndjson = ndjson
         self.levels = 0
         self.first_entry = True
 
     def print(self, data: Union[list, dict]):
+        file = self.file or sys.stdout
+        if self.ndjson:
+            file.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n")
+            file.flush()
+            return
+
         if not self.first_entry:
-            print(",")
+            file.write(",\n")
         self.first_entry = False
 
-        text = json.dumps(data, indent=2, ensure_ascii=False)
-
+        text = json.dumps(data, ensure_ascii=False, indent=2)
         if self.levels:
-            text = "\n".join("  " * self.levels + line for line in text.splitlines())
-        print(text, end="" if self.levels else "\n")
+            indent = "  " * self.levels
+            # json strings never contain literal newlines
+            text = indent + text.replace("\n", "\n" + indent)
+        file.write(text if self.levels else text + "\n")
+        file.flush()
 
     def __enter__(self):
         """Start a list and indent all the following contents"""
-        self.levels += 1
-        print("[")
+        if not self.ndjson:
+            self.levels += 1
+            (self.file or sys.stdout).write("[\n")
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.levels -= 1
-        print("\n]")
+        if not self.ndjson:
+            self.levels -= 1
+            (self.file or sys.stdout).write("\n]\n" if not self.first_entry else "]\n")
+            (self.file or sys.stdout).flush()
 
 
 def print_validations(validations: List[dict], file=None):
@@ -161,45 +299,143 @@ def main(
         cache: Union[bool, str],
         pools: List[str],
         max_priority: int,
+        workers: Optional[int] = None,
+        max_errors: Optional[int] = None,
+        cache_command: str = "stats",
+        max_age: Optional[float] = None,
+        max_size: Optional[float] = None,
+        info_ttl: Optional[float] = None,
+        refresh_infos: bool = False,
+        output_format: str = "json",
+        sink: Optional[str] = None,
+        delta: bool = False,
+        keyframe_interval: float = 3600.,
+        archive: Optional[str] = None,
+        timezone: str = "Europe/Berlin",
+        record: Optional[str] = None,
+        replay: Optional[str] = None,
 ):
-    scrapers = get_scrapers(pool_filter=pools)
-    pool_ids = sorted(scrapers)
+    if command == "cache":
+        response_cache = ScraperBase.get_response_cache()
+        if cache_command == "prune":
+            num_removed = response_cache.prune(
+                ttl=ScraperBase.CACHE_TTL if max_age is None else max_age,
+                max_size=None if max_size is None else int(max_size * 1024 * 1024),
+            )
+            log(f"removed {num_removed} cached responses")
+        elif cache_command == "clear":
+            num_removed = response_cache.clear(namespaces=pools)
+            log(f"removed {num_removed} cached responses")
+
+        stats = response_cache.stats()
+        if pools:
+            namespaces = {*pools, *(conditional_namespace(pool_id) for pool_id in pools)}
+            stats["namespaces"] = {key: value for key, value in stats["namespaces"].items() if key in namespaces}
+        print(json.dumps(stats, indent=2))
+        return
+
+    if command == "profile-startup":
+        from util.profiling import profile_startup
+
+        report = profile_startup(MODULE_DIR, get_registry().manifest_filename, pool_filter=pools)
+        print(json.dumps(report, indent=2))
+        return
+
+    if command == "analyze":
+        from util.columnar import ColumnarTable
+        from util.analytics import analyze
+
+        if not archive:
+            raise ValueError("Specify the snapshot archive with '--archive <directory>'")
+        table = ColumnarTable.load(archive)
+        report = analyze(table, timezone=timezone)
+        if pools:
+            report["pools"] = {key: value for key, value in report["pools"].items() if key in pools}
+            report["lots"] = {key: value for key, value in report["lots"].items() if value["pool"] in pools}
+        print(json.dumps(report, indent=2))
+        return
 
     if command == "list":
+        pool_ids = get_registry().pool_ids()
+        if pools:
+            pool_ids = [pool_id for pool_id in pool_ids if pool_id in pools]
         print(json.dumps(pool_ids, indent=2))
+        return
 
-    elif command == "scrape":
+    if record or replay:
+        from util.cassette import cassettes
 
-        snapshots = []
+        cassettes.configure(record or replay, mode="record" if record else "replay")
+        if record:
+            atexit.register(cassettes.save)
 
-        for pool_id in pool_ids:
-            log(f"scraping pool '{pool_id}'")
-            scraper = scrapers[pool_id](caching=cache)
-            snapshotter = SnapshotMaker(scraper)
-            snapshot = snapshotter.get_snapshot(infos_required=False)
-            snapshots.append(snapshot)
+    scrapers = get_scrapers(pool_filter=pools)
+    pool_ids = sorted(scrapers)
 
-        JsonPrinter().print(snapshots)
+    if workers is None and command != "serve":
+        # 'serve' uses the default of ScrapeScheduler
+        workers = 1
 
-    elif command in ("validate", "validate-text"):
+    delta_tracker = None
+    if delta:
+        delta_tracker = DeltaTracker(
+            # the daemon keeps the previous snapshots in memory
+            directory=None if command == "serve" else ScraperBase.CACHE_DIR / "delta",
+            keyframe_interval=keyframe_interval,
+        )
 
-        validations = []
+    if command == "scrape" and sink:
+        from util.sinks import sink_from_string
 
-        for pool_id in pool_ids:
-            log(f"scraping pool '{pool_id}'")
-            scraper = scrapers[pool_id](caching=cache)
-            snapshotter = SnapshotMaker(scraper)
-            snapshot = snapshotter.get_snapshot(infos_required=False)
+        with sink_from_string(sink) as snapshot_sink:
+            for pool_id, snapshot in iter_snapshots(
+                    scrapers, pool_ids, cache=cache, workers=workers, info_ttl=info_ttl, refresh_infos=refresh_infos,
+                    sink=snapshot_sink, delta_tracker=delta_tracker,
+            ):
+                pass
+
+    elif command == "scrape":
+
+        with JsonPrinter(ndjson=output_format == "ndjson") as printer:
+            for pool_id, snapshot in iter_snapshots(
+                    scrapers, pool_ids, cache=cache, workers=workers, info_ttl=info_ttl, refresh_infos=refresh_infos,
+                    delta_tracker=delta_tracker,
+            ):
+                printer.print(snapshot)
 
-            validation = validate_snapshot(snapshot)
-            for message in validation["validations"]:
-                if message["priority"] <= max_priority:
-                    validations.append({"pool_id": pool_id, "validation": message})
+    elif command in ("validate", "validate-text"):
+        snapshots = iter_snapshots(
+            scrapers, pool_ids, cache=cache, workers=workers, info_ttl=info_ttl, refresh_infos=refresh_infos,
+        )
+        validations = (
+            {"pool_id": pool_id, "validation": message}
+            for pool_id, validation in iter_validations(snapshots, max_errors=max_errors)
+            for message in validation["validations"]
+            if message["priority"] <= max_priority
+        )
 
         if command == "validate-text":
-            print_validations(validations)
+            print_validations(list(validations))
         else:
-            JsonPrinter().print(validations)
+            with JsonPrinter(ndjson=output_format == "ndjson") as printer:
+                for validation in validations:
+                    printer.print(validation)
+
+    elif command == "serve":
+        from util.daemon import ScrapeScheduler
+        from util.sinks import sink_from_string
+
+        with sink_from_string(sink or "-") as snapshot_sink:
+            scheduler = ScrapeScheduler(
+                scrapers, sink=snapshot_sink, caching=cache, workers=workers, default_info_ttl=info_ttl,
+                delta_tracker=delta_tracker,
+            )
+            signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+            log(f"serving {len(scrapers)} pools")
+            try:
+                scheduler.run()
+            except KeyboardInterrupt:
+                scheduler.stop()
 
     elif command in ("show-geojson", "write-geojson"):
 
@@ -19,6 +19,7 @@ from openpyxl.reader.excel import load_workbook
 from common.base_converter import BaseConverter, CsvConverter, JsonConverter, PullConverter, XlsxConverter, XmlConverter
 from common.encoding import DefaultJSONEncoder
 from common.models import ImportSourceResult
+from util.cassette import cassettes
 
 
 def main():
@@ -27,16 +28,26 @@ def main():
         description='This script helps to develop ParkAPI-Sources converter',
     )
     parser.add_argument('source_uid')
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record', metavar='DIRECTORY', help='Record all HTTP exchanges into DIRECTORY/<source_uid>.json')
+    cassette_group.add_argument('--replay', metavar='DIRECTORY', help='Replay the HTTP exchanges from DIRECTORY/<source_uid>.json')
     args = parser.parse_args()
     source_uid: str = args.source_uid
 
+    if args.record or args.replay:
+        cassettes.configure(args.record or args.replay, mode='record' if args.record else 'replay')
+
     converter: PullConverter = get_converter(source_uid)
 
-    result: ImportSourceResult = converter.get_static_parking_sites()
-    print_result(result)
+    try:
+        result: ImportSourceResult = converter.get_static_parking_sites()
+        print_result(result)
 
-    result: ImportSourceResult = converter.get_realtime_parking_sites()
-    print_result(result)
+        result: ImportSourceResult = converter.get_realtime_parking_sites()
+        print_result(result)
+    finally:
+        # keep the exchanges recorded until a failure
+        cassettes.save()
 
 
 def print_result(result: ImportSourceResult):
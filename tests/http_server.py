@@ -0,0 +1,78 @@
+"""
+A tiny local web server for tests that must not touch the internet
+"""
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Dict, Tuple, Union
+
+
+class LocalServer:
+    """
+    Serves `routes` on a random localhost port.
+
+    Each route maps a path (including the query string) to a
+    `(status, headers, body)` tuple or a callable that receives the request
+    handler and returns such a tuple. All requests are recorded in `requests`,
+    the client addresses of all (keep-alive) connections in `connections`.
+
+        with LocalServer({"/data": (200, {}, b"hello")}) as server:
+            requests.get(server.url("/data"))
+    """
+
+    def __init__(self, routes: Dict[str, Union[Tuple[int, dict, bytes], Callable]]):
+        self.routes = routes
+        self.requests = []
+        self.connections = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._respond()
+
+            def do_POST(self):
+                self._respond()
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.body = self.rfile.read(length) if length else b""
+                server.requests.append((self.command, self.path, dict(self.headers), self.body))
+                server.connections.add(self.client_address)
+
+                route = server.routes.get(self.path)
+                if route is None:
+                    status, headers, body = 404, {}, b"not found"
+                elif callable(route):
+                    status, headers, body = route(self)
+                else:
+                    status, headers, body = route
+
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body).encode("utf-8")
+                    headers = {"Content-Type": "application/json", **headers}
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path: str = "/") -> str:
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.server.shutdown()
+        self.server.server_close()
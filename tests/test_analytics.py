@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from util.columnar import ColumnarWriter, ColumnarTable, STATUSES
+from util.analytics import (
+    occupancy, hourly_profile, weekday_profile, utilization_percentiles, status_counts, data_gaps, analyze,
+)
+
+
+def make_table(rows: list) -> ColumnarTable:
+    """
+    rows: list of (pool_id, lot_id, unix seconds, status, num_free, capacity)
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        writer = ColumnarWriter(temp_dir)
+        for pool_id, lot_id, timestamp, status, num_free, capacity in rows:
+            writer.append_snapshot({
+                "pool": {"id": pool_id},
+                "lots": [{
+                    "id": lot_id, "timestamp": np.datetime_as_string(np.datetime64(timestamp, "s")),
+                    "status": status, "num_free": num_free, "capacity": capacity,
+                }],
+            })
+        writer.flush()
+        return ColumnarTable.load(temp_dir)
+
+
+# 2024-01-01 00:00 UTC, a monday
+MONDAY = 1704067200
+
+
+class TestAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        self.table = make_table([
+            ("p", "a", MONDAY, "open", 10, 10),
+            ("p", "a", MONDAY + 60, "open", 5, 10),
+            ("p", "a", MONDAY + 3600, "open", 0, 10),
+            ("p", "a", MONDAY + 3600 * 24 + 60 * 10, "closed", 2, 10),
+            ("p", "b", MONDAY, "nodata", None, 20),
+            ("p", "b", MONDAY + 60, "open", 15, 20),
+            ("q", "c", MONDAY, "open", 1, None),
+        ])
+
+    def test_occupancy(self):
+        np.testing.assert_allclose([0, .5, 1, .8, np.nan, .25, np.nan], occupancy(self.table))
+
+    def test_profiles(self):
+        hourly = hourly_profile(self.table)
+        self.assertEqual((3, 24), hourly.shape)
+        np.testing.assert_allclose([(0 + .5 + .8) / 3, 1.], hourly[0, :2])
+        self.assertTrue(np.isnan(hourly[2]).all())
+
+        # Europe/Berlin is UTC+1 in january
+        hourly = hourly_profile(self.table, timezone="Europe/Berlin")
+        np.testing.assert_allclose([(0 + .5 + .8) / 3, 1.], hourly[0, 1:3])
+
+        weekdays = weekday_profile(self.table)
+        np.testing.assert_allclose([.25, 1.], weekdays[0, 0, :2])
+        np.testing.assert_allclose([.8], weekdays[0, 1, :1])
+
+    def test_percentiles(self):
+        percentiles = utilization_percentiles(self.table, (0, 50, 100))
+        np.testing.assert_allclose([[0, .65, 1], [.25, .25, .25]], percentiles[:2])
+        self.assertTrue(np.isnan(percentiles[2]).all())
+
+    def test_status_and_gaps(self):
+        counts = status_counts(self.table)
+        self.assertEqual(3, counts[0, STATUSES.index("open")])
+        self.assertEqual(1, counts[0, STATUSES.index("closed")])
+        self.assertEqual(1, counts[1, STATUSES.index("nodata")])
+        self.assertEqual([2, 0, 0], data_gaps(self.table, 120).tolist())
+
+    def test_analyze(self):
+        report = analyze(self.table, max_interval=120)
+        self.assertEqual(7, report["rows"])
+        self.assertEqual({"lots": 2, "samples": 6, "mean_occupancy": round((2.3 + .25) / 5, 4)}, report["pools"]["p"])
+        self.assertEqual("q", report["lots"]["c"]["pool"])
+        self.assertIsNone(report["lots"]["c"]["mean_occupancy"])
+        self.assertEqual({"open": 3, "closed": 1}, report["lots"]["a"]["status"])
+        self.assertEqual(2, report["lots"]["a"]["gaps"])
+        self.assertEqual(24, len(report["lots"]["a"]["hourly"]))
+        self.assertEqual(7, len(report["lots"]["a"]["weekdays"]))
+
+    def test_empty(self):
+        report = analyze(ColumnarTable.load("/nonexistent"))
+        self.assertEqual({"rows": 0, "timezone": "UTC", "gap_interval": 0., "pools": {}, "lots": {}}, report)
@@ -0,0 +1,115 @@
+import json
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from benchmarks.parse import (
+    measure, compare, run_benchmarks, RequestRecorder, BASELINE_VERSION, BASELINE_FILENAME, FIXTURE_DIR,
+)
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_measure(self):
+        result = measure(lambda: [list(range(100)) for i in range(100)], repeat=3)
+        self.assertGreater(result["seconds"], 0)
+        self.assertLessEqual(result["min_seconds"], result["seconds"])
+        self.assertGreater(result["peak_bytes"], 100 * 100 * 8)
+        # the result is retained until after the snapshot
+        self.assertGreaterEqual(result["retained_blocks"], 100)
+
+    def test_measure_peak_excludes_previous_memory(self):
+        tracemalloc.start()
+        try:
+            previous_traced = bytearray(10 * 1024 * 1024)
+            result = measure(lambda: bytearray(1024 * 1024), repeat=1)
+            # the tracing of the caller goes on
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+        del previous_traced
+        self.assertGreaterEqual(result["peak_bytes"], 1024 * 1024)
+        self.assertLess(result["peak_bytes"], 2 * 1024 * 1024)
+
+    def test_request_recorder(self):
+        class Client:
+            def __init__(self):
+                self.urls = []
+
+            def request(self, url: str, method: str = "GET"):
+                self.urls.append(url)
+                return url.upper()
+
+        client = Client()
+        recorder = RequestRecorder(client)
+
+        def _parse():
+            return [client.request("a"), client.request("b", method="POST")]
+
+        requests_only = recorder.record(_parse)
+        self.assertEqual(["a", "b"], client.urls)
+
+        requests_only()
+        self.assertEqual(["a", "b", "a", "b"], client.urls)
+
+        result = measure(_parse, repeat=2, baseline=requests_only)
+        self.assertIn("request_seconds", result)
+        self.assertGreaterEqual(result["seconds"], 0)
+
+    def test_compare(self):
+        baseline = {
+            "version": BASELINE_VERSION,
+            "results": {
+                "fast:get_lot_data": {"seconds": .0001},
+                "slow:get_lot_data": {"seconds": .1},
+                "stable:get_lot_data": {"seconds": .1},
+            },
+        }
+        report = {
+            "results": {
+                # relative slowdown below the noise floor
+                "fast:get_lot_data": {"seconds": .0005},
+                "slow:get_lot_data": {"seconds": .2},
+                "stable:get_lot_data": {"seconds": .11},
+                "new:get_lot_data": {"seconds": 1.},
+            },
+        }
+        self.assertEqual(
+            [{"name": "slow:get_lot_data", "seconds": .2, "baseline_seconds": .1, "ratio": 2.}],
+            compare(report, baseline, threshold=.25),
+        )
+
+    def test_compare_fastest_runs(self):
+        baseline = {"version": BASELINE_VERSION, "results": {"a:get_lot_data": {"seconds": .1, "min_seconds": .09}}}
+        # a noisy median, but the fastest run is as fast as before
+        report = {"results": {"a:get_lot_data": {"seconds": .2, "min_seconds": .1}}}
+        self.assertEqual([], compare(report, baseline, threshold=.25))
+
+    def test_committed_fixtures(self):
+        report = run_benchmarks(fixture_dir=FIXTURE_DIR, repeat=1)
+        self.assertEqual(
+            [
+                "braunschweig:get_lot_data",
+                "braunschweig:get_lot_infos",
+                "neckarsulm:handle_csv_string",
+                "pforzheim:handle_json",
+                "reutlingen:handle_csv_string",
+            ],
+            sorted(report["results"]),
+        )
+        self.assertEqual({"no fixture"}, set(report["skipped"].values()))
+        self.assertEqual(set(report["results"]), set(json.loads(BASELINE_FILENAME.read_text())["results"]))
+
+    def test_missing_fixtures(self):
+        with tempfile.TemporaryDirectory() as fixture_dir:
+            report = run_benchmarks(pool_filter=["ulm", "pbw"], fixture_dir=Path(fixture_dir), repeat=1)
+        self.assertEqual({}, report["results"])
+        self.assertEqual({"ulm": "no fixture", "pbw": "no fixture"}, report["skipped"])
+
+    def test_push_converter_fixture(self):
+        with tempfile.TemporaryDirectory() as fixture_dir:
+            (Path(fixture_dir) / "pforzheim.json").write_text("[]")
+            report = run_benchmarks(pool_filter=["pforzheim"], fixture_dir=Path(fixture_dir), repeat=1)
+        self.assertEqual(["pforzheim:handle_json"], list(report["results"]))
+        self.assertEqual({}, report["skipped"])
@@ -0,0 +1,97 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import requests
+
+from common.http_client import HttpClient
+from util import *
+from util.cassette import cassettes, request_key, CassetteMissError
+from http_server import LocalServer
+
+
+class CassetteScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="cassette-test",
+        name="Cassette Test",
+        public_url="https://example.com",
+    )
+    REQUESTS_PER_SECOND = None
+
+
+class TestCassette(unittest.TestCase):
+
+    def setUp(self):
+        host_rate_limiter.reset()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+        self.counter = 0
+
+        def _counter(handler):
+            self.counter += 1
+            return 200, {}, {"count": self.counter}
+
+        self.server = LocalServer({
+            "/data?a=1&b=2&key=secret": (200, {}, {"version": 1}),
+            "/counter": _counter,
+            "/post": lambda handler: (200, {}, json.loads(handler.body)),
+        })
+
+    def tearDown(self):
+        cassettes.configure(None)
+        self.temp_dir.cleanup()
+
+    def test_record_replay(self):
+        with self.server:
+            cassettes.configure(self.directory, mode="record")
+            scraper = CassetteScraper()
+            self.assertEqual({"version": 1}, scraper.request_json(self.server.url("/data"), params={"a": 1, "b": 2, "key": "secret"}))
+            self.assertEqual({"count": 1}, scraper.request_json(self.server.url("/counter")))
+            self.assertEqual({"count": 2}, scraper.request_json(self.server.url("/counter")))
+            self.assertEqual({"x": 1, "y": 2}, scraper.request_json(self.server.url("/post"), method="POST", json={"x": 1, "y": 2}))
+            cassettes.save()
+            url = self.server.url
+
+        cassette_text = (self.directory / "cassette-test.json").read_text()
+        self.assertNotIn("secret", cassette_text)
+        self.assertEqual(1, json.loads(cassette_text)["version"])
+
+        # the server is down now
+        cassettes.configure(self.directory, mode="replay")
+        scraper = CassetteScraper()
+        # the query parameters are matched in any order and the filtered key with any value
+        self.assertEqual({"version": 1}, scraper.request_json(url("/data"), params={"key": "other", "b": 2, "a": 1}))
+        # repeated requests are replayed in order, the last one is repeated
+        self.assertEqual({"count": 1}, scraper.request_json(url("/counter")))
+        self.assertEqual({"count": 2}, scraper.request_json(url("/counter")))
+        self.assertEqual({"count": 2}, scraper.request_json(url("/counter")))
+        # json bodies are matched by content
+        self.assertEqual({"x": 1, "y": 2}, scraper.request_json(url("/post"), method="POST", data='{"y": 2, "x": 1}'))
+
+        with self.assertRaises(CassetteMissError):
+            scraper.request_json(url("/data"), params={"a": 2})
+
+    def test_http_client(self):
+        with self.server:
+            cassettes.configure(self.directory, mode="record")
+            self.assertEqual({"count": 1}, HttpClient("cassette-client").get_json(self.server.url("/counter")))
+            cassettes.save()
+            url = self.server.url
+
+        cassettes.configure(self.directory, mode="replay")
+        self.assertEqual({"count": 1}, HttpClient("cassette-client").get_json(url("/counter")))
+
+    def test_request_key(self):
+        self.assertEqual(
+            request_key("get", "HTTPS://Example.com/path?b=2&a=1"),
+            request_key("GET", "https://example.com/path?a=1&b=2"),
+        )
+        self.assertEqual(
+            request_key("POST", "https://example.com", "b=2&a=1"),
+            request_key("POST", "https://example.com/", b"a=1&b=2"),
+        )
+        self.assertNotEqual(
+            request_key("GET", "https://example.com/path?a=1"),
+            request_key("GET", "https://example.com/path?a=2"),
+        )
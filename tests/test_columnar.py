@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from util.columnar import ColumnarWriter, ColumnarSink, ColumnarTable, STATUSES
+from util.sinks import sink_from_string
+
+
+def make_snapshot(pool_id: str, timestamp: str, **num_free) -> dict:
+    return {
+        "pool": {"id": pool_id},
+        "lots": [
+            {
+                "id": lot_id, "timestamp": timestamp, "status": "open" if value is not None else "nodata",
+                "num_free": value, "capacity": 10,
+            }
+            for lot_id, value in num_free.items()
+        ],
+    }
+
+
+class TestColumnar(unittest.TestCase):
+
+    def test_write_and_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = ColumnarWriter(temp_dir, chunk_rows=3)
+            writer.append_snapshot(make_snapshot("p1", "2020-01-01T00:00:00", a=1, b=None))
+            writer.append_snapshot(make_snapshot("p2", "2020-01-01T00:01:00", c=3))
+            self.assertEqual(0, writer.num_rows)
+            writer.append_snapshot({"pool": {"id": "p3"}, "lots": [], "error": "Error"})
+            writer.append_snapshot(make_snapshot("p1", "2020-01-01T00:02:00+01:00", b=4))
+            writer.flush()
+
+            # another run appends to the same directory
+            with sink_from_string(f"columnar:{temp_dir}") as sink:
+                self.assertIsInstance(sink, ColumnarSink)
+                sink.write(make_snapshot("p2", "2020-01-01T00:03:00", c=5, a=6))
+
+            table = ColumnarTable.load(temp_dir)
+
+        self.assertEqual(6, len(table))
+        self.assertEqual(["a", "b", "c"], table.lot_ids.tolist())
+        self.assertEqual(["p1", "p2"], table.pool_ids.tolist())
+        self.assertEqual(["a", "b", "c", "b", "c", "a"], table.lot_ids[table.lot].tolist())
+        self.assertEqual(["p1", "p1", "p2", "p1", "p2", "p2"], table.pool_ids[table.pool].tolist())
+        self.assertEqual(np.int64, table.timestamp.dtype)
+        self.assertEqual(
+            [1577836800, 1577836800, 1577836860, 1577836920 - 3600, 1577836980, 1577836980],
+            table.timestamp.tolist(),
+        )
+        self.assertEqual([True, False, True, True, True, True], table.valid["num_free"].tolist())
+        self.assertEqual([1, 0, 3, 4, 5, 6], table.num_free.tolist())
+        self.assertEqual(["open", "nodata", "open"], [STATUSES[code] for code in table.status[:3]])
+        self.assertFalse(table.valid["num_occupied"].any())
+        self.assertFalse(table.valid["lot_timestamp"].any())
+
+    def test_load_empty(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            table = ColumnarTable.load(temp_dir)
+        self.assertEqual(0, len(table))
+        self.assertEqual(0, len(table.valid["num_free"]))
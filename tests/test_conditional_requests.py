@@ -0,0 +1,63 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from util import *
+from http_server import LocalServer
+
+
+class ConditionalScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="conditional-test",
+        name="Conditional Test",
+        public_url="https://example.com",
+    )
+    REQUESTS_PER_SECOND = None
+    CONDITIONAL_REQUESTS = True
+
+
+def _etag_response(handler):
+    if handler.headers.get("If-None-Match") == '"v1"':
+        return 304, {"ETag": '"v1"'}, b""
+    return 200, {"ETag": '"v1"'}, {"version": 1}
+
+
+class TestConditionalRequests(unittest.TestCase):
+
+    def setUp(self):
+        host_rate_limiter.reset()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        ConditionalScraper.CACHE_DIR = Path(self.temp_dir.name)
+        self.server = LocalServer({
+            "/static": _etag_response,
+            "/no-etag": (200, {}, {"version": 1}),
+        }).__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.temp_dir.cleanup()
+
+    def test_not_modified(self):
+        scraper = ConditionalScraper()
+        data = scraper.request_json(self.server.url("/static"))
+        self.assertEqual({"version": 1}, data)
+
+        # same instance: the parsed result is reused
+        self.assertIs(data, scraper.request_json(self.server.url("/static")))
+
+        # new instance (e.g. next cron run): the stored response is reused
+        self.assertEqual({"version": 1}, ConditionalScraper().request_json(self.server.url("/static")))
+
+        self.assertEqual(
+            [None, '"v1"', '"v1"'],
+            [headers.get("If-None-Match") for method, path, headers, body in self.server.requests]
+        )
+
+    def test_without_validator(self):
+        scraper = ConditionalScraper()
+        for i in range(2):
+            self.assertEqual({"version": 1}, scraper.request_json(self.server.url("/no-etag")))
+        self.assertEqual(
+            [None, None],
+            [headers.get("If-None-Match") for method, path, headers, body in self.server.requests]
+        )
@@ -0,0 +1,93 @@
+import threading
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from util import *
+from util.daemon import ScrapeScheduler
+
+
+class FrequentScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="frequent",
+        name="Frequent",
+        public_url="https://example.com/frequent",
+    )
+    SCRAPE_INTERVAL = .1
+    num_info_calls = 0
+
+    def get_lot_data(self) -> List[LotData]:
+        return [LotData(id=f"{self.POOL.id}-lot", timestamp=self.now(), status=LotData.Status.open, num_free=1)]
+
+    def get_lot_infos(self) -> List[LotInfo]:
+        self.__class__.num_info_calls += 1
+        return [LotInfo(id=f"{self.POOL.id}-lot", name="Lot", type=LotInfo.Types.garage, capacity=10)]
+
+
+class RareScraper(FrequentScraper):
+    POOL = PoolInfo(
+        id="rare",
+        name="Rare",
+        public_url="https://example.com/rare",
+    )
+    SCRAPE_INTERVAL = 10.
+
+
+class ListSink(SnapshotSink):
+
+    def __init__(self):
+        self.snapshots = []
+        super().__init__(batch_timeout=0.)
+
+    def write_batch(self, snapshots: List[dict]):
+        self.snapshots.extend(snapshots)
+
+
+class TestScrapeScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        FrequentScraper.CACHE_DIR = Path(self.temp_dir.name)
+        FrequentScraper.num_info_calls = 0
+        RareScraper.num_info_calls = 0
+
+    def tearDown(self):
+        del FrequentScraper.CACHE_DIR
+        self.temp_dir.cleanup()
+
+    def test_intervals(self):
+        sink = ListSink()
+        scheduler = ScrapeScheduler(
+            {"frequent": FrequentScraper, "rare": RareScraper},
+            sink=sink,
+            workers=2,
+        )
+        scheduler.run(duration=.55)
+        sink.close()
+
+        self.assertEqual(1, scheduler.num_runs["rare"])
+        self.assertGreaterEqual(scheduler.num_runs["frequent"], 4)
+        self.assertLessEqual(scheduler.num_runs["frequent"], 6)
+        self.assertEqual(sum(scheduler.num_runs.values()), len(sink.snapshots))
+        for snapshot in sink.snapshots:
+            self.assertNotIn("error", snapshot)
+            self.assertEqual(f"{snapshot['pool']['id']}-lot", snapshot["lots"][0]["id"])
+            self.assertEqual("Lot", snapshot["lots"][0]["name"])
+
+        # lot infos are scraped once and then reused in memory
+        self.assertEqual(1, FrequentScraper.num_info_calls)
+        self.assertEqual(1, RareScraper.num_info_calls)
+
+    def test_default_workers(self):
+        scheduler = ScrapeScheduler({"frequent": FrequentScraper}, sink=ListSink())
+        self.assertEqual(ScrapeScheduler.DEFAULT_WORKERS, scheduler.workers)
+        self.assertGreater(scheduler.workers, 1)
+
+    def test_stop(self):
+        sink = ListSink()
+        scheduler = ScrapeScheduler({"rare": RareScraper}, sink=sink)
+        threading.Timer(.1, scheduler.stop).start()
+        scheduler.run()
+        sink.close()
+        self.assertEqual(1, scheduler.num_runs["rare"])
@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from util import *
+from util.delta import DeltaTracker
+
+
+def make_snapshot(**num_free) -> dict:
+    return {
+        "pool": {"id": "delta-test"},
+        "lots": [
+            {"id": lot_id, "timestamp": "2020-01-01T00:00:00", "status": "open", "num_free": value}
+            for lot_id, value in num_free.items()
+        ],
+    }
+
+
+class DeltaScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="delta-test",
+        name="Delta Test",
+        public_url="https://example.com",
+    )
+    num_free = 1
+
+    def get_lot_data(self) -> List[LotData]:
+        return [
+            LotData(id="lot-1", timestamp=self.now(), status=LotData.Status.open, num_free=self.num_free),
+            LotData(id="lot-2", timestamp=self.now(), status=LotData.Status.open, num_free=5),
+        ]
+
+
+class TestDeltaTracker(unittest.TestCase):
+
+    def test_delta(self):
+        tracker = DeltaTracker()
+
+        delta = tracker.apply(make_snapshot(a=1, b=2))
+        self.assertTrue(delta["keyframe"])
+        self.assertEqual(["a", "b"], [lot["id"] for lot in delta["lots"]])
+
+        delta = tracker.apply(make_snapshot(a=1, b=2))
+        self.assertFalse(delta["keyframe"])
+        self.assertEqual([], delta["lots"])
+        self.assertEqual([], delta["removed_lots"])
+
+        delta = tracker.apply(make_snapshot(a=1, b=3, c=0))
+        self.assertEqual(["b", "c"], [lot["id"] for lot in delta["lots"]])
+
+        delta = tracker.apply(make_snapshot(b=3))
+        self.assertEqual([], delta["lots"])
+        self.assertEqual(["a", "c"], delta["removed_lots"])
+
+        error_snapshot = {**make_snapshot(), "error": "Error"}
+        self.assertIs(error_snapshot, tracker.apply(error_snapshot))
+
+        tracker.keyframe_interval = 0
+        delta = tracker.apply(make_snapshot(b=3))
+        self.assertTrue(delta["keyframe"])
+        self.assertEqual(["b"], [lot["id"] for lot in delta["lots"]])
+
+    def test_persistent_delta(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            DeltaTracker(directory=temp_dir).apply(make_snapshot(a=1, b=2))
+
+            delta = DeltaTracker(directory=temp_dir).apply(make_snapshot(a=1, b=3))
+            self.assertFalse(delta["keyframe"])
+            self.assertEqual(["b"], [lot["id"] for lot in delta["lots"]])
+
+            tracker = DeltaTracker(directory=temp_dir)
+            tracker.reset("delta-test")
+            self.assertTrue(tracker.apply(make_snapshot(a=1, b=3))["keyframe"])
+
+    def test_snapshot_maker(self):
+        scraper = DeltaScraper()
+        snapshot_maker = SnapshotMaker(scraper, delta_tracker=DeltaTracker())
+
+        self.assertEqual(2, len(snapshot_maker.get_snapshot(infos_required=False)["lots"]))
+        # the timestamp changes but the realtime values do not
+        self.assertEqual(0, len(snapshot_maker.get_snapshot(infos_required=False)["lots"]))
+        scraper.num_free = 2
+        delta = snapshot_maker.get_snapshot(infos_required=False)
+        self.assertEqual(["lot-1"], [lot["id"] for lot in delta["lots"]])
+        self.assertEqual(2, delta["lots"][0]["num_free"])
@@ -0,0 +1,79 @@
+import os
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+
+from common.fan_out import fan_out
+from util.settings import reload_settings
+from v3.pbw.converter import PbwPullConverter
+
+
+class TestFanOut(unittest.TestCase):
+
+    def test_order_and_concurrency(self):
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        def _fetch(item: int) -> int:
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            # later items finish first
+            time.sleep((10 - item) / 200)
+            with lock:
+                running[0] -= 1
+            return item * 2
+
+        start_time = time.monotonic()
+        results = fan_out(_fetch, range(10), max_workers=3)
+        self.assertLess(time.monotonic() - start_time, sum(range(1, 11)) / 200)
+
+        self.assertEqual(list(range(10)), [result.item for result in results])
+        self.assertEqual([i * 2 for i in range(10)], [result.result for result in results])
+        self.assertEqual(3, max_running[0])
+
+    def test_exceptions(self):
+        def _fetch(item: int) -> int:
+            if item % 2:
+                raise IOError(f"failed {item}")
+            return item
+
+        for max_workers in (1, 4):
+            results = fan_out(_fetch, range(4), max_workers=max_workers)
+            self.assertEqual([0, None, 2, None], [result.result for result in results])
+            self.assertEqual(
+                [None, "failed 1", None, "failed 3"],
+                [None if result.exception is None else str(result.exception) for result in results],
+            )
+
+    def test_request_errors_do_not_contain_the_api_key(self):
+        os.environ["PARK_API_PBW_API_KEY"] = "secret-api-key"
+        reload_settings()
+        self.addCleanup(reload_settings)
+        self.addCleanup(os.environ.pop, "PARK_API_PBW_API_KEY", None)
+
+        # a port without server
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            closed_url = f"http://127.0.0.1:{sock.getsockname()[1]}/api/"
+
+        converter = PbwPullConverter()
+        converter.request_retries = 0
+        get_json = converter.http_client.get_json
+
+        def _get_json(url: str, params: dict, **kwargs):
+            if params["type"] == "catalog-city":
+                return {"1": {"name": "City 1", "count_objects": "1"}, "2": {"name": "City 2", "count_objects": "1"}}
+            return get_json(closed_url, params=params, **kwargs)
+
+        with mock.patch.object(converter.http_client, "get_json", _get_json):
+            result = converter.get_static_parking_sites()
+
+        self.assertEqual([], result.static_parking_site_inputs)
+        self.assertEqual(["1", "2"], [error.uid for error in result.static_parking_site_errors])
+        for error in result.static_parking_site_errors:
+            self.assertNotIn("secret-api-key", error.message)
+            self.assertEqual("request error: ConnectionError", error.message)
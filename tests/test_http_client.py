@@ -0,0 +1,74 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from common.http_client import HttpClient, request_error_message
+from util import host_rate_limiter, http_defaults
+from http_server import LocalServer
+
+
+class TestHttpClient(unittest.TestCase):
+
+    def setUp(self):
+        host_rate_limiter.reset()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        cache_dir_patch = mock.patch.object(http_defaults, "CACHE_DIR", Path(self.temp_dir.name))
+        cache_dir_patch.start()
+        self.addCleanup(cache_dir_patch.stop)
+        self.num_failures = 0
+
+        def _flaky(handler):
+            if self.num_failures < 2:
+                self.num_failures += 1
+                return 503, {}, b"try again"
+            return 200, {}, {"ok": True}
+
+        self.server = LocalServer({
+            "/data": (200, {}, {"version": 1}),
+            "/data?a=1": (200, {}, {"version": 1}),
+            "/data?a=2": (200, {}, {"version": 2}),
+            "/flaky": _flaky,
+            "/broken": (500, {}, b"broken"),
+        }).__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.temp_dir.cleanup()
+
+    def test_keep_alive(self):
+        client = HttpClient("http-client-test")
+        for i in range(5):
+            self.assertEqual({"version": 1}, client.get_json(self.server.url("/data")))
+        self.assertEqual(5, len(self.server.requests))
+        self.assertEqual(1, len(self.server.connections))
+
+    def test_retry(self):
+        client = HttpClient("http-client-test", backoff_factor=0, backoff_jitter=0)
+        self.assertEqual({"ok": True}, client.get_json(self.server.url("/flaky")))
+        self.assertEqual(3, len(self.server.requests))
+
+        client = HttpClient("http-client-test", max_retries=1, backoff_factor=0, backoff_jitter=0)
+        with self.assertRaises(IOError) as context:
+            client.get_json(self.server.url("/broken"), expected_status=200)
+        self.assertEqual(5, len(self.server.requests))
+        self.assertEqual("HTTPError (status 500)", request_error_message(context.exception))
+
+    def test_caching(self):
+        client = HttpClient("http-client-test", caching=True)
+        for i in range(3):
+            self.assertEqual({"version": 1}, client.get_json(self.server.url("/data"), params={"a": 1}))
+        self.assertEqual(1, len(self.server.requests))
+
+        # other parameters are not cached
+        self.assertEqual({"version": 2}, client.get_json(self.server.url("/data"), params={"a": 2}))
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_rate_limit(self):
+        client = HttpClient("http-client-test", requests_per_second=20)
+        start_time = time.monotonic()
+        for i in range(5):
+            client.get(self.server.url("/data"))
+        # the first request is free
+        self.assertGreaterEqual(time.monotonic() - start_time, 4 / 20 - 0.01)
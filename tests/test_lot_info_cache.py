@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from util import *
+
+
+class InfoScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="info-cache-test",
+        name="Info Cache Test",
+        public_url="https://example.com",
+    )
+    num_info_calls = 0
+
+    def get_lot_data(self) -> List[LotData]:
+        return [LotData(id="lot-1", timestamp=self.now(), status=LotData.Status.open, num_free=1)]
+
+    def get_lot_infos(self) -> List[LotInfo]:
+        self.__class__.num_info_calls += 1
+        return [LotInfo(id="lot-1", name="Lot 1", type=LotInfo.Types.garage, capacity=10, latitude=50., longitude=10.)]
+
+
+class TestLotInfoCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        InfoScraper.CACHE_DIR = Path(self.temp_dir.name)
+        InfoScraper.num_info_calls = 0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_info_cache(self):
+        snapshots = [
+            SnapshotMaker(InfoScraper(), info_ttl=60).get_snapshot()
+            for i in range(3)
+        ]
+        self.assertEqual(1, InfoScraper.num_info_calls)
+        self.assertEqual(snapshots[0], snapshots[2])
+        self.assertEqual("Lot 1", snapshots[2]["lots"][0]["name"])
+        self.assertEqual(50., snapshots[2]["lots"][0]["latitude"])
+
+        SnapshotMaker(InfoScraper(), info_ttl=60, refresh_infos=True).get_snapshot()
+        self.assertEqual(2, InfoScraper.num_info_calls)
+
+        # expired
+        SnapshotMaker(InfoScraper(), info_ttl=0).get_snapshot()
+        self.assertEqual(3, InfoScraper.num_info_calls)
+
+    def test_no_info_cache(self):
+        for i in range(2):
+            SnapshotMaker(InfoScraper()).get_snapshot()
+        self.assertEqual(2, InfoScraper.num_info_calls)
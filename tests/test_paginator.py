@@ -0,0 +1,70 @@
+import time
+import unittest
+
+from util import *
+from http_server import LocalServer
+
+
+class PagedScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="paged-test",
+        name="Paged Test",
+        public_url="https://example.com",
+    )
+    REQUESTS_PER_SECOND = None
+
+
+def _page(offset: int, limit: int, total: int, delay: float = 0.):
+    def _response(handler):
+        time.sleep(delay)
+        return 200, {}, {
+            "items": [{"id": i} for i in range(offset, min(total, offset + limit))],
+            "totalCount": total,
+        }
+    return _response
+
+
+class TestPaginator(unittest.TestCase):
+
+    def setUp(self):
+        host_rate_limiter.reset()
+
+    def iter_ids(self, server: LocalServer, **kwargs):
+        return [
+            item["id"]
+            for item in PagedScraper().iter_json_pages(
+                server.url("/spaces"),
+                get_items=lambda data: data["items"],
+                get_total=lambda data: data["totalCount"],
+                **kwargs,
+            )
+        ]
+
+    def test_concurrent_pages(self):
+        routes = {
+            f"/spaces?offset={offset}&limit=10": _page(offset, 10, 75, delay=.2)
+            for offset in range(0, 80, 10)
+        }
+        with LocalServer(routes) as server:
+            start_time = time.monotonic()
+            ids = self.iter_ids(server, page_size=10)
+            duration = time.monotonic() - start_time
+
+        self.assertEqual(list(range(75)), ids)
+        self.assertEqual(8, len(server.requests))
+        # first page, then two waves of 4 concurrent pages
+        self.assertLess(duration, 1.)
+
+    def test_server_page_limit(self):
+        # the server only returns 5 items although 10 were requested
+        routes = {
+            f"/spaces?offset={offset}&limit=10": _page(offset, 5, 12)
+            for offset in range(0, 15, 5)
+        }
+        with LocalServer(routes) as server:
+            self.assertEqual(list(range(12)), self.iter_ids(server, page_size=10))
+
+    def test_empty(self):
+        with LocalServer({"/spaces?offset=0&limit=100": _page(0, 100, 0)}) as server:
+            self.assertEqual([], self.iter_ids(server))
+            self.assertEqual(1, len(server.requests))
@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from util.profiling import profile_startup
+
+
+SCRAPER_SOURCE = """
+from util import *
+
+
+class ProfilingTest(ScraperBase):
+    POOL = PoolInfo(
+        id="profiling-test",
+        name="Profiling Test",
+        public_url="https://example.com",
+    )
+"""
+
+
+class TestProfileStartup(unittest.TestCase):
+
+    def test_profile_startup(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            module_dir = Path(temp_dir) / "sources"
+            module_dir.mkdir()
+            (module_dir / "profiling_test.py").write_text(SCRAPER_SOURCE)
+
+            report = profile_startup(module_dir, Path(temp_dir) / "manifest.json", pool_filter=["profiling-test"])
+
+        self.assertEqual(["profiling-test"], report["pools"])
+        self.assertEqual(["profiling_test"], list(report["scrapers"]))
+        self.assertGreater(report["scrapers"]["profiling_test"]["seconds"], 0)
+        self.assertGreater(report["scrapers"]["profiling_test"]["bytes"], 0)
+        self.assertEqual(1, report["validation"]["init_subclass"]["calls"])
+        self.assertEqual(1, report["validation"]["pool_info"]["calls"])
+        self.assertIn("requests", report["dependencies"])
+        self.assertFalse(report["dependencies"]["requests"]["stdlib"])
+        self.assertNotIn("util", report["dependencies"])
+        self.assertGreater(report["peak_bytes"], 0)
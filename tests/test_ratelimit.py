@@ -0,0 +1,54 @@
+import time
+import unittest
+
+from util.ratelimit import TokenBucket, HostRateLimiter
+
+
+class TestRateLimit(unittest.TestCase):
+
+    def test_token_bucket_burst(self):
+        bucket = TokenBucket(rate=10., capacity=3)
+        for i in range(3):
+            self.assertEqual(0., bucket.reserve())
+
+        self.assertAlmostEqual(.1, bucket.reserve(), places=2)
+        self.assertAlmostEqual(.2, bucket.reserve(), places=2)
+        self.assertFalse(bucket.try_acquire())
+
+    def test_token_bucket_refill(self):
+        bucket = TokenBucket(rate=20., capacity=1)
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        time.sleep(.06)
+        self.assertTrue(bucket.try_acquire())
+
+    def test_token_bucket_unlimited(self):
+        bucket = TokenBucket(rate=None)
+        for i in range(100):
+            self.assertEqual(0., bucket.reserve())
+
+    def test_host_rate_limiter_strictest_caller(self):
+        for first_rate in (None, 1000.):
+            limiter = HostRateLimiter()
+            # an unlimited (or faster) caller registers the host first
+            self.assertEqual(0., limiter.reserve("https://shared.example.com/a", first_rate, 100))
+            # a limited caller tightens the shared bucket
+            self.assertEqual(0., limiter.reserve("https://shared.example.com/b", 10., 1))
+            self.assertGreater(limiter.reserve("https://shared.example.com/c", 10., 1), 0.)
+            # and the limit stays for the first caller
+            self.assertGreater(limiter.reserve("https://shared.example.com/d", first_rate, 100), 0.)
+
+    def test_host_rate_limiter(self):
+        limiter = HostRateLimiter()
+        limiter.configure_host("shared.example.com", 10., burst=1)
+
+        # the host config overrides the caller's defaults
+        self.assertEqual(0., limiter.reserve("https://shared.example.com/a", 1000., 100))
+        self.assertGreater(limiter.reserve("https://SHARED.example.com/b", 1000., 100), 0.)
+
+        # other hosts are not affected
+        self.assertEqual(0., limiter.reserve("https://other.example.com/", 1., 1))
+        self.assertGreater(limiter.reserve("https://other.example.com/", 1., 1), 0.)
+
+        limiter.reset()
+        self.assertEqual(0., limiter.reserve("https://shared.example.com/a", 1., 1))
@@ -0,0 +1,71 @@
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from util.registry import ScraperRegistry
+
+
+SCRAPER_SOURCE = """
+from util import *
+
+
+class {class_name}(ScraperBase):
+    POOL = PoolInfo(
+        id="{pool_id}",
+        name="{pool_id}",
+        public_url="https://example.com",
+    )
+"""
+
+
+class TestScraperRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.module_dir = Path(self.temp_dir.name) / "sources"
+        self.module_dir.mkdir()
+        self.manifest_filename = Path(self.temp_dir.name) / "cache" / "manifest.json"
+        sys.path.insert(0, str(self.module_dir))
+        self.write_module("registry_test_a", "RegistryTestA", "registry-test-a")
+        self.write_module("registry_test_b", "RegistryTestB", "registry-test-b")
+        # a module that only imports another scraper
+        (self.module_dir / "registry_test_c.py").write_text("from registry_test_a import RegistryTestA\n")
+
+    def tearDown(self):
+        sys.path.remove(str(self.module_dir))
+        for name in ("registry_test_a", "registry_test_b", "registry_test_c"):
+            sys.modules.pop(name, None)
+        self.temp_dir.cleanup()
+
+    def write_module(self, name: str, class_name: str, pool_id: str):
+        (self.module_dir / f"{name}.py").write_text(SCRAPER_SOURCE.format(class_name=class_name, pool_id=pool_id))
+
+    def test_manifest(self):
+        registry = ScraperRegistry(self.module_dir, self.manifest_filename)
+        self.assertEqual(["registry-test-a", "registry-test-b"], registry.pool_ids())
+        self.assertTrue(self.manifest_filename.exists())
+
+        for name in ("registry_test_a", "registry_test_b", "registry_test_c"):
+            sys.modules.pop(name, None)
+
+        scrapers = ScraperRegistry(self.module_dir, self.manifest_filename).get_scrapers(["registry-test-b"])
+        self.assertEqual(["registry-test-b"], list(scrapers))
+        self.assertEqual("RegistryTestB", scrapers["registry-test-b"].__name__)
+        self.assertNotIn("registry_test_a", sys.modules)
+
+    def test_manifest_rebuild(self):
+        registry = ScraperRegistry(self.module_dir, self.manifest_filename)
+        self.assertEqual(["registry-test-a", "registry-test-b"], registry.pool_ids())
+
+        time.sleep(.01)
+        sys.modules.pop("registry_test_b", None)
+        self.write_module("registry_test_b", "RegistryTestB", "registry-test-renamed")
+        self.assertEqual(["registry-test-a", "registry-test-renamed"], registry.pool_ids())
+
+    def test_duplicate_pool_id(self):
+        self.write_module("registry_test_c", "RegistryTestC", "registry-test-a")
+        registry = ScraperRegistry(self.module_dir, self.manifest_filename)
+        with self.assertRaises(ValueError):
+            registry.import_all()
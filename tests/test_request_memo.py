@@ -0,0 +1,53 @@
+import unittest
+
+from util import *
+from http_server import LocalServer
+
+
+class MemoScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="memo-test",
+        name="Memo Test",
+        public_url="https://example.com",
+    )
+    REQUESTS_PER_SECOND = None
+
+
+class TestRequestMemo(unittest.TestCase):
+
+    def setUp(self):
+        host_rate_limiter.reset()
+        self.server = LocalServer({
+            "/data": (200, {}, {"a": 1}),
+            "/data?x=1": (200, {}, {"a": 2}),
+            "/page": (200, {}, b"<p>Some<br>text</p>"),
+        }).__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def test_memo(self):
+        scraper = MemoScraper()
+
+        with scraper.request_memo():
+            data = scraper.request_json(self.server.url("/data"))
+            self.assertIs(data, scraper.request_json(self.server.url("/data")))
+
+            soup = scraper.request_soup(self.server.url("/page"))
+            self.assertIs(soup, scraper.request_soup(self.server.url("/page")))
+            self.assertEqual("Some\ntext", get_soup_text(soup.find("p")))
+            # the shared soup has not been modified
+            self.assertEqual("<p>Some<br/>text</p>", str(soup))
+
+            # the raw response is shared as well
+            scraper.request(self.server.url("/data"), headers={"Accept": "application/json"})
+
+            # different parameters are different requests
+            scraper.request_json(self.server.url("/data"), params={"x": 1})
+
+        self.assertEqual(3, len(self.server.requests))
+
+        # no memo outside of the context
+        scraper.request_json(self.server.url("/data"))
+        scraper.request_json(self.server.url("/data"))
+        self.assertEqual(5, len(self.server.requests))
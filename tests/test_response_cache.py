@@ -0,0 +1,99 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from util import *
+from util.cache import ResponseCache, conditional_namespace
+from http_server import LocalServer
+
+
+class CacheScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="cache-test",
+        name="Cache Test",
+        public_url="https://example.com",
+    )
+    REQUESTS_PER_SECOND = None
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        host_rate_limiter.reset()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        CacheScraper.CACHE_DIR = Path(self.temp_dir.name)
+        self.server = LocalServer({
+            "/data": (200, {"X-Custom": "yes"}, {"text": "Grüße " * 100}),
+        }).__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.temp_dir.cleanup()
+
+    def test_scraper_caching(self):
+        scraper = CacheScraper(caching=True)
+        data = scraper.request_json(self.server.url("/data"))
+        response = scraper.request(self.server.url("/data"), headers={"Accept": "application/json"})
+        self.assertEqual(1, len(self.server.requests))
+
+        self.assertEqual(data, response.json())
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("yes", response.headers["x-custom"])
+
+        # only write but don't read
+        CacheScraper(caching="write").request_json(self.server.url("/data"))
+        self.assertEqual(2, len(self.server.requests))
+
+        stats = scraper.get_response_cache().stats()
+        self.assertEqual(1, stats["namespaces"]["cache-test"]["entries"])
+        # compressed
+        self.assertLess(stats["size"], 600)
+
+    def test_ttl_and_eviction(self):
+        response = CacheScraper().request(self.server.url("/data"))
+        cache = ResponseCache(Path(self.temp_dir.name) / "test.sqlite3", max_size=len(response.content) * 2, compress=False)
+        for i in range(3):
+            cache.put("pool", f"key-{i}", response)
+            time.sleep(.01)
+
+        # least recently used has been evicted
+        self.assertIsNone(cache.get("pool", "key-0"))
+        self.assertIsNotNone(cache.get("pool", "key-1"))
+        self.assertIsNotNone(cache.get("pool", "key-2"))
+        self.assertIsNone(cache.get("other-pool", "key-2"))
+
+        time.sleep(.1)
+        self.assertIsNone(cache.get("pool", "key-1", ttl=.05))
+        self.assertEqual(2, cache.prune(ttl=.05))
+        self.assertEqual(0, cache.stats()["entries"])
+
+    def test_access_times_are_deferred(self):
+        response = CacheScraper().request(self.server.url("/data"))
+        filename = Path(self.temp_dir.name) / "test.sqlite3"
+        cache = ResponseCache(filename, compress=False)
+        cache.put("pool", "key", response)
+        accessed = cache._connection.execute("SELECT accessed FROM response").fetchone()[0]
+
+        # within the granularity, hits do not write anything
+        self.assertIsNotNone(cache.get("pool", "key"))
+        self.assertEqual({}, cache._accessed)
+
+        cache._connection.execute("UPDATE response SET accessed = ?", (accessed - 2 * cache.ACCESS_GRANULARITY, ))
+        cache._connection.commit()
+        self.assertIsNotNone(cache.get("pool", "key"))
+        self.assertEqual(1, len(cache._accessed))
+        cache.close()
+
+        cache = ResponseCache(filename)
+        self.assertGreaterEqual(cache._connection.execute("SELECT accessed FROM response").fetchone()[0], accessed)
+        self.assertEqual(len(response.content), cache._total_size)
+
+    def test_clear_includes_conditional_namespaces(self):
+        response = CacheScraper().request(self.server.url("/data"))
+        cache = ResponseCache(Path(self.temp_dir.name) / "test.sqlite3")
+        for namespace in ("pool", conditional_namespace("pool"), "other-pool"):
+            cache.put(namespace, "key", response)
+
+        self.assertEqual(2, cache.clear(namespaces=["pool"]))
+        self.assertEqual(["other-pool"], list(cache.stats()["namespaces"]))
@@ -0,0 +1,87 @@
+import asyncio
+import time
+import unittest
+from typing import List
+
+from util import *
+from http_server import LocalServer
+
+
+class AsyncScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="async-test",
+        name="Async Test",
+        public_url="https://example.com",
+    )
+    REQUESTS_PER_SECOND = None
+    BASE_URL = None
+
+    def get_lot_data(self) -> List[LotData]:
+        data = self.request_json(self.BASE_URL + "/lots")
+        return [
+            LotData(id=lot["id"], timestamp=self.now(), status=LotData.Status.open, num_free=lot["free"])
+            for lot in data
+        ]
+
+    async def aget_lot_infos(self) -> List[LotInfo]:
+        data = await self.arequest_json(self.BASE_URL + "/lots")
+        return list(await asyncio.gather(*(
+            self.aget_lot_info(lot["id"])
+            for lot in data
+        )))
+
+    async def aget_lot_info(self, lot_id: str) -> LotInfo:
+        soup = await self.arequest_soup(self.BASE_URL + f"/{lot_id}")
+        return LotInfo(id=lot_id, name=soup.find("h1").text, type=LotInfo.Types.garage)
+
+
+def _slow_page(name: str):
+    def _response(handler):
+        time.sleep(.3)
+        return 200, {"Content-Type": "text/html"}, f"<h1>{name}</h1>".encode()
+    return _response
+
+
+class TestScraperAsync(unittest.TestCase):
+
+    def setUp(self):
+        host_rate_limiter.reset()
+        self.server = LocalServer({
+            "/lots": (200, {}, [{"id": "lot-1", "free": 10}, {"id": "lot-2", "free": 20}]),
+            "/lot-1": _slow_page("Lot 1"),
+            "/lot-2": _slow_page("Lot 2"),
+        }).__enter__()
+        AsyncScraper.BASE_URL = self.server.url("")
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def test_sync_and_async_snapshots(self):
+        scraper = AsyncScraper()
+        sync_snapshot = SnapshotMaker(scraper).get_snapshot()
+        async_snapshot = asyncio.run(SnapshotMaker(scraper).aget_snapshot())
+
+        self.assertNotIn("error", sync_snapshot)
+        self.assertNotIn("error", async_snapshot)
+        for snapshot in (sync_snapshot, async_snapshot):
+            self.assertEqual(
+                [("lot-1", "Lot 1", 10), ("lot-2", "Lot 2", 20)],
+                [(lot["id"], lot["name"], lot["num_free"]) for lot in snapshot["lots"]]
+            )
+
+    def test_fan_out(self):
+        scraper = AsyncScraper()
+        start_time = time.time()
+        lot_infos = scraper.get_lot_infos()
+        self.assertEqual(["Lot 1", "Lot 2"], [info.name for info in lot_infos])
+        # detail pages have been fetched concurrently
+        self.assertLess(time.time() - start_time, .55)
+
+    def test_not_implemented(self):
+        class EmptyScraper(ScraperBase):
+            POOL = AsyncScraper.POOL
+
+        with self.assertRaises(NotImplementedError):
+            EmptyScraper().get_lot_data()
+        with self.assertRaises(NotImplementedError):
+            asyncio.run(EmptyScraper().aget_lot_infos())
@@ -0,0 +1,99 @@
+import io
+import json
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+from util import *
+from scraper import iter_snapshots, iter_validations, parse_args, JsonPrinter
+
+
+class SlowScraper(ScraperBase):
+    POOL = PoolInfo(
+        id="slow",
+        name="Slow",
+        public_url="https://example.com/slow",
+    )
+    DELAY = .2
+
+    def get_lot_data(self) -> List[LotData]:
+        time.sleep(self.DELAY)
+        return [
+            LotData(id=f"{self.POOL.id}-lot", timestamp=self.now(), status=LotData.Status.open, num_free=1)
+        ]
+
+
+class FastScraper(SlowScraper):
+    POOL = PoolInfo(
+        id="fast",
+        name="Fast",
+        public_url="https://example.com/fast",
+    )
+    DELAY = 0.
+
+
+class TestScraperCli(unittest.TestCase):
+
+    def test_iter_snapshots_order(self):
+        scrapers = {"slow": SlowScraper, "fast": FastScraper}
+
+        for workers in (1, 2):
+            snapshots = list(iter_snapshots(scrapers, ["slow", "fast"], cache=False, workers=workers))
+            self.assertEqual(["slow", "fast"], [pool_id for pool_id, snapshot in snapshots])
+            self.assertEqual(
+                ["slow-lot", "fast-lot"],
+                [snapshot["lots"][0]["id"] for pool_id, snapshot in snapshots],
+            )
+
+    def test_iter_snapshots_concurrent(self):
+        scrapers = {f"slow-{i}": SlowScraper for i in range(4)}
+
+        start_time = time.time()
+        list(iter_snapshots(scrapers, sorted(scrapers), cache=False, workers=4))
+        self.assertLess(time.time() - start_time, SlowScraper.DELAY * 3)
+
+    def test_json_printer(self):
+        data = [{"id": "a", "lots": [{"name": "Ä\nB", "num_free": 1}]}, {"id": "b", "lots": []}]
+
+        file = io.StringIO()
+        with JsonPrinter(file=file) as printer:
+            for entry in data:
+                printer.print(entry)
+        self.assertEqual(json.dumps(data, indent=2, ensure_ascii=False) + "\n", file.getvalue())
+
+        file = io.StringIO()
+        with JsonPrinter(file=file):
+            pass
+        self.assertEqual([], json.loads(file.getvalue()))
+
+        file = io.StringIO()
+        with JsonPrinter(file=file, ndjson=True) as printer:
+            for entry in data:
+                printer.print(entry)
+        self.assertEqual(data, [json.loads(line) for line in file.getvalue().splitlines()])
+
+    def test_iter_validations(self):
+        scrapers = {"slow": SlowScraper, "fast": FastScraper}
+        validations = list(iter_validations(iter_snapshots(scrapers, ["slow", "fast"], cache=False, workers=2)))
+        self.assertEqual(["slow", "fast"], [pool_id for pool_id, validation in validations])
+        for pool_id, validation in validations:
+            self.assertIsInstance(validation["validations"], list)
+
+    def test_analyze_requires_archive_chunks(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for argv in (
+                    ["analyze"],
+                    ["analyze", "--archive", str(Path(temp_dir) / "missing")],
+                    ["analyze", "--archive", temp_dir],
+            ):
+                with mock.patch("sys.argv", ["scraper.py", *argv]), mock.patch("sys.stderr", io.StringIO()):
+                    with self.assertRaises(SystemExit) as context:
+                        parse_args()
+                    self.assertEqual(2, context.exception.code)
+
+            (Path(temp_dir) / "chunk-0.npz").touch()
+            with mock.patch("sys.argv", ["scraper.py", "analyze", "--archive", temp_dir]):
+                self.assertEqual(temp_dir, parse_args()["archive"])
@@ -0,0 +1,40 @@
+import os
+import datetime
+import unittest
+
+from util import *
+from util.settings import settings, reload_settings
+
+
+class TestSettings(unittest.TestCase):
+
+    def tearDown(self):
+        os.environ.pop("PARK_API_V3_MODE", None)
+        os.environ.pop("PARK_API_PBW_API_KEY", None)
+        reload_settings()
+
+    def test_v3_mode(self):
+        timestamp = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+        os.environ["PARK_API_V3_MODE"] = "false"
+        reload_settings()
+        with self.assertRaises(ValueError):
+            LotData(timestamp=timestamp, id="lot", status=LotData.Status.open)
+
+        os.environ["PARK_API_V3_MODE"] = "true"
+        # the environment is only read on reload
+        with self.assertRaises(ValueError):
+            LotData(timestamp=timestamp, id="lot", status=LotData.Status.open)
+
+        reload_settings()
+        LotData(timestamp=timestamp, id="lot", status=LotData.Status.open)
+
+    def test_require(self):
+        os.environ["PARK_API_PBW_API_KEY"] = "secret"
+        reload_settings()
+        self.assertEqual("secret", settings.require("park_api_pbw_api_key"))
+
+        del os.environ["PARK_API_PBW_API_KEY"]
+        reload_settings()
+        with self.assertRaises(ValueError):
+            settings.require("park_api_pbw_api_key")
@@ -0,0 +1,110 @@
+import json
+import queue
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from typing import List
+
+from util import *
+from tests.http_server import LocalServer
+
+
+def make_snapshot(pool_id: str, num_free: int = 1) -> dict:
+    return {"pool": {"id": pool_id}, "lots": [{"id": f"{pool_id}-lot", "num_free": num_free}]}
+
+
+class BlockingSink(SnapshotSink):
+
+    def __init__(self, **kwargs):
+        self.event = threading.Event()
+        self.entered = threading.Event()
+        self.batches = []
+        super().__init__(**kwargs)
+
+    def write_batch(self, snapshots: List[dict]):
+        self.entered.set()
+        self.event.wait()
+        self.batches.append(snapshots)
+
+
+class TestSnapshotSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_batches_and_back_pressure(self):
+        sink = BlockingSink(batch_size=3, batch_timeout=0., max_queue_size=2)
+        sink.write(make_snapshot("a"))
+        sink.entered.wait()
+        sink.write(make_snapshot("b"))
+        sink.write(make_snapshot("c"))
+        with self.assertRaises(queue.Full):
+            sink.write(make_snapshot("d"), timeout=.1)
+
+        sink.event.set()
+        sink.close()
+        self.assertEqual([["a"], ["b", "c"]], [[s["pool"]["id"] for s in batch] for batch in sink.batches])
+
+        with self.assertRaises(ValueError):
+            sink.write(make_snapshot("e"))
+
+    def test_ndjson_rotation(self):
+        filename = self.path / "snapshots.ndjson"
+        line_size = len(json.dumps(make_snapshot("a"))) + 1
+        with NdjsonFileSink(filename, max_size=line_size * 2, backup_count=2, batch_size=1) as sink:
+            for i in range(7):
+                sink.write(make_snapshot("a", num_free=i))
+
+        def _read(filename: Path):
+            return [json.loads(line)["lots"][0]["num_free"] for line in filename.read_text().splitlines()]
+
+        self.assertEqual([6], _read(filename))
+        self.assertEqual([4, 5], _read(Path(f"{filename}.1")))
+        self.assertEqual([2, 3], _read(Path(f"{filename}.2")))
+        self.assertFalse(Path(f"{filename}.3").exists())
+
+    def test_sqlite(self):
+        filename = self.path / "snapshots.sqlite3"
+        with SqliteSink(filename) as sink:
+            sink.write(make_snapshot("a"))
+            sink.write(make_snapshot("b"))
+
+        connection = sqlite3.connect(str(filename))
+        rows = connection.execute("SELECT pool_id, data FROM snapshot ORDER BY id").fetchall()
+        connection.close()
+        self.assertEqual(["a", "b"], [row[0] for row in rows])
+        self.assertEqual(make_snapshot("b"), json.loads(rows[1][1]))
+
+    def test_http_post(self):
+        responses = [500, 200]
+
+        with LocalServer({"/ingest": lambda handler: (responses.pop(0), {}, b"")}) as server:
+            with HttpPostSink(server.url("/ingest"), retry_delay=0., batch_timeout=.1) as sink:
+                sink.write(make_snapshot("a"))
+                sink.write(make_snapshot("b"))
+
+        self.assertEqual(2, len(server.requests))
+        method, path, headers, body = server.requests[-1]
+        self.assertEqual("POST", method)
+        self.assertEqual("application/json", headers["Content-Type"])
+        self.assertEqual([make_snapshot("a"), make_snapshot("b")], json.loads(body))
+
+    def test_snapshot_maker(self):
+
+        class SinkScraper(ScraperBase):
+            POOL = PoolInfo(id="sink-test", name="Sink Test", public_url="https://example.com")
+
+            def get_lot_data(self) -> List[LotData]:
+                return [LotData(id="lot-1", timestamp=self.now(), status=LotData.Status.open, num_free=1)]
+
+        filename = self.path / "snapshots.ndjson"
+        with NdjsonFileSink(filename) as sink:
+            snapshot = SnapshotMaker(SinkScraper(), sink=sink).get_snapshot(infos_required=False)
+
+        self.assertEqual([snapshot], [json.loads(line) for line in filename.read_text().splitlines()])
@@ -0,0 +1,42 @@
+import datetime
+import pickle
+import unittest
+
+from util import *
+
+
+class TestStructs(unittest.TestCase):
+
+    def test_slots(self):
+        lot_data = LotData(
+            timestamp=datetime.datetime(2020, 1, 1), id="lot", status=LotData.Status.open, num_free=3, capacity=10,
+        )
+        self.assertFalse(hasattr(lot_data, "__dict__"))
+        with self.assertRaises(AttributeError):
+            lot_data.unknown = 1
+
+        self.assertEqual(
+            ["id", "timestamp", "status", "num_free", "num_occupied", "capacity", "lot_timestamp"],
+            list(lot_data.to_dict()),
+        )
+        self.assertEqual(7, lot_data.to_dict()["num_occupied"])
+        self.assertEqual(lot_data.to_dict(), pickle.loads(pickle.dumps(lot_data)).to_dict())
+
+    def test_lot_info_dict(self):
+        lot_info = LotInfo(id="lot", name="Parkhaus am Markt", latitude="50.1", longitude=10)
+        data = lot_info.to_dict()
+        self.assertEqual("garage", data["type"])
+        self.assertEqual(50.1, data["latitude"])
+        self.assertEqual(list(LotInfo.__slots__), list(data))
+
+        # the dict is a copy
+        data["name"] = "changed"
+        self.assertEqual("Parkhaus am Markt", lot_info.name)
+
+        self.assertEqual(lot_info.to_dict(), LotInfo.from_dict({**lot_info.to_dict(), "unknown": 1}).to_dict())
+
+    def test_pool_info_dict(self):
+        pool = PoolInfo(id="pool", name="Pool", public_url="https://example.com", source_url="")
+        self.assertEqual(list(PoolInfo.__slots__), list(pool.to_dict()))
+        self.assertIsNone(pool.to_dict()["source_url"])
+        self.assertIn("id='pool'", repr(pool))
@@ -2,7 +2,7 @@ import unittest
 from copy import deepcopy
 from typing import Optional, Tuple, List
 
-from util.validate import validate_snapshot
+from util.validate import validate_snapshot, get_schema_validator, get_schema_checker
 
 SNAPSHOTS = {
     "valid": {
@@ -81,9 +81,15 @@ class TestValidation(unittest.TestCase):
             list(filter(lambda v: v["priority"] != 0, validations))
         )
 
+    def test_schema_validator_is_cached(self):
+        self.assertIs(get_schema_validator(), get_schema_validator())
+
     def test_validation_errors(self):
         self.assertEqual(
-            [{"message": "'pool' is a required property: {}", "path": "", "priority": 0}],
+            [
+                {"message": "'pool' is a required property: {}", "path": "", "priority": 0},
+                {"message": "'lots' is a required property: {}", "path": "", "priority": 0},
+            ],
             self.split_errors_warnings(validate_snapshot({}))[0]
         )
 
@@ -96,7 +102,10 @@ class TestValidation(unittest.TestCase):
         )
 
         self.assertEqual(
-            [{"message": "'id' is a required property: {}", "path": "pool", "priority": 0}],
+            [
+                {"message": f"'{key}' is a required property: {{}}", "path": "pool", "priority": 0}
+                for key in ("id", "name", "public_url", "timezone")
+            ],
             self.split_errors_warnings(validate_snapshot({
                 "pool": {},
                 "lots": [],
@@ -131,6 +140,31 @@ class TestValidation(unittest.TestCase):
             self.split_errors_warnings(validate_snapshot(snapshot))[0]
         )
 
+    def test_all_validation_errors(self):
+        snapshot = deepcopy(SNAPSHOTS["valid"])
+        snapshot["lots"] = [deepcopy(snapshot["lots"][0]) for i in range(12)]
+        for lot in snapshot["lots"]:
+            lot["source_url"] = 23
+            lot["num_free"] = "60"
+        snapshot["pool"]["id"] = "Pool 1"
+
+        errors = self.split_errors_warnings(validate_snapshot(snapshot))[0]
+        self.assertEqual(
+            [
+                f"lots.{i}.{key}"
+                for i in range(12)
+                for key in ("num_free", "source_url")
+            ] + ["pool.id"],
+            [e["path"] for e in errors],
+        )
+
+        errors = self.split_errors_warnings(validate_snapshot(snapshot, max_errors=5))[0]
+        self.assertEqual(
+            ["lots.0.num_free", "lots.0.source_url", "lots.1.num_free", "lots.1.source_url", "lots.2.num_free", ""],
+            [e["path"] for e in errors],
+        )
+        self.assertEqual("20 more schema errors not shown", errors[-1]["message"])
+
     def test_validation_warnings(self):
         self.assertEqual(
             [],
@@ -163,3 +197,24 @@ class TestValidation(unittest.TestCase):
             ],
             self.split_errors_warnings(validate_snapshot(snapshot))[1]
         )
+
+    def test_schema_checker_agrees_with_jsonschema(self):
+        checker = get_schema_checker()
+        validator = get_schema_validator()
+        self.assertIsNotNone(checker)
+
+        snapshots = list(SNAPSHOTS.values())
+        for name in SNAPSHOTS:
+            for get_object in (lambda s: s["pool"], lambda s: s["lots"][0]):
+                for key in get_object(SNAPSHOTS[name]):
+                    for value in (None, 1, 1.5, True, "", "x" * 5000, "Bad ID!", [], {}, KeyError):
+                        snapshot = deepcopy(SNAPSHOTS[name])
+                        if value is KeyError:
+                            del get_object(snapshot)[key]
+                        else:
+                            get_object(snapshot)[key] = value
+                        snapshots.append(snapshot)
+        snapshots += [{}, {"pool": SNAPSHOTS["valid"]["pool"]}, {**SNAPSHOTS["valid"], "lots": {}}]
+
+        for snapshot in snapshots:
+            self.assertEqual(validator.is_valid(snapshot), checker(snapshot), snapshot)
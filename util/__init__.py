@@ -8,6 +8,8 @@ from .strings import (
     float_or_none,
 )
 from .snapshot import SnapshotMaker
+from .sinks import SnapshotSink, NdjsonFileSink, SqliteSink, HttpPostSink
+from .ratelimit import TokenBucket, host_rate_limiter
 from .scraper import ScraperBase
 from .soup import get_soup_text
 from .structs import PoolInfo, LotInfo, LotData, LotInfoList, LotDataList, PoolInfo as SourceInfo
@@ -0,0 +1,225 @@
+"""
+Occupancy statistics over a columnar snapshot archive (see util/columnar.py).
+
+All functions work on whole columns at once and return arrays
+indexed by the lot (or pool) codes of the ColumnarTable.
+"""
+import datetime
+from typing import Optional, Sequence, Dict
+
+import numpy as np
+import pytz
+
+from .columnar import ColumnarTable, STATUSES
+
+
+def occupancy(table: ColumnarTable) -> np.ndarray:
+    """
+    Return the occupied fraction (0..1) of each row, NaN if unknown.
+
+    `num_occupied` is derived from `num_free` if missing.
+    """
+    valid = table.valid
+    occupied = np.where(valid["num_occupied"], table.num_occupied, table.capacity - table.num_free).astype(float)
+    known = (valid["num_occupied"] | valid["num_free"]) & valid["capacity"] & (table.capacity > 0)
+    ratio = np.full(len(table), np.nan)
+    np.divide(occupied, table.capacity, out=ratio, where=known)
+    return ratio
+
+
+def local_time(timestamps: np.ndarray, timezone: str = "UTC") -> np.ndarray:
+    """
+    Convert unix seconds to local unix seconds (seconds since 1970-01-01 local wall time).
+
+    The UTC offset is only computed once per hour of the time range.
+    """
+    if timezone == "UTC" or not len(timestamps):
+        return timestamps
+    tz = pytz.timezone(timezone)
+    hours = timestamps // 3600
+    first_hour = int(hours.min())
+    offsets = np.array([
+        datetime.datetime.fromtimestamp(hour * 3600, tz).utcoffset().total_seconds()
+        for hour in range(first_hour, int(hours.max()) + 1)
+    ], dtype=np.int64)
+    return timestamps + offsets[hours - first_hour]
+
+
+def group_mean(keys: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """
+    Mean of `values` per integer key in 0..size-1, ignoring NaNs. NaN for empty groups
+    """
+    known = ~np.isnan(values)
+    sums = np.bincount(keys[known], weights=values[known], minlength=size)
+    counts = np.bincount(keys[known], minlength=size)
+    means = np.full(size, np.nan)
+    np.divide(sums, counts, out=means, where=counts > 0)
+    return means
+
+
+def hourly_profile(table: ColumnarTable, timezone: str = "UTC") -> np.ndarray:
+    """
+    Mean occupancy per lot and hour of day, shape (lots, 24)
+    """
+    hours = (local_time(table.timestamp, timezone) // 3600) % 24
+    return group_mean(table.lot * 24 + hours, occupancy(table), len(table.lot_ids) * 24).reshape(-1, 24)
+
+
+def weekday_profile(table: ColumnarTable, timezone: str = "UTC") -> np.ndarray:
+    """
+    Mean occupancy per lot, weekday (0 = monday) and hour of day, shape (lots, 7, 24)
+    """
+    local_hours = local_time(table.timestamp, timezone) // 3600
+    keys = (table.lot * 7 + _weekdays(local_hours)) * 24 + local_hours % 24
+    return group_mean(keys, occupancy(table), len(table.lot_ids) * 7 * 24).reshape(-1, 7, 24)
+
+
+def group_order(keys: np.ndarray, size: int) -> np.ndarray:
+    """
+    Return the indices that stably sort the rows by their integer key in 0..size-1
+    """
+    if size <= np.iinfo(np.int16).max:
+        # numpy uses a radix sort for 16 bit integers
+        keys = keys.astype(np.int16)
+    return np.argsort(keys, kind="stable")
+
+
+def group_percentiles(keys: np.ndarray, values: np.ndarray, size: int, percentiles: Sequence[float]) -> np.ndarray:
+    """
+    Linearly interpolated percentiles (0..100) of `values` per integer key, ignoring NaNs.
+
+    :return: array of shape (size, len(percentiles)), NaN for empty groups
+    """
+    known = ~np.isnan(values)
+    keys, values = keys[known], values[known]
+    values = values[group_order(keys, size)]
+    ends = np.cumsum(np.bincount(keys, minlength=size))
+
+    result = np.full((size, len(percentiles)), np.nan)
+    # sorting each group separately is much faster than sorting all values at once
+    for key, group in enumerate(np.split(values, ends[:-1])):
+        if len(group):
+            result[key] = np.percentile(group, percentiles)
+    return result
+
+
+def utilization_percentiles(table: ColumnarTable, percentiles: Sequence[float] = (50, 90, 99)) -> np.ndarray:
+    """
+    Occupancy percentiles per lot, shape (lots, len(percentiles))
+    """
+    return group_percentiles(table.lot, occupancy(table), len(table.lot_ids), percentiles)
+
+
+def status_counts(table: ColumnarTable) -> np.ndarray:
+    """
+    Number of rows per lot and status, shape (lots, len(STATUSES) + 1),
+    the last column counts unknown status strings
+    """
+    num_columns = len(STATUSES) + 1
+    status = np.where(table.status >= 0, table.status, len(STATUSES))
+    return np.bincount(
+        table.lot * num_columns + status, minlength=len(table.lot_ids) * num_columns
+    ).reshape(-1, num_columns)
+
+
+def lot_time_order(table: ColumnarTable) -> np.ndarray:
+    """
+    Return the indices that sort the rows by lot and timestamp
+    """
+    # the archive is usually sorted by time already, which makes the stable sort fast
+    order = np.argsort(table.timestamp, kind="stable")
+    return order[group_order(table.lot[order], len(table.lot_ids))]
+
+
+def data_gaps(table: ColumnarTable, max_interval: float, order: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Number of times per lot that two consecutive rows are more than `max_interval` seconds apart
+
+    :param order: result of lot_time_order(), if already computed
+    """
+    if order is None:
+        order = lot_time_order(table)
+    lots, timestamps = table.lot[order], table.timestamp[order]
+    gaps = (lots[1:] == lots[:-1]) & (np.diff(timestamps) > max_interval)
+    return np.bincount(lots[1:][gaps], minlength=len(table.lot_ids))
+
+
+def analyze(
+        table: ColumnarTable,
+        timezone: str = "UTC",
+        percentiles: Sequence[float] = (50, 90, 99),
+        max_interval: Optional[float] = None,
+) -> Dict[str, dict]:
+    """
+    Compute all statistics and return a json-serializable dict with one entry per pool and per lot.
+
+    :param max_interval: seconds between two rows that count as a data gap,
+        defaults to three times the median interval of all lots
+    """
+    num_lots, num_pools = len(table.lot_ids), len(table.pool_ids)
+    ratio = occupancy(table)
+    lot_samples = np.bincount(table.lot, minlength=num_lots)
+    lot_means = group_mean(table.lot, ratio, num_lots)
+    local_hours = local_time(table.timestamp, timezone) // 3600
+    hourly = group_mean(table.lot * 24 + local_hours % 24, ratio, num_lots * 24).reshape(-1, 24)
+    weekdays = group_mean(table.lot * 7 + _weekdays(local_hours), ratio, num_lots * 7).reshape(-1, 7)
+    lot_percentiles = group_percentiles(table.lot, ratio, num_lots, percentiles)
+    statuses = status_counts(table)
+
+    order = lot_time_order(table)
+    if max_interval is None:
+        same_lot = table.lot[order][1:] == table.lot[order][:-1]
+        intervals = np.diff(table.timestamp[order])[same_lot]
+        max_interval = float(np.median(intervals)) * 3 if len(intervals) else 0.
+    gaps = data_gaps(table, max_interval, order=order)
+
+    # the pool of each lot
+    lot_pools = np.zeros(num_lots, dtype=np.int64)
+    lot_pools[table.lot] = table.pool
+
+    return {
+        "rows": len(table),
+        "timezone": timezone,
+        "gap_interval": max_interval,
+        "pools": {
+            pool_id: {
+                "lots": int(np.count_nonzero(lot_pools[lot_samples > 0] == pool_code)),
+                "samples": int(samples),
+                "mean_occupancy": _float(mean),
+            }
+            for pool_code, (pool_id, samples, mean) in enumerate(zip(
+                table.pool_ids.tolist(),
+                np.bincount(table.pool, minlength=num_pools),
+                group_mean(table.pool, ratio, num_pools),
+            ))
+        },
+        "lots": {
+            lot_id: {
+                "pool": str(table.pool_ids[lot_pools[lot_code]]),
+                "samples": int(lot_samples[lot_code]),
+                "mean_occupancy": _float(lot_means[lot_code]),
+                "percentiles": {
+                    str(percentile): _float(lot_percentiles[lot_code, i])
+                    for i, percentile in enumerate(percentiles)
+                },
+                "hourly": [_float(value) for value in hourly[lot_code]],
+                "weekdays": [_float(value) for value in weekdays[lot_code]],
+                "status": {
+                    status: int(count)
+                    for status, count in zip(STATUSES + ("other", ), statuses[lot_code])
+                    if count
+                },
+                "gaps": int(gaps[lot_code]),
+            }
+            for lot_code, lot_id in enumerate(table.lot_ids.tolist())
+        },
+    }
+
+
+def _weekdays(local_hours: np.ndarray) -> np.ndarray:
+    # 1970-01-01 was a thursday
+    return (local_hours // 24 + 3) % 7
+
+
+def _float(value) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 4)
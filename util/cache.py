@@ -0,0 +1,334 @@
+import atexit
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Union, Optional, Dict, List, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class ResponseCache:
+    """
+    HTTP response cache in a single indexed sqlite file.
+
+    Stores status, headers and (optionally zlib-compressed) body
+    of each response. Entries are grouped by a namespace, which is
+    the pool ID for scrapers.
+
+    Entries older than `ttl` seconds are not returned and if the
+    total body size exceeds `max_size` bytes, the least recently
+    used entries are evicted.
+
+    Reads do not write to the database: the access times are kept
+    in memory (with a granularity of ACCESS_GRANULARITY seconds)
+    and written with the next `put()`, eviction, `flush()` or `close()`.
+    """
+
+    # Access times of an entry are only updated if they are older than this number of seconds
+    ACCESS_GRANULARITY = 60.
+    # Number of pending access times that triggers a write
+    MAX_PENDING_ACCESSES = 1000
+
+    def __init__(
+            self,
+            filename: Union[str, Path],
+            max_size: Optional[int] = None,
+            compress: bool = True,
+    ):
+        self.filename = Path(filename)
+        self.max_size = max_size
+        self.compress = compress
+        self._lock = threading.Lock()
+
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.filename), timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS response (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                method TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                reason TEXT,
+                headers TEXT NOT NULL,
+                encoding TEXT,
+                body BLOB NOT NULL,
+                compressed INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS response_accessed ON response (accessed);
+            CREATE INDEX IF NOT EXISTS response_created ON response (created);
+        """)
+        # pending access times by (namespace, hashed key)
+        self._accessed: Dict[Tuple[str, str], float] = {}
+        # running total of the body sizes, also changed by other processes, so it is
+        # only used to decide when to look at the real total
+        self._total_size: int = self._query_total_size()
+
+    @classmethod
+    def hash_key(cls, key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, key: str, ttl: Optional[float] = None) -> Optional[requests.Response]:
+        """
+        Return the cached response or None
+
+        :param namespace: str, e.g. the pool ID
+        :param key: str, normalized request, see ScraperBase._request_key()
+        :param ttl: float|None, maximum age in seconds
+        """
+        hashed_key = self.hash_key(key)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT method, url, status, reason, headers, encoding, body, compressed, created, accessed"
+                " FROM response WHERE namespace = ? AND key = ?",
+                (namespace, hashed_key),
+            ).fetchone()
+            if row is None:
+                return None
+
+            method, url, status, reason, headers, encoding, body, compressed, created, accessed = row
+            now = time.time()
+            if ttl is not None and created < now - ttl:
+                return None
+
+            if accessed < now - self.ACCESS_GRANULARITY:
+                self._accessed[(namespace, hashed_key)] = now
+                if len(self._accessed) >= self.MAX_PENDING_ACCESSES:
+                    self._write_accessed()
+                    self._connection.commit()
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.url = url
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response.encoding = encoding
+        response._content = zlib.decompress(body) if compressed else body
+        # preparing a requests.Request would parse the url again
+        response.request = requests.PreparedRequest()
+        response.request.method = method
+        response.request.url = url
+        response.request.headers = CaseInsensitiveDict()
+        return response
+
+    def put(self, namespace: str, key: str, response: requests.Response):
+        """
+        Store the response and evict old entries if max_size is exceeded.
+        """
+        body = response.content or b""
+        size = len(body)
+        compressed = False
+        if self.compress and size:
+            compressed_body = zlib.compress(body)
+            if len(compressed_body) < size:
+                body, compressed = compressed_body, True
+
+        now = time.time()
+        hashed_key = self.hash_key(key)
+        with self._lock:
+            previous = self._connection.execute(
+                "SELECT size FROM response WHERE namespace = ? AND key = ?", (namespace, hashed_key),
+            ).fetchone()
+            self._total_size += len(body) - (previous[0] if previous else 0)
+            self._accessed.pop((namespace, hashed_key), None)
+            self._write_accessed()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO response"
+                " (namespace, key, method, url, status, reason, headers, encoding, body, compressed, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    namespace, hashed_key,
+                    response.request.method if response.request else "GET", response.url,
+                    response.status_code, response.reason,
+                    json.dumps(dict(response.headers)), response.encoding,
+                    body, compressed, len(body), now, now,
+                )
+            )
+            if self.max_size is not None and self._total_size > self.max_size:
+                self._evict(self.max_size)
+            self._connection.commit()
+
+    def flush(self):
+        """
+        Write the pending access times
+        """
+        with self._lock:
+            if self._accessed:
+                self._write_accessed()
+                self._connection.commit()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._connection.close()
+
+    def prune(self, ttl: Optional[float] = None, max_size: Optional[int] = None) -> int:
+        """
+        Remove entries older than `ttl` seconds and the least recently used
+        entries exceeding `max_size` bytes.
+
+        :return: int, number of removed entries
+        """
+        with self._lock:
+            self._write_accessed()
+            num_removed = 0
+            if ttl is not None:
+                num_removed += self._connection.execute(
+                    "DELETE FROM response WHERE created < ?", (time.time() - ttl, )
+                ).rowcount
+
+            max_size = self.max_size if max_size is None else max_size
+            if max_size is not None:
+                num_removed += self._evict(max_size)
+
+            self._connection.commit()
+            self._total_size = self._query_total_size()
+            self._connection.execute("VACUUM")
+            return num_removed
+
+    def clear(self, namespaces: Optional[List[str]] = None) -> int:
+        """
+        Remove all entries or only those of the given namespaces
+        (including their conditional namespaces).
+
+        :return: int, number of removed entries
+        """
+        with self._lock:
+            if namespaces is None:
+                num_removed = self._connection.execute("DELETE FROM response").rowcount
+            else:
+                namespaces = [*namespaces, *(conditional_namespace(namespace) for namespace in namespaces)]
+                num_removed = self._connection.execute(
+                    f"DELETE FROM response WHERE namespace IN ({', '.join('?' for _ in namespaces)})",
+                    namespaces,
+                ).rowcount
+            self._accessed.clear()
+            self._connection.commit()
+            self._total_size = self._query_total_size()
+            self._connection.execute("VACUUM")
+            return num_removed
+
+    def stats(self) -> dict:
+        """
+        Return number of entries and sizes, in total and per namespace
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT namespace, COUNT(*), SUM(size), MIN(created), MAX(created)"
+                " FROM response GROUP BY namespace ORDER BY namespace"
+            ).fetchall()
+
+        namespaces = {
+            namespace: {
+                "entries": count,
+                "size": size,
+                "oldest": _to_iso(oldest),
+                "newest": _to_iso(newest),
+            }
+            for namespace, count, size, oldest, newest in rows
+        }
+        return {
+            "filename": str(self.filename),
+            "file_size": self.filename.stat().st_size if self.filename.exists() else 0,
+            "entries": sum(n["entries"] for n in namespaces.values()),
+            "size": sum(n["size"] for n in namespaces.values()),
+            "namespaces": namespaces,
+        }
+
+    def _query_total_size(self) -> int:
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM response").fetchone()[0]
+
+    def _write_accessed(self):
+        if self._accessed:
+            self._connection.executemany(
+                "UPDATE response SET accessed = ? WHERE namespace = ? AND key = ?",
+                [(accessed, namespace, key) for (namespace, key), accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _evict(self, max_size: int) -> int:
+        # other processes might have changed the cache
+        self._write_accessed()
+        total_size = self._total_size = self._query_total_size()
+        if total_size <= max_size:
+            return 0
+
+        num_removed = 0
+        for namespace, key, size in self._connection.execute(
+                "SELECT namespace, key, size FROM response ORDER BY accessed"
+        ).fetchall():
+            self._connection.execute("DELETE FROM response WHERE namespace = ? AND key = ?", (namespace, key))
+            num_removed += 1
+            total_size -= size
+            if total_size <= max_size:
+                break
+
+        self._total_size = total_size
+        return num_removed
+
+
+def conditional_namespace(namespace: str) -> str:
+    """
+    Return the namespace of the responses that are re-validated with conditional requests
+    """
+    return f"{namespace}:conditional"
+
+
+def response_validator(response: requests.Response) -> Optional[str]:
+    """
+    Return a string that identifies the version of the response's resource
+    (the ETag or Last-Modified header), or None if the server does not provide one.
+    """
+    if response.headers.get("ETag"):
+        return f"etag:{response.headers['ETag']}"
+    if response.headers.get("Last-Modified"):
+        return f"last-modified:{response.headers['Last-Modified']}"
+
+
+def conditional_request_headers(response: requests.Response) -> Dict[str, str]:
+    """
+    Return the If-None-Match / If-Modified-Since headers
+    to re-validate a previous response.
+    """
+    headers = {}
+    if response.headers.get("ETag"):
+        headers["If-None-Match"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        headers["If-Modified-Since"] = response.headers["Last-Modified"]
+    return headers
+
+
+# Name of the response cache file in the cache directory
+RESPONSE_CACHE_FILENAME = "responses.sqlite3"
+
+_caches: Dict[Path, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(filename: Union[str, Path], max_size: Optional[int] = None, compress: bool = True) -> ResponseCache:
+    """
+    Return the process-wide ResponseCache instance for `filename`
+    """
+    filename = Path(filename).resolve()
+    with _caches_lock:
+        if filename not in _caches:
+            _caches[filename] = ResponseCache(filename, max_size=max_size, compress=compress)
+            atexit.register(_caches[filename].flush)
+        return _caches[filename]
+
+
+def _to_iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp))
@@ -0,0 +1,245 @@
+import os
+import json
+import base64
+import threading
+import urllib.parse
+from pathlib import Path
+from typing import Union, Optional, Dict, List
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from ._log import log
+
+
+CASSETTE_VERSION = 1
+
+# Query parameters whose values are replaced when recording and matching
+FILTERED_PARAMS = ("key", "api_key", "apikey", "token", "access_token", "client_secret")
+FILTERED_VALUE = "FILTERED"
+
+
+class CassetteMissError(requests.exceptions.ConnectionError):
+    """
+    Raised in replay mode for requests that are not in the cassette
+    """
+    pass
+
+
+class Cassette:
+    """
+    The recorded HTTP exchanges of one pool (or converter) in a json file.
+
+    Requests are matched on their normalized method, url, query and body,
+    see `request_key()`. Request headers are not recorded (they might contain
+    credentials) and the values of FILTERED_PARAMS are replaced.
+    Identical requests are replayed in the recorded order, the last
+    response is repeated afterwards.
+    """
+
+    def __init__(self, filename: Union[str, Path], load: bool = True):
+        self.filename = Path(filename)
+        self.interactions: List[dict] = []
+        self._replay_positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if load and self.filename.exists():
+            data = json.loads(self.filename.read_text())
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(
+                    f"Cassette {self.filename} has version {data.get('version')}, expected {CASSETTE_VERSION}"
+                )
+            self.interactions = data["interactions"]
+
+    def __len__(self):
+        return len(self.interactions)
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response):
+        interaction = {
+            "request": {
+                "key": request_key(request.method, request.url, request.body),
+                "method": request.method,
+                "url": _filter_url(request.url),
+            },
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "url": _filter_url(response.url),
+                "headers": dict(response.headers),
+                "encoding": response.encoding,
+                "body": base64.b64encode(response.content or b"").decode("ascii"),
+            },
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def replay(self, request: requests.PreparedRequest) -> requests.Response:
+        key = request_key(request.method, request.url, request.body)
+        with self._lock:
+            matches = [i for i in self.interactions if i["request"]["key"] == key]
+            if not matches:
+                raise CassetteMissError(f"{request.method} {request.url} is not recorded in {self.filename}")
+            position = self._replay_positions.get(key, 0)
+            self._replay_positions[key] = position + 1
+            recorded = matches[min(position, len(matches) - 1)]["response"]
+
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.reason = recorded["reason"]
+        response.url = request.url
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        # the body is stored decoded
+        response.headers.pop("Content-Encoding", None)
+        response.encoding = recorded["encoding"]
+        response._content = base64.b64decode(recorded["body"])
+        response._content_consumed = True
+        response.request = request
+        return response
+
+    def save(self):
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "interactions": self.interactions}
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        temp_filename = self.filename.with_suffix(f".{os.getpid()}.tmp")
+        temp_filename.write_text(json.dumps(data, indent=1, ensure_ascii=False))
+        temp_filename.replace(self.filename)
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    Transport adapter that records the exchanges of the wrapped adapter
+    into a cassette or replays them from the cassette without network access.
+    """
+
+    def __init__(self, cassette: Cassette, mode: str, adapter: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.mode = mode
+        self.adapter = adapter
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.mode == "replay":
+            return self.cassette.replay(request)
+
+        response = self.adapter.send(request, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class CassetteLibrary:
+    """
+    Process-wide switch for recording or replaying HTTP exchanges.
+
+    After `configure(directory, mode)`, every session that is passed
+    to `mount()` records into (or replays from) `<directory>/<namespace>.json`.
+    Recorded cassettes are written by `save()`.
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(self):
+        self.directory: Optional[Path] = None
+        self.mode: Optional[str] = None
+        self._cassettes: Dict[str, Cassette] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def configure(self, directory: Union[None, str, Path], mode: Optional[str] = None):
+        """
+        :param directory: str|Path|None, directory of the cassette files, None to disable
+        :param mode: str, "record" or "replay"
+        """
+        if directory is not None and mode not in self.MODES:
+            raise ValueError(f"Cassette mode must be one of {self.MODES}, got {mode!r}")
+        with self._lock:
+            self.directory = None if directory is None else Path(directory)
+            self.mode = None if directory is None else mode
+            self._cassettes.clear()
+
+    def get(self, namespace: str) -> Cassette:
+        with self._lock:
+            if namespace not in self._cassettes:
+                # a new recording replaces the previous one
+                self._cassettes[namespace] = Cassette(
+                    self.directory / f"{namespace}.json",
+                    load=self.mode == "replay",
+                )
+            return self._cassettes[namespace]
+
+    def mount(self, session: requests.Session, namespace: str):
+        """
+        Route all requests of the session through the cassette of `namespace`, if configured
+        """
+        if not self.active:
+            return
+        cassette = self.get(namespace)
+        for prefix in ("http://", "https://"):
+            session.mount(prefix, CassetteAdapter(cassette, self.mode, session.get_adapter(prefix)))
+
+    def save(self):
+        """
+        Write all recorded cassettes
+        """
+        if self.mode != "record":
+            return
+        with self._lock:
+            cassettes = list(self._cassettes.values())
+        for cassette in cassettes:
+            cassette.save()
+            log(f"recorded {len(cassette)} exchanges to {cassette.filename}")
+
+
+cassettes = CassetteLibrary()
+
+
+def request_key(method: str, url: str, body: Union[None, str, bytes] = None) -> str:
+    """
+    Normalize a request for matching.
+
+    The scheme and host are lower-cased, the query parameters sorted
+    (and FILTERED_PARAMS replaced) and json or form bodies are
+    serialized with sorted keys.
+    """
+    parts = urllib.parse.urlsplit(_filter_url(url))
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    url = urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+    return json.dumps([method.upper(), url, _normalize_body(body)])
+
+
+def _filter_url(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    if not parts.query:
+        return url
+    query = urllib.parse.urlencode([
+        (key, FILTERED_VALUE if key.lower() in FILTERED_PARAMS else value)
+        for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    ])
+    return urllib.parse.urlunsplit(parts._replace(query=query))
+
+
+def _normalize_body(body: Union[None, str, bytes]) -> Optional[str]:
+    if not body:
+        return None
+    if isinstance(body, bytes):
+        try:
+            body = body.decode("utf-8")
+        except UnicodeDecodeError:
+            return base64.b64encode(body).decode("ascii")
+    try:
+        return json.dumps(json.loads(body), sort_keys=True)
+    except ValueError:
+        pass
+    if "=" in body:
+        return urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(body, keep_blank_values=True)))
+    return body
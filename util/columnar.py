@@ -0,0 +1,235 @@
+import os
+import time
+import datetime
+from pathlib import Path
+from typing import Union, Optional, List, Dict, Tuple
+
+import numpy as np
+
+from .sinks import SnapshotSink
+from .structs import LotData
+
+
+# status codes in the `status` column, -1 for anything else
+STATUSES: Tuple[str, ...] = tuple(key for key in vars(LotData.Status) if not key.startswith("_"))
+# nullable integer columns
+INT_COLUMNS: Tuple[str, ...] = ("num_free", "num_occupied", "capacity")
+
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_COLUMN_TYPES = {
+    "timestamp": np.int64,
+    "lot_timestamp": np.int64,
+    "status": np.int8,
+    **{name: np.int32 for name in INT_COLUMNS},
+}
+_NULLABLE_COLUMNS = ("lot_timestamp", ) + INT_COLUMNS
+
+
+class ColumnBuffer:
+    """
+    Growable numpy array with an optional validity mask for null values
+    """
+
+    def __init__(self, dtype, nullable: bool = False, capacity: int = 1024):
+        self.size = 0
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.valid = np.zeros(capacity, dtype=bool) if nullable else None
+
+    def append(self, value):
+        if self.size == len(self.data):
+            self.data = np.resize(self.data, len(self.data) * 2)
+            if self.valid is not None:
+                self.valid = np.resize(self.valid, len(self.valid) * 2)
+
+        if self.valid is not None:
+            self.valid[self.size] = value is not None
+            if value is None:
+                value = 0
+        self.data[self.size] = value
+        self.size += 1
+
+    def clear(self):
+        self.size = 0
+
+
+class ColumnarWriter:
+    """
+    Writes the lots of snapshots as columnar chunk files into a directory.
+
+    Each lot of each snapshot becomes one row. Lot and pool IDs are
+    dictionary-encoded, timestamps are int64 unix seconds and the
+    integer columns have a validity mask. The rows are buffered
+    until `chunk_rows` is reached or `flush()` is called, then written
+    as a new compressed `.npz` file, so the directory can be appended
+    to by several runs (and processes). Use `ColumnarTable.load()` to read it.
+    """
+
+    def __init__(self, directory: Union[str, Path], chunk_rows: int = 100_000):
+        self.directory = Path(directory)
+        self.chunk_rows = chunk_rows
+        self._pool_codes: Dict[str, int] = {}
+        self._lot_codes: Dict[str, int] = {}
+        self._columns = {
+            "pool": ColumnBuffer(np.int32),
+            "lot": ColumnBuffer(np.int32),
+            **{
+                name: ColumnBuffer(dtype, nullable=name in _NULLABLE_COLUMNS)
+                for name, dtype in _COLUMN_TYPES.items()
+            },
+        }
+
+    @property
+    def num_rows(self) -> int:
+        return self._columns["lot"].size
+
+    def append_snapshot(self, snapshot: dict) -> int:
+        """
+        Buffer the lots of the snapshot.
+
+        :return: int, number of rows added
+        """
+        lots = snapshot.get("lots")
+        if not lots:
+            return 0
+
+        pool_code = self._pool_codes.setdefault(snapshot["pool"]["id"], len(self._pool_codes))
+        columns = self._columns
+        for lot in lots:
+            columns["pool"].append(pool_code)
+            columns["lot"].append(self._lot_codes.setdefault(lot["id"], len(self._lot_codes)))
+            columns["timestamp"].append(to_unix_seconds(lot["timestamp"]))
+            columns["lot_timestamp"].append(to_unix_seconds(lot.get("lot_timestamp")))
+            columns["status"].append(_STATUS_CODES.get(lot.get("status"), -1))
+            for name in INT_COLUMNS:
+                columns[name].append(lot.get(name))
+
+        if self.num_rows >= self.chunk_rows:
+            self.flush()
+        return len(lots)
+
+    def flush(self) -> Optional[Path]:
+        """
+        Write the buffered rows to a new chunk file and return its filename
+        """
+        if not self.num_rows:
+            return None
+
+        arrays = {
+            "pool_ids": np.array(list(self._pool_codes), dtype=str),
+            "lot_ids": np.array(list(self._lot_codes), dtype=str),
+        }
+        for name, column in self._columns.items():
+            arrays[name] = column.data[:column.size]
+            if column.valid is not None:
+                arrays[f"{name}_valid"] = column.valid[:column.size]
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        filename = self.directory / f"chunk-{time.time_ns()}-{os.getpid()}.npz"
+        temp_filename = filename.with_suffix(".tmp")
+        with temp_filename.open("wb") as fp:
+            np.savez_compressed(fp, **arrays)
+        temp_filename.replace(filename)
+
+        for column in self._columns.values():
+            column.clear()
+        self._pool_codes.clear()
+        self._lot_codes.clear()
+        return filename
+
+
+class ColumnarSink(SnapshotSink):
+    """
+    SnapshotSink that appends the snapshots to a columnar directory, see ColumnarWriter
+    """
+
+    def __init__(self, directory: Union[str, Path], chunk_rows: int = 100_000, **kwargs):
+        self.writer = ColumnarWriter(directory, chunk_rows=chunk_rows)
+        super().__init__(**kwargs)
+
+    def write_batch(self, snapshots: List[dict]):
+        for snapshot in snapshots:
+            self.writer.append_snapshot(snapshot)
+
+    def _close(self):
+        self.writer.flush()
+
+
+class ColumnarTable:
+    """
+    All rows of a columnar directory in memory.
+
+    `lot` and `pool` are indices into `lot_ids` and `pool_ids`,
+    `status` is an index into STATUSES. The nullable columns
+    have a boolean mask in `valid`.
+    """
+
+    def __init__(
+            self,
+            pool_ids: np.ndarray,
+            lot_ids: np.ndarray,
+            columns: Dict[str, np.ndarray],
+            valid: Dict[str, np.ndarray],
+    ):
+        self.pool_ids = pool_ids
+        self.lot_ids = lot_ids
+        self.columns = columns
+        self.valid = valid
+
+    def __len__(self):
+        return len(self.columns["lot"])
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    @classmethod
+    def load(cls, directory: Union[str, Path]) -> "ColumnarTable":
+        chunks = []
+        for filename in sorted(Path(directory).glob("chunk-*.npz")):
+            with np.load(filename) as data:
+                chunks.append({key: data[key] for key in data.files})
+
+        pool_ids, pool_codes = _merge_dictionaries(chunks, "pool_ids", "pool")
+        lot_ids, lot_codes = _merge_dictionaries(chunks, "lot_ids", "lot")
+        columns = {"pool": pool_codes, "lot": lot_codes}
+        valid = {}
+        for name, dtype in _COLUMN_TYPES.items():
+            columns[name] = _concatenate(chunks, name, dtype)
+            if name in _NULLABLE_COLUMNS:
+                valid[name] = _concatenate(chunks, f"{name}_valid", bool)
+
+        return cls(pool_ids=pool_ids, lot_ids=lot_ids, columns=columns, valid=valid)
+
+
+def to_unix_seconds(value: Union[None, str, datetime.datetime]) -> Optional[int]:
+    """
+    Convert an iso timestamp (naive means UTC) to unix seconds
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return int(value.timestamp())
+
+
+def _merge_dictionaries(chunks: List[dict], dictionary_key: str, code_key: str) -> Tuple[np.ndarray, np.ndarray]:
+    if not chunks:
+        return np.zeros(0, dtype=str), np.zeros(0, dtype=np.int32)
+
+    ids, inverse = np.unique(np.concatenate([chunk[dictionary_key] for chunk in chunks]), return_inverse=True)
+    codes = []
+    offset = 0
+    for chunk in chunks:
+        codes.append(inverse[offset:offset + len(chunk[dictionary_key])][chunk[code_key]])
+        offset += len(chunk[dictionary_key])
+    return ids, np.concatenate(codes).astype(np.int32)
+
+
+def _concatenate(chunks: List[dict], key: str, dtype) -> np.ndarray:
+    if not chunks:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate([chunk[key] for chunk in chunks])
@@ -0,0 +1,130 @@
+import time
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Optional, List, Type, Dict, Tuple
+
+from .scraper import ScraperBase
+from .snapshot import SnapshotMaker
+from .sinks import SnapshotSink
+from .delta import DeltaTracker
+from ._log import log
+
+
+class ScrapeScheduler:
+    """
+    Scrapes several pools repeatedly within one process.
+
+    Each pool keeps one scraper instance (and thus its requests.Session,
+    parsed geojson and lot infos) for the lifetime of the scheduler and
+    is scraped every `SCRAPE_INTERVAL` seconds of its scraper class.
+    The lot infos are reused for `LOT_INFO_TTL` seconds or, if the
+    scraper does not define it, for `default_info_ttl` seconds.
+
+    A pool is never scraped concurrently with itself. If a snapshot takes
+    longer than the interval, the next one starts right after it.
+    """
+
+    # Seconds that scraped lot infos are reused if the scraper does not define LOT_INFO_TTL
+    DEFAULT_INFO_TTL: float = 24 * 60 * 60
+    # Maximum number of pools that are scraped concurrently
+    DEFAULT_WORKERS: int = 4
+
+    def __init__(
+            self,
+            scrapers: Dict[str, Type[ScraperBase]],
+            sink: SnapshotSink,
+            caching: Union[bool, str] = False,
+            workers: Optional[int] = None,
+            infos_required: bool = False,
+            default_info_ttl: Optional[float] = None,
+            delta_tracker: Optional[DeltaTracker] = None,
+    ):
+        """
+        :param scrapers: dict of pool ID to scraper class
+        :param sink: SnapshotSink that receives each new snapshot
+        :param caching: bool|str, passed to the scraper instances
+        :param workers: int|None, maximum number of pools that are scraped concurrently,
+            defaults to DEFAULT_WORKERS
+        :param infos_required: bool, passed to SnapshotMaker.get_snapshot()
+        :param default_info_ttl: float|None, seconds that lot infos are reused
+            for scrapers without LOT_INFO_TTL, defaults to DEFAULT_INFO_TTL
+        :param delta_tracker: DeltaTracker|None, to write only the changed lots to the sink
+        """
+        self.sink = sink
+        self.workers = self.DEFAULT_WORKERS if workers is None else workers
+        self.infos_required = infos_required
+        default_info_ttl = self.DEFAULT_INFO_TTL if default_info_ttl is None else default_info_ttl
+
+        self.snapshot_makers: Dict[str, SnapshotMaker] = {}
+        self.intervals: Dict[str, float] = {}
+        for pool_id, scraper_class in scrapers.items():
+            info_ttl = scraper_class.LOT_INFO_TTL
+            self.snapshot_makers[pool_id] = SnapshotMaker(
+                scraper_class(caching=caching),
+                info_ttl=default_info_ttl if info_ttl is None else info_ttl,
+                sink=sink,
+                delta_tracker=delta_tracker,
+            )
+            self.intervals[pool_id] = scraper_class.SCRAPE_INTERVAL
+
+        self.num_runs: Dict[str, int] = {pool_id: 0 for pool_id in scrapers}
+        self._queue: List[Tuple[float, str]] = []
+        self._condition = threading.Condition()
+        self._stopped = False
+
+    def stop(self):
+        """
+        Stop the scheduler, `run()` returns after the running snapshots are finished.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def run(self, duration: Optional[float] = None):
+        """
+        Run the schedule until `stop()` is called or for `duration` seconds.
+
+        All pools are scraped immediately at start.
+        """
+        end_time = None if duration is None else time.monotonic() + duration
+        with self._condition:
+            self._stopped = False
+            self._queue = [(time.monotonic(), pool_id) for pool_id in sorted(self.snapshot_makers)]
+            heapq.heapify(self._queue)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                with self._condition:
+                    while not self._stopped:
+                        now = time.monotonic()
+                        if end_time is not None and now >= end_time:
+                            self._stopped = True
+                            break
+                        if self._queue and self._queue[0][0] <= now:
+                            break
+
+                        timeout = self._queue[0][0] - now if self._queue else None
+                        if end_time is not None:
+                            timeout = end_time - now if timeout is None else min(timeout, end_time - now)
+                        self._condition.wait(timeout)
+
+                    if self._stopped:
+                        break
+                    due_time, pool_id = heapq.heappop(self._queue)
+
+                executor.submit(self._run_pool, pool_id)
+
+    def _run_pool(self, pool_id: str):
+        start_time = time.monotonic()
+        try:
+            snapshot = self.snapshot_makers[pool_id].get_snapshot(infos_required=self.infos_required)
+            if snapshot.get("error"):
+                log(f"error in pool '{pool_id}': {snapshot['error']}")
+        except Exception as e:
+            log(f"error in pool '{pool_id}': {type(e).__name__}: {e}")
+        finally:
+            self.num_runs[pool_id] += 1
+            with self._condition:
+                heapq.heappush(self._queue, (start_time + self.intervals[pool_id], pool_id))
+                self._condition.notify_all()
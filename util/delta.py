@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Union, Optional, Dict
+
+from ._log import log
+
+
+class DeltaTracker:
+    """
+    Reduces snapshots to the lots whose realtime values changed
+    since the previous snapshot of the same pool.
+
+    A delta snapshot has `"keyframe": false`, contains only the changed
+    (or new) lots and lists the IDs of lots that disappeared in
+    `"removed_lots"`. The first snapshot of a pool and then one snapshot
+    every `keyframe_interval` seconds is a full snapshot with `"keyframe": true`.
+    Snapshots with an error are passed unchanged.
+
+    The previous values are kept in memory and, if `directory` is given,
+    in one json file per pool, so that they survive between processes.
+    """
+
+    # Fields of each lot that are compared between snapshots
+    REALTIME_FIELDS = ("status", "num_free", "num_occupied", "capacity", "lot_timestamp")
+
+    def __init__(
+            self,
+            directory: Union[None, str, Path] = None,
+            keyframe_interval: float = 60 * 60,
+    ):
+        self.directory = None if directory is None else Path(directory)
+        self.keyframe_interval = keyframe_interval
+        self._states: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def apply(self, snapshot: dict) -> dict:
+        """
+        Return the delta (or keyframe) of the snapshot and remember its values
+        """
+        if snapshot.get("error"):
+            return snapshot
+
+        pool_id = snapshot["pool"]["id"]
+        lot_values = {
+            lot["id"]: [lot.get(key) for key in self.REALTIME_FIELDS]
+            for lot in snapshot["lots"]
+        }
+        now = time.time()
+
+        with self._lock:
+            state = self._get_state(pool_id)
+            keyframe = state is None or state["keyframe_time"] < now - self.keyframe_interval
+
+            if keyframe:
+                delta = {**snapshot, "keyframe": True}
+                state = {"keyframe_time": now}
+            else:
+                delta = {
+                    **snapshot,
+                    "keyframe": False,
+                    "lots": [
+                        lot for lot in snapshot["lots"]
+                        if state["lots"].get(lot["id"]) != lot_values[lot["id"]]
+                    ],
+                    "removed_lots": sorted(set(state["lots"]) - set(lot_values)),
+                }
+
+            state["lots"] = lot_values
+            self._put_state(pool_id, state)
+
+        return delta
+
+    def reset(self, pool_id: str):
+        """
+        Forget the previous values, the next snapshot of the pool will be a keyframe
+        """
+        with self._lock:
+            self._states.pop(pool_id, None)
+            if self.directory is not None:
+                self._filename(pool_id).unlink(missing_ok=True)
+
+    def _filename(self, pool_id: str) -> Path:
+        return self.directory / f"{pool_id}.json"
+
+    def _get_state(self, pool_id: str) -> Optional[dict]:
+        if self.directory is None or pool_id in self._states:
+            return self._states.get(pool_id)
+        try:
+            return json.loads(self._filename(pool_id).read_text())
+        except (IOError, ValueError):
+            return None
+
+    def _put_state(self, pool_id: str, state: dict):
+        self._states[pool_id] = state
+        if self.directory is None:
+            return
+
+        filename = self._filename(pool_id)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp_filename = filename.with_suffix(f".{os.getpid()}.tmp")
+            temp_filename.write_text(json.dumps(state, ensure_ascii=False))
+            temp_filename.replace(filename)
+        except IOError as e:
+            log(f"could not write delta state {filename}: {type(e).__name__}: {e}")
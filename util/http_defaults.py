@@ -0,0 +1,18 @@
+"""
+Defaults that the v1 scrapers (util.scraper.ScraperBase) and the
+v3 pull converters (common.http_client.HttpClient) share.
+"""
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+# The user agent that is used in web requests
+USER_AGENT: str = "github.com/ParkenDD/ParkAPI2"
+
+# Directory of the response cache (and other caches)
+CACHE_DIR: Path = Path(tempfile.gettempdir()) / "parkapi-scraper"
+# Maximum size of all cached response bodies in bytes, None for no limit
+CACHE_MAX_SIZE: Optional[int] = 512 * 1024 * 1024
+# Compress the cached response bodies
+CACHE_COMPRESS: bool = True
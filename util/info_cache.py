@@ -0,0 +1,68 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Union, Optional, Dict, Tuple
+
+from .structs import LotInfo
+from ._log import log
+
+
+class LotInfoCache:
+    """
+    Persistent cache of each pool's LotInfo map.
+
+    Stores one json file per pool. Scraping the lot infos can take dozens
+    of requests for some pools, while they hardly ever change, so they
+    can be refreshed at a much slower pace than the lot data.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def filename(self, pool_id: str) -> Path:
+        return self.directory / f"{pool_id}.json"
+
+    def get(self, pool_id: str, ttl: float) -> Optional[Dict[str, LotInfo]]:
+        """
+        Return the cached LotInfo map of the pool or None if
+        it does not exist or is older than `ttl` seconds.
+        """
+        entry = self.get_entry(pool_id, ttl)
+        return None if entry is None else entry[1]
+
+    def get_entry(self, pool_id: str, ttl: float) -> Optional[Tuple[float, Dict[str, LotInfo]]]:
+        """
+        Same as `get` but returns a tuple of the cache time and the LotInfo map.
+        """
+        filename = self.filename(pool_id)
+        try:
+            data = json.loads(filename.read_text())
+        except (IOError, ValueError):
+            return None
+
+        if data["timestamp"] < time.time() - ttl:
+            return None
+
+        return data["timestamp"], {
+            info["id"]: LotInfo.from_dict(info)
+            for info in data["lot_infos"]
+        }
+
+    def put(self, pool_id: str, info_map: Dict[str, LotInfo]):
+        filename = self.filename(pool_id)
+        log(f"writing lot info cache {filename}")
+        data = {
+            "timestamp": time.time(),
+            "lot_infos": [info.to_dict() for info in info_map.values()],
+        }
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp_filename = filename.with_suffix(f".{os.getpid()}.tmp")
+            temp_filename.write_text(json.dumps(data, ensure_ascii=False))
+            temp_filename.replace(filename)
+
+    def delete(self, pool_id: str):
+        self.filename(pool_id).unlink(missing_ok=True)
@@ -0,0 +1,279 @@
+"""
+Startup profiling of the scraper discovery.
+
+This module must only import the standard library at the top because
+`measure_startup` loads it outside of the `util` package, in a fresh
+interpreter, before anything else is imported.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+import tracemalloc
+import importlib.abc
+from pathlib import Path
+from typing import Union, Optional, List, Dict
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """
+    Meta path finder that measures the execution time and the allocated
+    memory of each imported module.
+
+    It does not load modules itself but wraps the loaders found by the
+    other finders. `seconds` and `bytes` include the modules that were
+    imported while executing a module for the first time, `self_seconds`
+    and `self_bytes` do not.
+    """
+
+    def __init__(self):
+        self.records: Dict[str, dict] = {}
+        self._stack: List[list] = []
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _ProfilingLoader(self, spec.loader)
+                return spec
+
+    def enter(self, name: str):
+        self._stack.append([name, time.perf_counter(), _traced_memory(), 0., 0])
+
+    def exit(self, name: str):
+        _, start_time, start_memory, child_seconds, child_bytes = self._stack.pop()
+        seconds = time.perf_counter() - start_time
+        memory = _traced_memory() - start_memory
+        self.records[name] = {
+            "seconds": seconds,
+            "self_seconds": seconds - child_seconds,
+            "bytes": memory,
+            "self_bytes": memory - child_bytes,
+        }
+        if self._stack:
+            self._stack[-1][3] += seconds
+            self._stack[-1][4] += memory
+
+
+class _ProfilingLoader:
+
+    def __init__(self, profiler: ImportProfiler, loader):
+        self._profiler = profiler
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.exit(module.__name__)
+
+
+class CallCounter:
+    """
+    Wraps a function and counts the calls and the time spent in it
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+        self.seconds = 0.
+
+    def wrap(self):
+        def _wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return self.func(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start_time
+                self.calls += 1
+        return _wrapper
+
+    def to_dict(self) -> dict:
+        return {"calls": self.calls, "seconds": self.seconds}
+
+
+def measure_startup(
+        module_dir: str,
+        manifest_filename: str,
+        pool_filter: Optional[List[str]] = None,
+) -> dict:
+    """
+    Import `util` and discover the scrapers like `scraper.py` does
+    while recording each import and the `PoolInfo` / `ScraperBase.__init_subclass__` calls.
+
+    Should be called in a fresh interpreter, see `profile_startup`.
+    """
+    profiler = ImportProfiler()
+    profiler.install()
+    start_time = time.perf_counter()
+    start_memory = _traced_memory()
+
+    import util
+    from util.registry import ScraperRegistry
+
+    subclass_counter = CallCounter(util.ScraperBase.__dict__["__init_subclass__"].__func__)
+    util.ScraperBase.__init_subclass__ = classmethod(subclass_counter.wrap())
+    pool_info_counter = CallCounter(util.PoolInfo.__init__)
+    util.PoolInfo.__init__ = pool_info_counter.wrap()
+
+    util_seconds = time.perf_counter() - start_time
+    registry = ScraperRegistry(module_dir, manifest_filename)
+    scrapers = registry.get_scrapers(pool_filter=pool_filter)
+    profiler.uninstall()
+    seconds = time.perf_counter() - start_time
+
+    return {
+        "pools": sorted(scrapers),
+        "scraper_modules": sorted(module_name for module_name, filename in registry.iter_module_names()),
+        "seconds": seconds,
+        "util_seconds": util_seconds,
+        "get_scrapers_seconds": seconds - util_seconds,
+        "bytes": _traced_memory() - start_memory,
+        "peak_bytes": tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0,
+        "imports": profiler.records,
+        "init_subclass": subclass_counter.to_dict(),
+        "pool_info": pool_info_counter.to_dict(),
+    }
+
+
+# Loads this file without importing the `util` package
+# and writes the result of measure_startup() to a json file
+_CHILD_SCRIPT = """
+import sys, json, tracemalloc, importlib.util
+args = json.loads(sys.argv[1])
+if args.pop("trace_memory"):
+    tracemalloc.start()
+sys.path[:0] = args.pop("sys_path")
+spec = importlib.util.spec_from_file_location("_startup_profiling", args.pop("profiling_filename"))
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+output_filename = args.pop("output_filename")
+result = module.measure_startup(**args)
+with open(output_filename, "w") as fp:
+    json.dump(result, fp)
+"""
+
+
+def profile_startup(
+        module_dir: Union[str, Path],
+        manifest_filename: Union[str, Path],
+        pool_filter: Optional[List[str]] = None,
+) -> dict:
+    """
+    Profile the startup of a scraper process in fresh interpreters.
+
+    After a warm-up run, timings are measured in one process and memory is measured
+    with `tracemalloc` in a second process because tracing
+    slows down the imports considerably.
+
+    :return: dict, json-serializable report with the total time and memory,
+        the cumulative cost of each scraper module, the self cost of
+        each top-level dependency and the time spent in
+        `PoolInfo.__init__` and `ScraperBase.__init_subclass__`.
+    """
+    module_dir = Path(module_dir).resolve()
+    # warm-up run which builds the scraper manifest, if outdated,
+    # and the bytecode caches, which would otherwise distort the timings
+    _run_child(module_dir, manifest_filename, pool_filter, trace_memory=False)
+
+    timing, timing_process_seconds = _run_child(module_dir, manifest_filename, pool_filter, trace_memory=False)
+    memory, _ = _run_child(module_dir, manifest_filename, pool_filter, trace_memory=True)
+
+    scraper_modules = set(timing["scraper_modules"])
+    project_packages = {"util"} | {name.split(".")[0] for name in scraper_modules}
+
+    scrapers = {}
+    dependencies = {}
+    for name, record in timing["imports"].items():
+        memory_record = memory["imports"].get(name, {})
+        if name in scraper_modules:
+            scrapers[name] = {
+                "seconds": record["seconds"],
+                "self_seconds": record["self_seconds"],
+                "bytes": memory_record.get("bytes"),
+                "self_bytes": memory_record.get("self_bytes"),
+            }
+            continue
+
+        package = name.split(".")[0]
+        if package in project_packages:
+            continue
+        if package not in dependencies:
+            dependencies[package] = {
+                "stdlib": package in getattr(sys, "stdlib_module_names", ()),
+                "modules": 0,
+                "self_seconds": 0.,
+                "self_bytes": 0,
+            }
+        dependencies[package]["modules"] += 1
+        dependencies[package]["self_seconds"] += record["self_seconds"]
+        dependencies[package]["self_bytes"] += memory_record.get("self_bytes", 0)
+
+    return {
+        "python": sys.version.split()[0],
+        "pools": timing["pools"],
+        "process_seconds": timing_process_seconds,
+        "seconds": timing["seconds"],
+        "util_seconds": timing["util_seconds"],
+        "get_scrapers_seconds": timing["get_scrapers_seconds"],
+        "bytes": memory["bytes"],
+        "peak_bytes": memory["peak_bytes"],
+        "validation": {
+            "pool_info": timing["pool_info"],
+            "init_subclass": timing["init_subclass"],
+        },
+        "scrapers": dict(sorted(scrapers.items(), key=lambda i: -i[1]["seconds"])),
+        "dependencies": dict(sorted(dependencies.items(), key=lambda i: -i[1]["self_seconds"])),
+    }
+
+
+def _run_child(
+        module_dir: Path,
+        manifest_filename: Union[str, Path],
+        pool_filter: Optional[List[str]],
+        trace_memory: bool,
+):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_filename = os.path.join(temp_dir, "startup.json")
+        args = {
+            "trace_memory": trace_memory,
+            "sys_path": [str(module_dir), str(Path(__file__).resolve().parent.parent)],
+            "profiling_filename": str(Path(__file__).resolve()),
+            "output_filename": output_filename,
+            "module_dir": str(module_dir),
+            "manifest_filename": str(manifest_filename),
+            "pool_filter": pool_filter,
+        }
+        start_time = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", _CHILD_SCRIPT, json.dumps(args)],
+            cwd=str(module_dir), check=True, stdout=subprocess.DEVNULL,
+        )
+        process_seconds = time.perf_counter() - start_time
+        with open(output_filename) as fp:
+            return json.load(fp), process_seconds
+
+
+def _traced_memory() -> int:
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return 0
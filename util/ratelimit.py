@@ -0,0 +1,157 @@
+import threading
+import time
+import urllib.parse
+from typing import Optional, Tuple, Dict
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    The bucket holds up to `capacity` tokens and is refilled
+    with `rate` tokens per second. A `rate` of None disables the limit.
+    """
+
+    def __init__(self, rate: Optional[float], capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(rate={self.rate}, capacity={self.capacity})"
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_time) * self.rate)
+        self._last_time = now
+
+    def reserve(self, tokens: float = 1.) -> float:
+        """
+        Take tokens from the bucket without blocking.
+
+        The tokens are reserved even if they are not available yet,
+        so the caller must wait the returned number of seconds before
+        doing the actual work. Async callers can simply
+        `await asyncio.sleep(bucket.reserve())`.
+
+        :param tokens: float, number of tokens to take
+        :return: float, seconds to wait
+        """
+        if not self.rate:
+            return 0.
+
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.
+            return -self._tokens / self.rate
+
+    def tighten(self, rate: Optional[float], capacity: int = 1):
+        """
+        Lower the rate and capacity to the given values if they are stricter.
+        A `rate` of None does not change anything.
+        """
+        if not rate:
+            return
+
+        with self._lock:
+            if self.rate:
+                self._refill()
+            else:
+                self._last_time = time.monotonic()
+            if not self.rate or rate < self.rate:
+                self.rate = rate
+            if capacity < self.capacity:
+                self.capacity = max(1, capacity)
+                self._tokens = min(self._tokens, self.capacity)
+
+    def try_acquire(self, tokens: float = 1.) -> bool:
+        """
+        Take tokens only if they are available right now.
+
+        :return: bool, True if the tokens were taken
+        """
+        if not self.rate:
+            return True
+
+        with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def acquire(self, tokens: float = 1.) -> float:
+        """
+        Take tokens and block until they are available.
+
+        :return: float, the seconds that have been waited
+        """
+        wait_time = self.reserve(tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+
+class HostRateLimiter:
+    """
+    Process-wide registry of token buckets, one per hostname.
+
+    Hosts can be configured explicitly with `configure_host()`.
+    Unconfigured hosts get a bucket with the rate and burst of the callers,
+    which usually are the scrapers' own REQUESTS_PER_SECOND / REQUEST_BURST
+    settings. If callers with different limits request the same host, the
+    strictest one applies, regardless of which caller came first.
+    """
+
+    def __init__(self):
+        self._host_config: Dict[str, Tuple[Optional[float], int]] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure_host(self, host: str, requests_per_second: Optional[float], burst: int = 1):
+        """
+        Set the rate limit for all requests to `host`.
+
+        :param host: str, the hostname, e.g. "data.mfdz.de"
+        :param requests_per_second: float|None, None disables the limit
+        :param burst: int, number of requests that can be fired without waiting
+        """
+        host = host.lower()
+        with self._lock:
+            self._host_config[host] = (requests_per_second, burst)
+            self._buckets.pop(host, None)
+
+    def get_bucket(self, host: str, default_rate: Optional[float] = None, default_burst: int = 1) -> TokenBucket:
+        host = host.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self._host_config.get(host, (default_rate, default_burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            elif host not in self._host_config:
+                bucket.tighten(default_rate, default_burst)
+            return bucket
+
+    def reserve(self, url: str, default_rate: Optional[float] = None, default_burst: int = 1) -> float:
+        """
+        Reserve one request to the host of `url`, see `TokenBucket.reserve`.
+
+        :return: float, seconds to wait
+        """
+        host = urllib.parse.urlsplit(url).hostname
+        if not host:
+            return 0.
+        return self.get_bucket(host, default_rate, default_burst).reserve()
+
+    def reset(self):
+        """Drop all buckets and host configurations"""
+        with self._lock:
+            self._host_config.clear()
+            self._buckets.clear()
+
+
+host_rate_limiter = HostRateLimiter()
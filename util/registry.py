@@ -0,0 +1,145 @@
+import os
+import json
+import glob
+import importlib
+import inspect
+import itertools
+import threading
+from pathlib import Path
+from typing import Union, Optional, List, Dict
+
+from ._log import log
+
+
+class ScraperRegistry:
+    """
+    Finds all scraper classes below a directory.
+
+    Importing all scraper modules (and their dependencies) is slow, so
+    the registry keeps a manifest that maps each pool ID to the module
+    and class name of its scraper. The manifest is rebuilt whenever a
+    python file is added, removed or changed. With the manifest, only
+    the modules of the requested pools need to be imported.
+    """
+
+    VERSION = 1
+
+    # directories that never contain scrapers
+    EXCLUDE_DIRS = ("tests", "util", "benchmarks")
+    # modules that never contain scrapers
+    EXCLUDE_MODULES = ("scraper", )
+
+    def __init__(self, module_dir: Union[str, Path], manifest_filename: Union[str, Path]):
+        self.module_dir = Path(module_dir)
+        self.manifest_filename = Path(manifest_filename)
+        self._lock = threading.Lock()
+
+    def iter_module_names(self):
+        for filename in sorted(itertools.chain(
+                glob.glob(str(self.module_dir / "*.py")),
+                glob.glob(str(self.module_dir / "*" / "*.py"))
+        )):
+            filename = Path(filename)
+            if filename.parent.name in self.EXCLUDE_DIRS:
+                continue
+
+            module_name = str(filename.relative_to(self.module_dir))[:-3].replace(os.path.sep, ".")
+            if module_name in self.EXCLUDE_MODULES:
+                continue
+
+            yield module_name, filename
+
+    def fingerprint(self) -> List[list]:
+        """
+        Return name, modification time and size of each module file
+        """
+        fingerprint = []
+        for module_name, filename in self.iter_module_names():
+            stat = filename.stat()
+            fingerprint.append([module_name, stat.st_mtime_ns, stat.st_size])
+        return fingerprint
+
+    def get_manifest(self, rebuild: bool = False) -> Dict[str, dict]:
+        """
+        Return the pool ID to {"module": ..., "class": ...} mapping
+        and rebuild it if it's outdated.
+        """
+        with self._lock:
+            fingerprint = self.fingerprint()
+            if not rebuild:
+                try:
+                    manifest = json.loads(self.manifest_filename.read_text())
+                    if manifest["version"] == self.VERSION and manifest["fingerprint"] == fingerprint:
+                        return manifest["pools"]
+                except (IOError, ValueError, KeyError):
+                    pass
+
+            pools = {
+                pool_id: {"module": scraper_class.__module__, "class": scraper_class.__name__}
+                for pool_id, scraper_class in self.import_all().items()
+            }
+            log(f"writing scraper manifest {self.manifest_filename}")
+            self.manifest_filename.parent.mkdir(parents=True, exist_ok=True)
+            temp_filename = self.manifest_filename.with_suffix(f".{os.getpid()}.tmp")
+            temp_filename.write_text(json.dumps({
+                "version": self.VERSION,
+                "fingerprint": fingerprint,
+                "pools": pools,
+            }, indent=2))
+            temp_filename.replace(self.manifest_filename)
+            return pools
+
+    def pool_ids(self) -> List[str]:
+        return sorted(self.get_manifest())
+
+    def import_all(self) -> Dict[str, type]:
+        """
+        Import all modules and return all scraper classes by their pool ID
+        """
+        scrapers = dict()
+        for module_name, filename in self.iter_module_names():
+            module = importlib.import_module(module_name)
+            for key, scraper_class in vars(module).items():
+                if not inspect.isclass(scraper_class) or not getattr(scraper_class, "POOL", None):
+                    continue
+
+                # imported from another module
+                if scraper_class.__module__ != module.__name__:
+                    continue
+
+                if scraper_class.POOL.id in scrapers:
+                    raise ValueError(
+                        f"{scraper_class.__name__}.POOL.id '{scraper_class.POOL.id}'"
+                        f" is already used by class {scrapers[scraper_class.POOL.id].__name__}"
+                    )
+
+                scrapers[scraper_class.POOL.id] = scraper_class
+
+        return scrapers
+
+    def get_scrapers(self, pool_filter: Optional[List[str]] = None) -> Dict[str, type]:
+        """
+        Return the scraper classes by their pool ID.
+
+        :param pool_filter: list of pool IDs, only the modules of these pools are imported
+        """
+        if not pool_filter:
+            return self.import_all()
+
+        manifest = self.get_manifest()
+        scrapers = dict()
+        for pool_id in pool_filter:
+            if pool_id not in manifest:
+                continue
+            module = importlib.import_module(manifest[pool_id]["module"])
+            scraper_class = getattr(module, manifest[pool_id]["class"], None)
+            if scraper_class is None or getattr(scraper_class, "POOL", None) is None or scraper_class.POOL.id != pool_id:
+                # the manifest does not fit the sources, should only happen during development
+                return {
+                    pool_id: scraper_class
+                    for pool_id, scraper_class in self.import_all().items()
+                    if pool_id in pool_filter
+                }
+            scrapers[pool_id] = scraper_class
+
+        return scrapers
@@ -0,0 +1,134 @@
+"""
+A specialized checker for the subset of JSON schema used by schema.json.
+
+`compile_schema()` generates python source code for one schema and
+compiles it into a function that only answers "valid or not" - without
+error paths or messages - but much faster than a generic jsonschema
+validator. It is strict: whenever it is unsure, e.g. a float where an
+integer is expected, it reports invalid, so a valid answer can be
+trusted and an invalid one should be explained by jsonschema.
+"""
+import re
+from typing import Callable, Any, Dict, List
+
+
+Checker = Callable[[Any], bool]
+
+# keywords that do not affect validation
+_ANNOTATIONS = {"$schema", "$id", "title", "description", "definitions"}
+_KEYWORDS = {"$ref", "type", "required", "properties", "items", "maxLength", "pattern"}
+
+_TYPE_EXPRESSIONS = {
+    "string": "isinstance({0}, str)",
+    "integer": "type({0}) is int",
+    "number": "type({0}) in (int, float)",
+    "boolean": "type({0}) is bool",
+    "null": "{0} is None",
+    "object": "isinstance({0}, dict)",
+    "array": "isinstance({0}, list)",
+}
+
+
+def compile_schema(schema: dict) -> Checker:
+    """
+    Compile the schema into a function that returns True if a value is valid.
+
+    Raises NotImplementedError if the schema uses keywords that are not supported.
+    """
+    return _Compiler(schema).compile()
+
+
+class _Compiler:
+
+    def __init__(self, root: dict):
+        self.root = root
+        # generated function name per $ref
+        self.ref_functions: Dict[str, str] = {}
+        self.functions: List[List[str]] = []
+        self.namespace: Dict[str, Any] = {}
+        self.num_variables = 0
+
+    def compile(self) -> Checker:
+        self.add_function("check", self.root)
+        source = "\n\n".join("\n".join(lines) for lines in self.functions)
+        exec(compile(source, "<schema_check>", "exec"), self.namespace)
+        checker = self.namespace["check"]
+        checker.source = source
+        return checker
+
+    def add_function(self, name: str, schema: dict):
+        lines = [f"def {name}(value):"]
+        self.functions.append(lines)
+        self.emit(schema, "value", lines, "    ")
+        lines.append("    return True")
+
+    def variable(self, prefix: str) -> str:
+        self.num_variables += 1
+        return f"{prefix}_{self.num_variables}"
+
+    def emit(self, schema: dict, var: str, lines: List[str], indent: str):
+        """
+        Add statements that `return False` if `var` does not match the schema
+        """
+        unsupported = set(schema) - _ANNOTATIONS - _KEYWORDS
+        if unsupported:
+            raise NotImplementedError(f"Unsupported schema keywords {sorted(unsupported)}")
+
+        if "$ref" in schema:
+            # draft 7 ignores all sibling keywords of $ref
+            lines.append(f"{indent}if not {self.ref_function(schema['$ref'])}({var}):")
+            lines.append(f"{indent}    return False")
+            return
+
+        if "type" in schema:
+            types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            expression = " or ".join(_TYPE_EXPRESSIONS[name].format(var) for name in types)
+            lines.append(f"{indent}if not ({expression}):")
+            lines.append(f"{indent}    return False")
+
+        string_checks = []
+        if "maxLength" in schema:
+            string_checks.append(f"len({var}) > {int(schema['maxLength'])}")
+        if "pattern" in schema:
+            search = self.variable("search")
+            self.namespace[search] = re.compile(schema["pattern"]).search
+            string_checks.append(f"{search}({var}) is None")
+        if string_checks:
+            lines.append(f"{indent}if isinstance({var}, str) and ({' or '.join(string_checks)}):")
+            lines.append(f"{indent}    return False")
+
+        if "required" in schema or "properties" in schema:
+            lines.append(f"{indent}if isinstance({var}, dict):")
+            for key in schema.get("required", []):
+                lines.append(f"{indent}    if {key!r} not in {var}:")
+                lines.append(f"{indent}        return False")
+            for key, sub_schema in schema.get("properties", {}).items():
+                sub_var = self.variable("prop")
+                lines.append(f"{indent}    if {key!r} in {var}:")
+                lines.append(f"{indent}        {sub_var} = {var}[{key!r}]")
+                self.emit(sub_schema, sub_var, lines, indent + "        ")
+            lines.append(f"{indent}    pass")
+
+        if "items" in schema:
+            if not isinstance(schema["items"], dict):
+                raise NotImplementedError("Only a single 'items' schema is supported")
+            item_var = self.variable("item")
+            lines.append(f"{indent}if isinstance({var}, list):")
+            lines.append(f"{indent}    for {item_var} in {var}:")
+            self.emit(schema["items"], item_var, lines, indent + "        ")
+            lines.append(f"{indent}        pass")
+
+    def ref_function(self, ref: str) -> str:
+        if not ref.startswith("#/"):
+            raise NotImplementedError(f"Only local $refs are supported, got '{ref}'")
+
+        if ref not in self.ref_functions:
+            name = self.variable("ref")
+            # register the name first to allow recursive schemas
+            self.ref_functions[ref] = name
+            schema = self.root
+            for key in ref[2:].split("/"):
+                schema = schema[key]
+            self.add_function(name, schema)
+
+        return self.ref_functions[ref]
@@ -1,19 +1,20 @@
 import os
 import re
 import time
-import hashlib
+import asyncio
 import json
 import datetime
 from pathlib import Path
-import tempfile
-import pickle
 import pytz
 import argparse
 import glob
 import importlib
 import sys
 import inspect
-from typing import Union, Optional, Tuple, List, Type, Dict
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Optional, Tuple, List, Type, Dict, Callable, Any, Iterable
 
 import requests
 from bs4 import BeautifulSoup
@@ -21,6 +22,18 @@ from bs4 import BeautifulSoup
 from .structs import PoolInfo, LotInfo, LotData
 from .dt import to_utc_datetime
 from ._log import log
+from .ratelimit import TokenBucket, host_rate_limiter
+from .cassette import cassettes
+from . import http_defaults
+from .cache import (
+    RESPONSE_CACHE_FILENAME,
+    ResponseCache,
+    get_response_cache,
+    conditional_namespace,
+    conditional_request_headers,
+    response_validator,
+)
+from .info_cache import LotInfoCache
 from .strings import name_to_legacy_id, guess_lot_type, parse_geojson
 
 
@@ -37,26 +50,46 @@ class ScraperBase:
     # ---- general config ----
 
     # Directory where web requests are cached
-    CACHE_DIR = Path(tempfile.gettempdir()) / "parkapi-scraper"
+    CACHE_DIR: Path = http_defaults.CACHE_DIR
+    # Seconds after which a cached response is not used anymore, None for no expiry
+    CACHE_TTL: Optional[float] = None
+    # Maximum size of all cached response bodies in bytes, None for no limit
+    CACHE_MAX_SIZE: Optional[int] = http_defaults.CACHE_MAX_SIZE
+    # Compress the cached response bodies
+    CACHE_COMPRESS: bool = http_defaults.CACHE_COMPRESS
+    # Seconds that scraped lot infos are reused by the SnapshotMaker, None to scrape them each time.
+    # Does not apply to pools with a geojson file.
+    LOT_INFO_TTL: Optional[float] = None
+    # Seconds between two snapshots of this pool in `scraper.py serve`
+    SCRAPE_INTERVAL: float = 60.
 
     # ---- http request config ----
 
-    # Maximum requests allowed per second
+    # Maximum requests allowed per second.
+    # Requests to a host that other pools (or converters) request as well also share
+    # one process-wide bucket per host, which uses the strictest REQUESTS_PER_SECOND
+    # of all of them, unless the host is configured with host_rate_limiter.configure_host()
     REQUESTS_PER_SECOND: float = 2.
+    # Number of requests that can be fired in a row before throttling starts
+    REQUEST_BURST: int = 1
+    # Maximum number of pooled keep-alive connections per host
+    MAX_CONNECTIONS: int = 10
+    # Maximum number of pages that iter_json_pages() requests concurrently
+    MAX_CONCURRENT_PAGES: int = 4
     # Seconds before a web request is cancelled
     REQUEST_TIMEOUT: int = 10
     # The user agent that is used in web requests
-    USER_AGENT: str = "github.com/ParkenDD/ParkAPI2"
+    USER_AGENT: str = http_defaults.USER_AGENT
     # Extra headers that should be added to all requests
     HEADERS: Dict[str, str] = {}
+    # Send If-None-Match / If-Modified-Since headers for GET requests
+    # and reuse the previous response (and parsed result) if the server
+    # answers with 304 Not Modified
+    CONDITIONAL_REQUESTS: bool = False
     # Set to True to allow any invalid certificate
     # Set to "expired" to allow expired certificates
     ALLOW_SSL_FAILURE: Union[bool, str] = False
 
-    # ---- internals ----
-
-    __last_request_time = 0
-
     def __init_subclass__(cls, **kwargs):
         if not isinstance(cls.POOL, PoolInfo):
             raise ValueError(f"Must specify {cls.__name__}.POOL = PoolInfo(...)")
@@ -76,39 +109,84 @@ class ScraperBase:
             against the website.
         """
         self.caching = caching
+        self._request_memo: Optional[dict] = None
+        self._request_memo_lock = threading.Lock()
+        self._conditional_results: Dict[tuple, Tuple[str, Any]] = dict()
+        self._geojson_lot_infos: Optional[Tuple[tuple, List[LotInfo]]] = None
+        self.rate_limit = TokenBucket(self.REQUESTS_PER_SECOND, self.REQUEST_BURST)
         self.session = requests.Session()
         self.session.headers = {
             "User-Agent": self.USER_AGENT,
         }
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.MAX_CONNECTIONS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        cassettes.mount(self.session, self.POOL.id)
 
     # ---------- methods that need implementation -------------
 
+    # A scraper implements either the synchronous get_lot_data() or
+    # the async aget_lot_data(), the other one is provided by ScraperBase.
+    # The same is true for get_lot_infos() and aget_lot_infos().
+
     def get_lot_data(self) -> List[LotData]:
+        if self._implements("aget_lot_data"):
+            return asyncio.run(self.aget_lot_data())
+        raise NotImplementedError
+
+    async def aget_lot_data(self) -> List[LotData]:
+        if self._implements("get_lot_data"):
+            return await asyncio.to_thread(self.get_lot_data)
         raise NotImplementedError
 
     # ------------------- LotInfo data ------------------------
 
     def get_lot_infos(self) -> List[LotInfo]:
+        if self._implements("aget_lot_infos"):
+            return asyncio.run(self.aget_lot_infos())
         raise NotImplementedError
 
+    async def aget_lot_infos(self) -> List[LotInfo]:
+        if self._implements("get_lot_infos"):
+            return await asyncio.to_thread(self.get_lot_infos)
+        raise NotImplementedError
+
+    def _implements(self, method_name: str) -> bool:
+        return getattr(self.__class__, method_name) is not getattr(ScraperBase, method_name)
+
+    @classmethod
+    def geojson_filename(cls) -> Path:
+        return Path(inspect.getfile(cls)[:-3] + ".geojson")
+
     def get_lot_infos_from_geojson(self) -> Optional[List[LotInfo]]:
-        filename = Path(inspect.getfile(self.__class__)[:-3] + ".geojson")
-        if filename.exists():
-            geojson = parse_geojson(filename.read_text())
-            infos = []
-            for feature in geojson["features"]:
-                lot_info = feature["properties"].copy()
-
-                if feature.get("geometry"):
-                    if feature["geometry"]["type"] != "Point":
-                        raise ValueError(
-                            f"""geometry type '{feature["geometry"]["type"]}' for lot '{lot_info["id"]}' not supported"""
-                        )
-                    lot_info["latitude"] = feature["geometry"]["coordinates"][1]
-                    lot_info["longitude"] = feature["geometry"]["coordinates"][0]
-
-                infos.append(LotInfo.from_dict(lot_info))
-            return infos
+        filename = self.geojson_filename()
+        try:
+            stat = filename.stat()
+        except FileNotFoundError:
+            return None
+
+        # parse the file only once per scraper instance, unless it changes
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        if self._geojson_lot_infos is None or self._geojson_lot_infos[0] != file_key:
+            self._geojson_lot_infos = (file_key, self._parse_geojson_lot_infos(filename))
+        return list(self._geojson_lot_infos[1])
+
+    def _parse_geojson_lot_infos(self, filename: Path) -> List[LotInfo]:
+        geojson = parse_geojson(filename.read_text())
+        infos = []
+        for feature in geojson["features"]:
+            lot_info = feature["properties"].copy()
+
+            if feature.get("geometry"):
+                if feature["geometry"]["type"] != "Point":
+                    raise ValueError(
+                        f"""geometry type '{feature["geometry"]["type"]}' for lot '{lot_info["id"]}' not supported"""
+                    )
+                lot_info["latitude"] = feature["geometry"]["coordinates"][1]
+                lot_info["longitude"] = feature["geometry"]["coordinates"][0]
+
+            infos.append(LotInfo.from_dict(lot_info))
+        return infos
 
     def get_lot_info_map(self, required: bool = True) -> Dict[str, LotInfo]:
         lot_infos = self.get_lot_infos_from_geojson()
@@ -116,14 +194,29 @@ class ScraperBase:
             try:
                 lot_infos = self.get_lot_infos()
             except NotImplementedError:
-                if required:
-                    raise NotImplementedError(
-                        f"You need to either implement {self.__class__.__name__}.get_lot_infos()"
-                        f" or create a {Path(inspect.getfile(self.__class__)).name[:-3]}.geojson file"
-                    )
-                else:
-                    return dict()
+                return self._lot_infos_not_implemented(required)
+
+        return self._lot_info_list_to_map(lot_infos)
+
+    async def aget_lot_info_map(self, required: bool = True) -> Dict[str, LotInfo]:
+        lot_infos = self.get_lot_infos_from_geojson()
+        if not lot_infos:
+            try:
+                lot_infos = await self.aget_lot_infos()
+            except NotImplementedError:
+                return self._lot_infos_not_implemented(required)
 
+        return self._lot_info_list_to_map(lot_infos)
+
+    def _lot_infos_not_implemented(self, required: bool) -> Dict[str, LotInfo]:
+        if required:
+            raise NotImplementedError(
+                f"You need to either implement {self.__class__.__name__}.get_lot_infos()"
+                f" or create a {self.geojson_filename().name} file"
+            )
+        return dict()
+
+    def _lot_info_list_to_map(self, lot_infos: List[LotInfo]) -> Dict[str, LotInfo]:
         lot_ids = set()
         for info in lot_infos:
             if info.id in lot_ids:
@@ -145,17 +238,20 @@ class ScraperBase:
             method: str = "GET",
             expected_status: Optional[int] = None,
             caching: Optional[Union[bool, str]] = None,
+            throttle: bool = True,
             **kwargs,
     ) -> requests.Response:
         """
         Request any url from the web.
 
-        Will throttle all requests to the REQUESTS_PER_SECOND value.
+        Will throttle all requests to the REQUESTS_PER_SECOND value
+        and to the process-wide limit of the requested host.
 
         :param url: str, Fully qualified web url
         :param method: str, The HTTP method
         :param expected_status: int|None, Raises error when returned status differs.
         :param caching: bool|str|None, Override the file-caching setting, can be True, False, "read" or "write"
+        :param throttle: bool, Set to False if the caller already waited for reserve_request()
         :param kwargs: any arguments to requests.request() except "method" and "url"
 
         :return: requests.Response instance
@@ -170,38 +266,28 @@ class ScraperBase:
 
         # -- check file cache --
 
-        cache_name = None
+        request_key = self._request_key(method, url, kwargs)
         caching = self.caching if caching is None else caching
-        if caching:
-            cache_name = hashlib.md5(f"{method} {url} {kwargs}".encode("utf-8")).hexdigest()
-            cache_name = self.CACHE_DIR / self.POOL.id / f"{cache_name}.pkl"
 
         if caching in (True, "read"):
-            if cache_name.exists():
-                log(f"loading cache {cache_name}")
-                return pickle.loads(cache_name.read_bytes())
+            response = self.get_response_cache().get(self.POOL.id, request_key, ttl=self.CACHE_TTL)
+            if response is not None:
+                log(f"loading cache for {method} {url}")
+                return response
 
         # -- define timeout --
 
         kwargs.setdefault("timeout", self.REQUEST_TIMEOUT)
 
-        # -- do actual request --
+        # -- do actual request or reuse the response from within request_memo() --
 
         if self.ALLOW_SSL_FAILURE is True:
             kwargs["verify"] = False
 
-        try:
-            response = self._request(method, url, **kwargs)
-        except requests.exceptions.SSLError as e:
-            if not self.ALLOW_SSL_FAILURE:
-                raise
-            if self.ALLOW_SSL_FAILURE == "expired":
-                if "certificate has expired" not in str(e):
-                    raise
-
-            log(f"repeating request without certificate validation")
-            kwargs["verify"] = False
-            response = self._request(method, url, **kwargs)
+        response = self._memoized(
+            ("request", request_key),
+            lambda: self._request_conditional(method, url, request_key, throttle, kwargs),
+        )
 
         # -- validate status --
 
@@ -215,9 +301,8 @@ class ScraperBase:
         # -- store cache --
 
         if caching in (True, "write"):
-            log(f"writing cache to {cache_name}")
-            os.makedirs(str(self.CACHE_DIR / self.POOL.id), exist_ok=True)
-            cache_name.write_bytes(pickle.dumps(response))
+            log(f"writing cache for {method} {url}")
+            self.get_response_cache().put(self.POOL.id, request_key, response)
 
         return response
 
@@ -228,6 +313,21 @@ class ScraperBase:
             expected_status: int = 200,
             caching: Optional[Union[bool, str]] = None,
             **kwargs,
+    ) -> Union[dict, list]:
+        key = ("json", self._request_key(method, url, kwargs), expected_status)
+        return self._memoized(
+            key,
+            lambda: self._request_json(key, url, method, expected_status, caching, **kwargs),
+        )
+
+    def _request_json(
+            self,
+            key: tuple,
+            url: str,
+            method: str,
+            expected_status: int,
+            caching: Optional[Union[bool, str]],
+            **kwargs,
     ) -> Union[dict, list]:
         response = self.request(
             url=url, method=method,
@@ -237,13 +337,63 @@ class ScraperBase:
             **kwargs,
         )
         try:
-            return response.json()
+            return self._parse_response(key, response, lambda r: r.json())
         except:
             print("\n", file=sys.stderr)
             print("RESPONSE CONTENT:", file=sys.stderr)
             print(response.content, file=sys.stderr)
             raise
 
+    def iter_json_pages(
+            self,
+            url: str,
+            get_items: Callable[[Any], list],
+            get_total: Callable[[Any], int],
+            page_size: int = 100,
+            offset_param: str = "offset",
+            limit_param: str = "limit",
+            params: Optional[dict] = None,
+            **kwargs,
+    ) -> Iterable[Any]:
+        """
+        Yield all items of a paginated json API that accepts offset and limit parameters.
+
+        The first page is requested to learn the total number of items,
+        then the remaining pages are requested concurrently (at most
+        MAX_CONCURRENT_PAGES at once, each request still honors the rate limits).
+        The items are yielded in page order as soon as their page is available.
+
+        :param url: str, the url of the listing
+        :param get_items: callable, returns the list of items of a parsed page
+        :param get_total: callable, returns the total number of items from a parsed page
+        :param page_size: int, number of items per page
+        :param offset_param: str, name of the offset parameter
+        :param limit_param: str, name of the page size parameter
+        :param params: dict, additional url parameters
+        :param kwargs: any arguments to request_json()
+        """
+        def _request_page(offset: int) -> list:
+            page = self.request_json(url, params={**(params or {}), offset_param: offset, limit_param: page_size}, **kwargs)
+            return get_items(page)
+
+        first_page = self.request_json(url, params={**(params or {}), offset_param: 0, limit_param: page_size}, **kwargs)
+        items = get_items(first_page)
+        yield from items
+        if not items:
+            return
+
+        # the server might return less than page_size items per page
+        offsets = range(len(items), get_total(first_page), len(items))
+        if not offsets:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(self.MAX_CONCURRENT_PAGES, len(offsets)))
+        try:
+            for items in executor.map(_request_page, offsets):
+                yield from items
+        finally:
+            executor.shutdown(cancel_futures=True)
+
     def request_soup(
             self,
             url: str,
@@ -253,6 +403,23 @@ class ScraperBase:
             parser: str = "html.parser",
             encoding: Optional[str] = None,
             **kwargs,
+    ) -> BeautifulSoup:
+        key = ("soup", self._request_key(method, url, kwargs), expected_status, parser, encoding)
+        return self._memoized(
+            key,
+            lambda: self._request_soup(key, url, method, expected_status, caching, parser, encoding, **kwargs),
+        )
+
+    def _request_soup(
+            self,
+            key: tuple,
+            url: str,
+            method: str,
+            expected_status: Optional[int],
+            caching: Optional[Union[bool, str]],
+            parser: str,
+            encoding: Optional[str],
+            **kwargs,
     ) -> BeautifulSoup:
         response = self.request(
             url=url, method=method,
@@ -260,20 +427,217 @@ class ScraperBase:
             caching=caching,
             **kwargs,
         )
-        if encoding:
-            text = response.content.decode(encoding)
-        else:
-            text = response.text
-        return BeautifulSoup(text, features=parser)
 
-    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        def _parse(response: requests.Response) -> BeautifulSoup:
+            if encoding:
+                text = response.content.decode(encoding)
+            else:
+                text = response.text
+            return BeautifulSoup(text, features=parser)
+
+        return self._parse_response(key, response, _parse)
+
+    async def arequest(
+            self,
+            url: str,
+            method: str = "GET",
+            expected_status: Optional[int] = None,
+            caching: Optional[Union[bool, str]] = None,
+            **kwargs,
+    ) -> requests.Response:
+        """
+        Async version of request().
+
+        The request runs in a worker thread, sharing the pooled
+        keep-alive connections of the scraper's session. Throttling
+        only blocks that worker thread, never the event loop, and
+        cached or memoized responses are returned without waiting.
+        """
+        return await asyncio.to_thread(
+            self.request,
+            url=url, method=method,
+            expected_status=expected_status,
+            caching=caching,
+            **kwargs,
+        )
+
+    async def arequest_json(
+            self,
+            url: str,
+            method: str = "GET",
+            expected_status: int = 200,
+            caching: Optional[Union[bool, str]] = None,
+            **kwargs,
+    ) -> Union[dict, list]:
+        """
+        Async version of request_json()
+        """
+        return await asyncio.to_thread(
+            self.request_json,
+            url=url, method=method,
+            expected_status=expected_status,
+            caching=caching,
+            **kwargs,
+        )
+
+    async def arequest_soup(
+            self,
+            url: str,
+            method: str = "GET",
+            expected_status: Optional[int] = None,
+            caching: Optional[Union[bool, str]] = None,
+            parser: str = "html.parser",
+            encoding: Optional[str] = None,
+            **kwargs,
+    ) -> BeautifulSoup:
+        """
+        Async version of request_soup()
+        """
+        return await asyncio.to_thread(
+            self.request_soup,
+            url=url, method=method,
+            expected_status=expected_status,
+            caching=caching,
+            parser=parser,
+            encoding=encoding,
+            **kwargs,
+        )
+
+    @classmethod
+    def get_lot_info_cache(cls) -> LotInfoCache:
+        """
+        Return the LotInfo cache in CACHE_DIR that is shared by all scrapers
+        """
+        return LotInfoCache(cls.CACHE_DIR / "lot-infos")
+
+    @classmethod
+    def get_response_cache(cls) -> ResponseCache:
+        """
+        Return the response cache in CACHE_DIR that is shared by all scrapers
+        """
+        return get_response_cache(
+            cls.CACHE_DIR / RESPONSE_CACHE_FILENAME,
+            max_size=cls.CACHE_MAX_SIZE,
+            compress=cls.CACHE_COMPRESS,
+        )
+
+    @contextlib.contextmanager
+    def request_memo(self):
+        """
+        Within this context, identical requests are only fired once.
+
+        The responses and the parsed json and soup objects are shared
+        between all callers, so they must not be modified.
+        Nested contexts share the memo of the outermost context.
+
+            with scraper.request_memo():
+                scraper.get_lot_infos()
+                scraper.get_lot_data()      # does not request the same urls again
+        """
+        if self._request_memo is not None:
+            yield
+            return
+
+        self._request_memo = dict()
+        try:
+            yield
+        finally:
+            self._request_memo = None
+
+    def _memoized(self, key: tuple, func: Callable[[], Any]) -> Any:
+        memo = self._request_memo
+        if memo is None:
+            return func()
+
+        with self._request_memo_lock:
+            entry = memo.get(key)
+            if entry is None:
+                entry = memo[key] = {"lock": threading.Lock()}
+
+        # concurrent callers of the same key wait for the first one
+        with entry["lock"]:
+            if "value" not in entry:
+                entry["value"] = func()
+            return entry["value"]
+
+    @classmethod
+    def _request_key(cls, method: str, url: str, kwargs: dict) -> str:
+        return json.dumps([method.upper(), url, kwargs], sort_keys=True, default=str)
+
+    def _request_conditional(
+            self,
+            method: str,
+            url: str,
+            request_key: str,
+            throttle: bool,
+            kwargs: dict,
+    ) -> requests.Response:
+        # recorded exchanges must not depend on the conditional state of the recording machine
+        if not self.CONDITIONAL_REQUESTS or method.upper() != "GET" or cassettes.active:
+            return self._request_with_ssl_fallback(method, url, throttle, kwargs)
+
+        response_cache = self.get_response_cache()
+        namespace = conditional_namespace(self.POOL.id)
+
+        previous_response = response_cache.get(namespace, request_key)
+        if previous_response is not None:
+            kwargs["headers"] = {
+                **(kwargs.get("headers") or {}),
+                **conditional_request_headers(previous_response),
+            }
+
+        response = self._request_with_ssl_fallback(method, url, throttle, kwargs)
+
+        if response.status_code == 304 and previous_response is not None:
+            log(f"not modified {method} {url}")
+            response = previous_response
+
+        elif response.status_code == 200 and response_validator(response):
+            response_cache.put(namespace, request_key, response)
+
+        response.conditional_validator = response_validator(response)
+        return response
+
+    def _parse_response(self, key: tuple, response: requests.Response, parse: Callable[[requests.Response], Any]) -> Any:
+        """
+        Parse the response, or return the previous result if
+        the response has not been modified since
+        """
+        validator = getattr(response, "conditional_validator", None)
+        if not validator:
+            return parse(response)
+
+        previous = self._conditional_results.get(key)
+        if previous is not None and previous[0] == validator:
+            return previous[1]
+
+        result = parse(response)
+        self._conditional_results[key] = (validator, result)
+        return result
+
+    def _request_with_ssl_fallback(self, method: str, url: str, throttle: bool, kwargs: dict) -> requests.Response:
+        try:
+            return self._request(method, url, throttle=throttle, **kwargs)
+        except requests.exceptions.SSLError as e:
+            if not self.ALLOW_SSL_FAILURE:
+                raise
+            if self.ALLOW_SSL_FAILURE == "expired":
+                if "certificate has expired" not in str(e):
+                    raise
+
+            log(f"repeating request without certificate validation")
+            kwargs["verify"] = False
+            return self._request(method, url, **kwargs)
+
+    def _request(self, method: str, url: str, throttle: bool = True, **kwargs) -> requests.Response:
 
         # -- throttle requests --
 
-        passed_time = time.time() - self.__last_request_time
-        if passed_time < 1. / self.REQUESTS_PER_SECOND:
-            time.sleep(1. / self.REQUESTS_PER_SECOND - passed_time)
-        self.__last_request_time = time.time()
+        # replayed requests do not reach any server
+        if throttle and not cassettes.replaying:
+            wait_time = self.reserve_request(url)
+            if wait_time > 0:
+                time.sleep(wait_time)
 
         # -- log request --
 
@@ -290,6 +654,21 @@ class ScraperBase:
             **kwargs,
         )
 
+    def reserve_request(self, url: str) -> float:
+        """
+        Reserve a request in this scraper's and in the host's rate limit.
+
+        Does not block, the caller must wait the returned number of seconds
+        before firing the request.
+
+        :param url: str, the url to request
+        :return: float, seconds to wait
+        """
+        return max(
+            self.rate_limit.reserve(),
+            host_rate_limiter.reserve(url, self.REQUESTS_PER_SECOND, self.REQUEST_BURST),
+        )
+
     @classmethod
     def now(cls) -> datetime.datetime:
         """
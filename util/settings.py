@@ -0,0 +1,50 @@
+from typing import Optional
+
+from decouple import config
+
+
+class Settings:
+    """
+    Configuration from the environment or a `.env` file.
+
+    The values are resolved once, instead of on every use, because
+    some are read in hot code paths (e.g. each LotData construction).
+    Call `reload()` after changing the environment, e.g. in tests.
+    """
+
+    def __init__(self):
+        self.park_api_v3_mode: bool = False
+        self.park_api_pbw_api_key: Optional[str] = None
+        self.park_api_bahn_api_client_id: Optional[str] = None
+        self.park_api_bahn_api_client_secret: Optional[str] = None
+        self.bahn_api_token: Optional[str] = None
+        self.reload()
+
+    def reload(self):
+        self.park_api_v3_mode = config("PARK_API_V3_MODE", default=False, cast=bool)
+        self.park_api_pbw_api_key = config("PARK_API_PBW_API_KEY", default=None)
+        self.park_api_bahn_api_client_id = config("PARK_API_BAHN_API_CLIENT_ID", default=None)
+        self.park_api_bahn_api_client_secret = config("PARK_API_BAHN_API_CLIENT_SECRET", default=None)
+        self.bahn_api_token = config("BAHN_API_TOKEN", default=None)
+
+    def require(self, name: str) -> str:
+        """
+        Return the value of the attribute `name` or raise ValueError if it is not defined
+        """
+        value = getattr(self, name)
+        if value is None:
+            raise ValueError(
+                f"{name.upper()} not found. Define it in the environment or in a .env file."
+            )
+        return value
+
+
+settings = Settings()
+
+
+def reload_settings() -> Settings:
+    """
+    Resolve the settings again, e.g. after changing the environment
+    """
+    settings.reload()
+    return settings
@@ -0,0 +1,271 @@
+import sys
+import json
+import time
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Union, Optional, List, Dict, TextIO
+
+import requests
+
+from ._log import log
+
+
+class SnapshotSink:
+    """
+    Base class for snapshot destinations.
+
+    `write()` puts a snapshot into a bounded queue and blocks while the
+    queue is full, so slow destinations slow down the scrapers instead
+    of filling up the memory. A writer thread collects up to `batch_size`
+    snapshots (or whatever arrived within `batch_timeout` seconds) and
+    passes them to `write_batch()`, which must be implemented by derived classes.
+    """
+
+    def __init__(
+            self,
+            batch_size: int = 100,
+            batch_timeout: float = 1.,
+            max_queue_size: int = 1000,
+    ):
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"{self.__class__.__name__}-writer", daemon=True)
+        self._thread.start()
+
+    def write_batch(self, snapshots: List[dict]):
+        raise NotImplementedError
+
+    def write(self, snapshot: dict, timeout: Optional[float] = None):
+        """
+        Queue the snapshot for writing.
+
+        Blocks while the queue is full and raises queue.Full
+        if it is still full after `timeout` seconds.
+        """
+        if self._closed:
+            raise ValueError(f"{self.__class__.__name__} is closed")
+        self._queue.put(snapshot, timeout=timeout)
+
+    def flush(self):
+        """
+        Block until all queued snapshots are written
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Write all queued snapshots and stop the writer thread
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_CLOSE)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            end_time = time.monotonic() + self.batch_timeout
+            while batch[-1] is not _CLOSE and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0., end_time - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            snapshots = [snapshot for snapshot in batch if snapshot is not _CLOSE]
+            try:
+                if snapshots:
+                    self.write_batch(snapshots)
+            except Exception as e:
+                log(f"{self.__class__.__name__}: could not write {len(snapshots)} snapshots: {type(e).__name__}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if batch[-1] is _CLOSE:
+                self._close()
+                break
+
+    def _close(self):
+        """
+        Called in the writer thread after the last batch
+        """
+        pass
+
+
+_CLOSE = object()
+
+
+class NdjsonFileSink(SnapshotSink):
+    """
+    Appends each snapshot as one json line to a file, or to stdout if `filename` is "-".
+
+    If the file exceeds `max_size` bytes it is renamed to `<filename>.1`
+    (previous backups become `.2`, `.3`, ...) and a new file is started.
+    Only `backup_count` backups are kept.
+    """
+
+    def __init__(
+            self,
+            filename: Union[str, Path],
+            max_size: Optional[int] = 100 * 1024 * 1024,
+            backup_count: int = 5,
+            **kwargs,
+    ):
+        self.filename = None if filename == "-" else Path(filename)
+        self.max_size = max_size
+        self.backup_count = backup_count
+        self._file: Optional[TextIO] = None
+        super().__init__(**kwargs)
+
+    def write_batch(self, snapshots: List[dict]):
+        file = self._get_file()
+        for snapshot in snapshots:
+            file.write(json.dumps(snapshot, ensure_ascii=False))
+            file.write("\n")
+        file.flush()
+
+        if self.filename is not None and self.max_size is not None and file.tell() >= self.max_size:
+            self._rotate()
+
+    def _get_file(self) -> TextIO:
+        if self.filename is None:
+            return sys.stdout
+        if self._file is None:
+            self.filename.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.filename.open("a", encoding="utf-8")
+        return self._file
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backup_count - 1, 0, -1):
+            backup = Path(f"{self.filename}.{i}")
+            if backup.exists():
+                backup.replace(f"{self.filename}.{i + 1}")
+        if self.backup_count:
+            self.filename.replace(f"{self.filename}.1")
+        else:
+            self.filename.unlink()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SqliteSink(SnapshotSink):
+    """
+    Stores the snapshots in an sqlite database, one row per snapshot
+    with the pool ID and the snapshot as json.
+    """
+
+    def __init__(self, filename: Union[str, Path], **kwargs):
+        self.filename = Path(filename)
+        self._connection: Optional[sqlite3.Connection] = None
+        super().__init__(**kwargs)
+
+    def write_batch(self, snapshots: List[dict]):
+        if self._connection is None:
+            self.filename.parent.mkdir(parents=True, exist_ok=True)
+            # only used by the writer thread
+            self._connection = sqlite3.connect(str(self.filename), timeout=30)
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS snapshot (
+                    id INTEGER PRIMARY KEY,
+                    pool_id TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS snapshot_pool_created ON snapshot (pool_id, created);
+            """)
+
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO snapshot (pool_id, created, data) VALUES (?, ?, ?)",
+                [
+                    (snapshot["pool"]["id"], now, json.dumps(snapshot, ensure_ascii=False))
+                    for snapshot in snapshots
+                ]
+            )
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class HttpPostSink(SnapshotSink):
+    """
+    POSTs each batch of snapshots as a json list to `url`.
+
+    Failed requests are repeated `max_retries` times with an
+    increasing delay before the batch is dropped.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            timeout: float = 30.,
+            max_retries: int = 3,
+            retry_delay: float = 1.,
+            **kwargs,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        super().__init__(**kwargs)
+
+    def write_batch(self, snapshots: List[dict]):
+        data = json.dumps(snapshots, ensure_ascii=False).encode("utf-8")
+        for i in range(self.max_retries + 1):
+            try:
+                response = self.session.post(
+                    self.url, data=data, timeout=self.timeout,
+                    headers={"Content-Type": "application/json"},
+                )
+                response.raise_for_status()
+                return
+            except requests.RequestException as e:
+                if i == self.max_retries:
+                    raise
+                log(f"{self.__class__.__name__}: POST {self.url} failed, retrying: {type(e).__name__}: {e}")
+                time.sleep(self.retry_delay * 2 ** i)
+
+    def _close(self):
+        self.session.close()
+
+
+def sink_from_string(spec: str, **kwargs) -> SnapshotSink:
+    """
+    Create a sink from a command-line string:
+
+        - "http://..." or "https://..." -> HttpPostSink
+        - "sqlite:<filename>" -> SqliteSink
+        - "columnar:<directory>" -> ColumnarSink (requires numpy)
+        - "ndjson:<filename>", "<filename>" or "-" (stdout) -> NdjsonFileSink
+    """
+    if spec.startswith("http://") or spec.startswith("https://"):
+        return HttpPostSink(spec, **kwargs)
+    if spec.startswith("sqlite:"):
+        return SqliteSink(spec[7:], **kwargs)
+    if spec.startswith("columnar:"):
+        from .columnar import ColumnarSink
+        return ColumnarSink(spec[9:], **kwargs)
+    if spec.startswith("ndjson:"):
+        spec = spec[7:]
+    return NdjsonFileSink(spec, **kwargs)
@@ -1,15 +1,49 @@
+import asyncio
 import datetime
+import time
 import traceback
 import warnings
+from typing import List, Dict, Optional, Tuple
 
 from .scraper import ScraperBase
 from .structs import LotInfo, LotData, PoolInfo
+from .sinks import SnapshotSink
+from .delta import DeltaTracker
 
 
 class SnapshotMaker:
 
-    def __init__(self, scraper: ScraperBase):
+    def __init__(
+            self,
+            scraper: ScraperBase,
+            info_ttl: Optional[float] = None,
+            refresh_infos: bool = False,
+            sink: Optional[SnapshotSink] = None,
+            delta_tracker: Optional[DeltaTracker] = None,
+    ):
+        """
+        :param scraper: ScraperBase instance
+        :param info_ttl: float|None
+            Seconds that scraped lot infos are reused in snapshots,
+            defaults to the scraper's LOT_INFO_TTL.
+            Lot infos from geojson files are never cached.
+        :param refresh_infos: bool
+            If True, the lot infos are scraped and the cache is updated
+            regardless of its age.
+        :param sink: SnapshotSink|None
+            If given, each snapshot is also written to the sink.
+        :param delta_tracker: DeltaTracker|None
+            If given, get_snapshot() and aget_snapshot() return (and write to the sink)
+            only the lots that changed since the previous snapshot, see DeltaTracker.
+        """
         self.scraper = scraper
+        self.info_ttl = scraper.LOT_INFO_TTL if info_ttl is None else info_ttl
+        self.refresh_infos = refresh_infos
+        self.sink = sink
+        self.delta_tracker = delta_tracker
+        # the last cached lot infos and their time, to skip the lot info cache file
+        # while the same SnapshotMaker is used repeatedly
+        self._info_map: Optional[Tuple[float, Dict[str, LotInfo]]] = None
 
     def info_map_to_geojson(
             self,
@@ -29,10 +63,14 @@ class SnapshotMaker:
 
         :return: geojson dict
         """
-        info_map = self.scraper.get_lot_info_map(required=not include_unknown)
+        with self.scraper.request_memo():
+            info_map = self.scraper.get_lot_info_map(required=not include_unknown)
+
+            lot_data_list = None
+            if include_unknown or not include_all_infos:
+                lot_data_list = self.scraper.get_lot_data()
 
-        if include_unknown or not include_all_infos:
-            lot_data_list = self.scraper.get_lot_data()
+        if lot_data_list is not None:
             lot_data_map = {lot_data.id: lot_data for lot_data in lot_data_list}
 
             if include_unknown:
@@ -51,7 +89,7 @@ class SnapshotMaker:
             "features": []
         }
         for info in info_map.values():
-            info = vars(info).copy()
+            info = info.to_dict()
             lat, lon = info.pop("latitude", None), info.pop("longitude", None)
             feature = {
                 "type": "Feature",
@@ -69,46 +107,121 @@ class SnapshotMaker:
 
     def get_snapshot(self, infos_required: bool = True) -> dict:
         snapshot = {
-            "pool": vars(self.scraper.POOL),
+            "pool": self.scraper.POOL.to_dict(),
             "lots": [],
         }
         try:
-            info_map = self.scraper.get_lot_info_map(required=infos_required)
+            with self.scraper.request_memo():
+                info_map = self._get_cached_lot_info_map()
+                if info_map is None:
+                    info_map = self.scraper.get_lot_info_map(required=infos_required)
+                    self._put_cached_lot_info_map(info_map)
 
-            lot_id_set = set()
-            for lot_data in self.scraper.get_lot_data():
-                if lot_data.id in lot_id_set:
-                    raise ValueError(
-                        f"Duplicate LotData id '{lot_data.id}' in {lot_data}"
-                    )
-                lot_id_set.add(lot_data.id)
-
-                if lot_data.id in info_map:
-                    merged_lot = vars(info_map[lot_data.id])
-                else:
-                    error_message = f"Lot {lot_data.id} is not in lot_infos"
-                    if infos_required:
-                        raise ValueError(error_message)
-                    else:
-                        warnings.warn(error_message)
+                lot_data_list = self.scraper.get_lot_data()
+            self._merge_lots(snapshot["lots"], info_map, lot_data_list, infos_required)
 
-                    merged_lot = dict()
+        except Exception as e:
+            snapshot["error"] = f"""{type(e).__name__}: {e}\n{traceback.format_exc()}"""
 
-                for key, value in vars(lot_data).items():
-                    if key not in merged_lot or value is not None:
-                        merged_lot[key] = value
+        return self._finish_snapshot(snapshot)
 
-                for key, value in merged_lot.items():
-                    if isinstance(value, datetime.datetime):
-                        merged_lot[key] = value.isoformat()
+    async def aget_snapshot(self, infos_required: bool = True) -> dict:
+        """
+        Async version of get_snapshot().
 
-                if not merged_lot.get("source_url"):
-                    merged_lot["source_url"] = (
-                        self.scraper.POOL.source_url or self.scraper.POOL.public_url
+        The lot infos and the lot data are scraped concurrently.
+        """
+        snapshot = {
+            "pool": self.scraper.POOL.to_dict(),
+            "lots": [],
+        }
+        try:
+            with self.scraper.request_memo():
+                info_map = self._get_cached_lot_info_map()
+                if info_map is None:
+                    info_map, lot_data_list = await asyncio.gather(
+                        self.scraper.aget_lot_info_map(required=infos_required),
+                        self.scraper.aget_lot_data(),
                     )
-
-                snapshot["lots"].append(merged_lot)
+                    self._put_cached_lot_info_map(info_map)
+                else:
+                    lot_data_list = await self.scraper.aget_lot_data()
+            self._merge_lots(snapshot["lots"], info_map, lot_data_list, infos_required)
 
         except Exception as e:
             snapshot["error"] = f"""{type(e).__name__}: {e}\n{traceback.format_exc()}"""
+
+        return self._finish_snapshot(snapshot)
+
+    def _finish_snapshot(self, snapshot: dict) -> dict:
+        if self.delta_tracker is not None:
+            snapshot = self.delta_tracker.apply(snapshot)
+        if self.sink is not None:
+            self.sink.write(snapshot)
         return snapshot
+
+    def _use_lot_info_cache(self) -> bool:
+        return self.info_ttl is not None and not self.scraper.geojson_filename().exists()
+
+    def _get_cached_lot_info_map(self) -> Optional[Dict[str, LotInfo]]:
+        if not self._use_lot_info_cache() or self.refresh_infos:
+            return None
+        if self._info_map is not None and self._info_map[0] >= time.time() - self.info_ttl:
+            return dict(self._info_map[1])
+
+        entry = self.scraper.get_lot_info_cache().get_entry(self.scraper.POOL.id, ttl=self.info_ttl)
+        if entry is None:
+            return None
+        self._info_map = entry
+        return dict(entry[1])
+
+    def _put_cached_lot_info_map(self, info_map: Dict[str, LotInfo]):
+        if self._use_lot_info_cache() and info_map:
+            self.scraper.get_lot_info_cache().put(self.scraper.POOL.id, info_map)
+            self._info_map = (time.time(), dict(info_map))
+            # a forced refresh only applies to the next snapshot
+            self.refresh_infos = False
+
+    def _merge_lots(
+            self,
+            lots: List[dict],
+            info_map: Dict[str, LotInfo],
+            lot_data_list: List[LotData],
+            infos_required: bool,
+    ):
+        """
+        Merge LotInfo and LotData into snapshot dicts and append them to `lots`
+        """
+        lot_id_set = set()
+        for lot_data in lot_data_list:
+            if lot_data.id in lot_id_set:
+                raise ValueError(
+                    f"Duplicate LotData id '{lot_data.id}' in {lot_data}"
+                )
+            lot_id_set.add(lot_data.id)
+
+            if lot_data.id in info_map:
+                merged_lot = info_map[lot_data.id].to_dict()
+            else:
+                error_message = f"Lot {lot_data.id} is not in lot_infos"
+                if infos_required:
+                    raise ValueError(error_message)
+                else:
+                    warnings.warn(error_message)
+
+                merged_lot = dict()
+
+            for key, value in lot_data.to_dict().items():
+                if key not in merged_lot or value is not None:
+                    merged_lot[key] = value
+
+            for key, value in merged_lot.items():
+                if isinstance(value, datetime.datetime):
+                    merged_lot[key] = value.isoformat()
+
+            if not merged_lot.get("source_url"):
+                merged_lot["source_url"] = (
+                    self.scraper.POOL.source_url or self.scraper.POOL.public_url
+                )
+
+            lots.append(merged_lot)
@@ -1,3 +1,5 @@
+import copy
+
 import bs4
 
 
@@ -9,11 +11,13 @@ def get_soup_text(tag: bs4.Tag) -> str:
 
     All lines are .strip()ed and empty lines are dropped.
 
-    This actually changes the soup tree!
+    Works on a copy of the element, so the soup tree is not changed
+    and can be shared (e.g. within ScraperBase.request_memo()).
 
     :param tag: a soup element
     :return: str
     """
+    tag = copy.copy(tag)
     DELIMITER = "#!-%br-DeLiMiTtEr"
     for br in tag.find_all("br"):
         br.replaceWith(DELIMITER)
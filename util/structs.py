@@ -1,25 +1,37 @@
 import datetime
 from typing import Union, Optional, List, Iterable
 
-from decouple import config
-
 from .strings import guess_lot_type
+from .settings import settings
 
 
 class Struct:
+    """
+    Base of the data structures.
+
+    Derived classes list their attributes in `__slots__`, which saves the
+    per-instance `__dict__` (a lot of memory for millions of LotData objects),
+    and return them in the same order from `to_dict`.
+    """
+    __slots__ = ()
+
     def __repr__(self):
         return f"{self.__class__.__name__}(%s)" % (
             ", ".join(
                 f"{key}={repr(value)}"
-                for key, value in vars(self).items()
+                for key, value in self.to_dict().items()
             )
         )
 
     def to_dict(self) -> dict:
-        return vars(self)
+        return {key: getattr(self, key) for key in self.__slots__}
 
 
 class PoolInfo(Struct):
+    __slots__ = (
+        "id", "name", "public_url", "timezone", "source_url",
+        "attribution_license", "attribution_url", "attribution_contributor",
+    )
 
     def __init__(
         self,
@@ -41,8 +53,24 @@ class PoolInfo(Struct):
         self.attribution_url = attribution_url or None
         self.attribution_contributor = attribution_contributor or None
 
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "public_url": self.public_url,
+            "timezone": self.timezone,
+            "source_url": self.source_url,
+            "attribution_license": self.attribution_license,
+            "attribution_url": self.attribution_url,
+            "attribution_contributor": self.attribution_contributor,
+        }
+
 
 class LotInfo(Struct):
+    __slots__ = (
+        "id", "name", "type", "public_url", "source_url", "address",
+        "capacity", "has_live_capacity", "latitude", "longitude",
+    )
 
     class Types:
         bus = "bus"
@@ -110,19 +138,32 @@ class LotInfo(Struct):
                         f"LotInfo '{self.name}', {key} '{value}' out of bounds"
                     )
 
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": self.type,
+            "public_url": self.public_url,
+            "source_url": self.source_url,
+            "address": self.address,
+            "capacity": self.capacity,
+            "has_live_capacity": self.has_live_capacity,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+        }
+
     @classmethod
     def from_dict(cls, data: dict) -> "LotInfo":
-        dummy = cls(id="id", name="name", type=LotInfo.Types.unknown, source_url="https://")
-        keys = list(vars(dummy))
         kwargs = {
             key: data[key]
-            for key in keys
+            for key in cls.__slots__
             if key in data
         }
         return cls(**kwargs)
 
 
 class LotData(Struct):
+    __slots__ = ("id", "timestamp", "status", "num_free", "num_occupied", "capacity", "lot_timestamp")
 
     class Status:
         open = "open"           # it's listed as open
@@ -184,6 +225,17 @@ class LotData(Struct):
                             f" (occupied={self.num_occupied}, capacity={self.capacity})"
                         )
 
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "status": self.status,
+            "num_free": self.num_free,
+            "num_occupied": self.num_occupied,
+            "capacity": self.capacity,
+            "lot_timestamp": self.lot_timestamp,
+        }
+
 
 class LotInfoList(List[LotInfo]):
     errors: Optional[list[str]] = None
@@ -210,14 +262,12 @@ class LotDataList(List[LotData]):
 
 
 def validate_timestamp(timestamp: datetime.datetime, parent: str):
-    park_api_v3_mode: bool = config('PARK_API_V3_MODE', default=False, cast=bool)
-
     if not isinstance(timestamp, datetime.datetime):
         raise ValueError(
             f"'{parent}'.timestamp must datetime, got '{type(timestamp).__name__}'"
         )
 
-    if timestamp.tzinfo and not park_api_v3_mode:
+    if timestamp.tzinfo and not settings.park_api_v3_mode:
         raise ValueError(
             f"'{parent}'.timestamp must be UTC and not contain a tzinfo"
             f", got '{timestamp}'"
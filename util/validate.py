@@ -1,14 +1,52 @@
 import json
+import functools
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Callable, Any
 
 import jsonschema
 
 
+SCHEMA_FILENAME = Path(__file__).resolve().parent.parent / "schema.json"
+
+
+@functools.lru_cache(maxsize=None)
+def get_schema_validator() -> jsonschema.Draft7Validator:
+    """
+    Return the validator for schema.json, which is loaded only once per process
+    """
+    return jsonschema.Draft7Validator(json.loads(SCHEMA_FILENAME.read_text()))
+
+
+@functools.lru_cache(maxsize=None)
+def get_schema_checker() -> Optional[Callable[[Any], bool]]:
+    """
+    Return the compiled fast checker for schema.json (see util/schema_check.py)
+    or None if schema.json uses keywords it does not support
+    """
+    from .schema_check import compile_schema
+
+    try:
+        return compile_schema(get_schema_validator().schema)
+    except NotImplementedError:
+        return None
+
+
+# Maximum number of schema errors reported per snapshot
+DEFAULT_MAX_ERRORS = 100
+
+
 def validate_snapshot(
         snapshot: dict,
         schema: Optional[dict] = None,
+        max_errors: Optional[int] = DEFAULT_MAX_ERRORS,
 ) -> dict:
+    """
+    Validate the snapshot against the schema and check for missing data.
+
+    All schema errors are reported (ordered by path, so the errors of each lot
+    are grouped together), at most `max_errors` of them, followed by a message
+    with the number of errors that were left out.
+    """
     from .structs import LotInfo, LotData
 
     ret_data = {
@@ -18,19 +56,29 @@ def validate_snapshot(
     # --- validate schema ---
 
     if schema is None:
-        schema = json.loads((Path(__file__).resolve().parent.parent / "schema.json").read_text())
-
-    validator = jsonschema.Draft7Validator(schema)
-    try:
-        validator.validate(snapshot)
-    except jsonschema.ValidationError as e:
-        ret_data["validations"].append({
-            "path": ".".join(str(p) for p in e.absolute_path),
-            "message": e.message + f": {e.instance}",
-            "priority": 0,
-        })
-        # no need to check further
-        return ret_data
+        validator = get_schema_validator()
+        checker = get_schema_checker()
+    else:
+        validator = jsonschema.Draft7Validator(schema)
+        checker = None
+    # jsonschema is only needed to explain the errors
+    if checker is None or not checker(snapshot):
+        errors = sorted(validator.iter_errors(snapshot), key=_error_sort_key)
+        if errors:
+            for e in errors[:max_errors]:
+                ret_data["validations"].append({
+                    "path": ".".join(str(p) for p in e.absolute_path),
+                    "message": e.message + f": {e.instance}",
+                    "priority": 0,
+                })
+            if max_errors is not None and len(errors) > max_errors:
+                ret_data["validations"].append({
+                    "path": "",
+                    "message": f"{len(errors) - max_errors} more schema errors not shown",
+                    "priority": 0,
+                })
+            # no need to check further
+            return ret_data
 
     if snapshot.get("error"):
         ret_data["validations"].append({
@@ -85,3 +133,8 @@ def validate_snapshot(
             })
 
     return ret_data
+
+
+def _error_sort_key(error: jsonschema.ValidationError) -> tuple:
+    # lot indices are sorted numerically, other path elements alphabetically
+    return tuple((0, p, "") if isinstance(p, int) else (1, 0, p) for p in error.absolute_path)
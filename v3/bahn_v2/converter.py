@@ -3,10 +3,6 @@ Copyright 2024 binary butterfly GmbH
 Use of this source code is governed by an MIT-style license that can be found in the LICENSE.txt.
 """
 
-import json
-
-import requests
-from decouple import config
 from validataclass.exceptions import ValidationError
 from validataclass.validators import DataclassValidator
 
@@ -14,6 +10,7 @@ from common.base_converter import PullConverter
 from common.exceptions import ImportParkingSiteException
 from common.models import ImportSourceResult
 from util import SourceInfo
+from util.settings import settings
 
 from .mapper import BahnMapper
 from .validators import BahnParkingSiteInput
@@ -27,13 +24,11 @@ class BahnV2PullConverter(PullConverter):
 
     @property
     def api_client_id(self) -> str:
-        # TODO: find better method then that
-        return config('PARK_API_BAHN_API_CLIENT_ID')
+        return settings.require('park_api_bahn_api_client_id')
 
     @property
     def api_client_secret(self) -> str:
-        # TODO: find better method then that
-        return config('PARK_API_BAHN_API_CLIENT_SECRET')
+        return settings.require('park_api_bahn_api_client_secret')
 
     source_info = SourceInfo(
         id='bahn_v2',
@@ -76,5 +71,4 @@ class BahnV2PullConverter(PullConverter):
             'accept': 'application/json',
         }
 
-        response = requests.get(f'{self._base_url}/parking-facilities', headers=headers, timeout=60)
-        return response.json()
+        return self.http_client.get_json(f'{self._base_url}/parking-facilities', headers=headers)
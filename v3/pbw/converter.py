@@ -5,15 +5,15 @@ Use of this source code is governed by an MIT-style license that can be found in
 
 from typing import Optional
 
-import requests
-from decouple import config
 from validataclass.exceptions import ValidationError
 from validataclass.validators import DataclassValidator
 
 from common.base_converter import PullConverter
 from common.exceptions import ImportParkingSiteException
+from common.http_client import request_error_message
 from common.models import ImportSourceResult
 from util import SourceInfo
+from util.settings import settings
 from v3.pbw.mapper import PbwMapper
 from v3.pbw.validation import PbwCityInput, PbwParkingSiteDetailInput, PbwParkingSiteInput, PbwRealtimeInput
 
@@ -25,8 +25,7 @@ class PbwPullConverter(PullConverter):
 
     @property
     def api_key(self) -> str:
-        # TODO: find better method then that
-        return config('PARK_API_PBW_API_KEY')
+        return settings.require('park_api_pbw_api_key')
 
     city_validator = DataclassValidator(PbwCityInput)
     parking_site_detail_validator = DataclassValidator(PbwParkingSiteDetailInput)
@@ -46,9 +45,10 @@ class PbwPullConverter(PullConverter):
             static_parking_site_errors=[],
         )
 
+        city_inputs: list[PbwCityInput] = []
         for city_dict in city_dicts:
             try:
-                city_input: PbwCityInput = self.city_validator.validate(city_dict)
+                city_inputs.append(self.city_validator.validate(city_dict))
             except ValidationError as e:
                 import_source_result.static_parking_site_errors.append(
                     ImportParkingSiteException(
@@ -56,11 +56,21 @@ class PbwPullConverter(PullConverter):
                         message=f'validation error: {e.to_dict()}',
                     ),
                 )
-                continue
 
-            parking_site_detail_dicts = self._get_remote_data('object-by-city', city_input.id)
+        city_results = self.fan_out(lambda city_input: self._get_remote_data('object-by-city', city_input.id), city_inputs)
+
+        for city_result in city_results:
+            city_input: PbwCityInput = city_result.item
+            if city_result.exception is not None:
+                import_source_result.static_parking_site_errors.append(
+                    ImportParkingSiteException(
+                        uid=str(city_input.id),
+                        message=f'request error: {request_error_message(city_result.exception)}',
+                    ),
+                )
+                continue
 
-            for parking_site_detail_dict in parking_site_detail_dicts:
+            for parking_site_detail_dict in city_result.result:
                 try:
                     parking_site_detail_input: PbwParkingSiteDetailInput = self.parking_site_detail_validator.validate(
                         parking_site_detail_dict
@@ -103,7 +113,7 @@ class PbwPullConverter(PullConverter):
         if data_id is not None:
             parameters['id'] = data_id
 
-        result: dict = requests.get(self._base_url, params=parameters, timeout=60).json()
+        result: dict = self.http_client.get_json(self._base_url, params=parameters)
 
         items: list[dict] = []
         for key, item in result.items():